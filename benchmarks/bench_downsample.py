@@ -0,0 +1,52 @@
+# Chart render time against point count, with and without downsampling.
+# Headless (Agg), run from the repository root: python benchmarks/bench_downsample.py
+import argparse
+import os
+import sys
+import time
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import numpy as np
+from matplotlib.figure import Figure
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cryptocurrency.downsample import downsample
+
+POINT_COUNTS = (1_000, 10_000, 100_000, 1_000_000)
+METHODS = ('none', 'lttb', 'minmax')
+
+
+# Draws line + fill like MainWindow.plot and returns seconds spent in prepare + draw
+def render(x, y, method, width_px):
+    figure = Figure(figsize=(width_px / 100, 4), dpi=100)
+    ax = figure.add_subplot(111)
+    start = time.perf_counter()
+    if method != 'none':
+        x, y = downsample(x, y, width_px, method)
+    ax.plot(x, y)
+    ax.fill_between(x, y, alpha=0.1)
+    figure.canvas.draw()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Chart render time against point count')
+    parser.add_argument('--width', type=int, default=800, help='canvas width in pixels')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f'{"points":>10} ' + ' '.join(f'{method:>10}' for method in METHODS) + '   (ms, best of %d)' % args.repeat)
+    for count in POINT_COUNTS:
+        x = 18000 + np.arange(count) / 24
+        y = 100 + np.cumsum(rng.standard_normal(count))
+        timings = [min(render(x, y, method, args.width) for _ in range(args.repeat)) * 1000 for method in METHODS]
+        print(f'{count:>10} ' + ' '.join(f'{timing:>10.1f}' for timing in timings))
+
+
+if __name__ == '__main__':
+    main()
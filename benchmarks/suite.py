@@ -0,0 +1,474 @@
+# Benchmark suite for the app's hot paths, results are compared against a stored baseline.
+# Headless where possible (Agg canvas, Tk widgets mocked, API served by the local stand-in);
+# startup needs a display and is skipped without one. Run from the repository root:
+#   python benchmarks/suite.py                      run and compare with benchmarks/baseline.json
+#   python benchmarks/suite.py --update-baseline    store this run as the new baseline
+#   python benchmarks/suite.py --fixtures fixtures --coins bitcoin,ethereum
+#                                                   use recorded API responses instead of synthetic ones
+# All metrics are "lower is better"; the exit status is 1 when one regressed past --tolerance.
+import argparse
+import json
+import os
+import platform
+import queue
+import statistics
+import string
+import subprocess
+import sys
+import tempfile
+import time
+from unittest.mock import MagicMock, patch
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import numpy as np
+from matplotlib.backend_bases import MouseEvent
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from cryptocurrency.coin_detail import COIN_DETAIL_PARAMS
+from cryptocurrency.fixtures import FixtureStore
+from cryptocurrency.ratelimit import RateLimiter
+from cryptocurrency.series import MarketSeries
+from cryptocurrency.standin import StandInServer
+
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+SYNTHETIC_COINS = ('bitcoin', 'ethereum', 'solana', 'cardano', 'dogecoin', 'polkadot')
+SEARCH_SIZES = (100, 1_000, 15_000)
+PLOT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+COMPARE_SIZES = (1, 5, 20)
+INDICATOR_POINTS = 100_000
+CANDLE_SIZES = (1_000, 5_000)
+HOUR = 3_600_000
+
+# Opens the real window against the stand-in and prints its startup marks (run in a subprocess)
+STARTUP_PROBE = '''
+import json, sys
+sys.path.insert(0, {root!r})
+import tkinter
+try:
+    import main
+    app = main.MainWindow()
+except tkinter.TclError as e:
+    print(json.dumps({{'skipped': str(e)}}))
+    sys.exit(0)
+
+def check():
+    if app.startup.complete:
+        print(json.dumps(app.startup.marks))
+        app.on_close()
+    else:
+        app.after(10, check)
+
+app.after(10, check)
+app.after(30000, app.on_close)
+app.mainloop()
+'''
+
+
+# Writes synthetic API responses for coins, in the shape CoinGecko returns them
+def write_synthetic_fixtures(directory, coins):
+    store = FixtureStore(directory)
+    rng = np.random.default_rng(0)
+    now = 1_700_000_000_000
+    store.save('global', None, {'data': {'total_volume': {'usd': 9.1e10}, 'total_market_cap': {'usd': 2.4e12}}})
+    for coin in coins:
+        price = float(rng.uniform(0.1, 50_000))
+        store.save('simple/price', {'ids': coin, 'vs_currencies': 'usd'}, {coin: {'usd': price}})
+        store.save(f'coins/{coin}', COIN_DETAIL_PARAMS, {
+            'id': coin,
+            'description': {'en': f'{coin.capitalize()} is a cryptocurrency.\n\nMore text.'},
+            'links': {'twitter_screen_name': coin, 'facebook_username': coin,
+                      'subreddit_url': f'https://reddit.com/r/{coin}'},
+        })
+        timestamps = now - np.arange(288)[::-1] * 5 * 60 * 1000
+        prices = price * np.exp(np.cumsum(rng.normal(0, 0.002, len(timestamps))))
+        store.save(f'coins/{coin}/market_chart', {'vs_currency': 'usd', 'days': '1'}, {
+            'prices': [[int(ts), float(p)] for ts, p in zip(timestamps, prices)],
+            'market_caps': [[int(ts), 0.0] for ts in timestamps],
+            'total_volumes': [[int(ts), float(p) * 1000] for ts, p in zip(timestamps, prices)],
+        })
+
+
+# Coins with made-up but search-like names ("Bitcoin", "Zentra Cash", ...)
+def synthetic_coins(count, seed=0):
+    rng = np.random.default_rng(seed)
+    syllables = ['bit', 'coin', 'eth', 'sol', 'ana', 'doge', 'chain', 'link', 'zen', 'tra', 'po', 'ly', 'nex',
+                 'ora', 'qu', 'ant', 'mo', 'nero', 'ri', 'pple', 'ca', 'rdano', 'lu', 'na', 'ste', 'llar']
+    suffixes = ['', '', '', ' Cash', ' Token', ' Finance', ' Protocol', ' Classic']
+    coins = []
+    for i in range(count):
+        word = ''.join(rng.choice(syllables, size=rng.integers(2, 4)))
+        name = word.capitalize() + suffixes[rng.integers(len(suffixes))]
+        coins.append({'id': f'{word}-{i}', 'symbol': word[:4], 'name': name, 'market_cap_rank': i + 1,
+                      'current_price': float(rng.uniform(0.01, 1000)), 'price_change_percentage_24h': 0.0})
+    return coins
+
+
+# MainWindow without Tk: widgets are mocks, the chart draws on an Agg canvas and
+# background results are delivered through a plain queue drained by the benchmark
+def headless_window(base_url=None, cache_dir=None):
+    import main
+    from cryptocurrency.chart_store import MarketChartStore
+    from cryptocurrency.client import CoinGeckoClient
+    from cryptocurrency.indicators import IndicatorEngine
+    from cryptocurrency.markets import MarketListing
+    from cryptocurrency.prefetch import Prefetcher
+    from cryptocurrency.scheduler import ViewScheduler
+    from cryptocurrency.search import CoinIndex
+    from cryptocurrency.startup import StartupTimer
+
+    with patch.object(main.MainWindow, '__init__', return_value=None):
+        app = main.MainWindow()
+    for name in ('coin_name_label', 'coin_rank_label', 'current_price_label', 'price_percentage_label',
+                 'total_volume_label', 'high_label', 'low_label', 'brief_description_label', 'social_frame',
+                 'coins_list_frame', 'search_entry', 'x_icon', 'facebook_icon', 'reddit_icon', 'cget',
+                 'pin_button'):
+        setattr(app, name, MagicMock())
+    app.social_frame.winfo_children.return_value = []
+    app._get_appearance_mode = lambda: 'dark'
+    app.current_currency = 'bitcoin'
+    app.downsample_method = 'minmax'
+    app.chart_period = '24H'
+    app.chart_timespan = '1'
+    app.chart_age = 0
+    app.pinned = []
+    app.comparison = None
+    app.compare_mode = 'percent'
+    app.indicators = []
+    app.indicator_engine = IndicatorEngine()
+    app.chart_type = 'line'
+    app.candles = None
+    app.markets = MarketListing()
+    app.coins_data = app.markets.coins
+    app.coin_index = CoinIndex()
+    app.startup = StartupTimer(stages=())
+    app.ui_queue = queue.Queue()
+    app.figure = Figure(figsize=(8, 4), dpi=100)
+    app.canvas = FigureCanvasAgg(app.figure)
+    app.init_chart()
+
+    if base_url is not None:
+        app.client = CoinGeckoClient(base_url=base_url, limiter=RateLimiter(rate_per_minute=None))
+        app.scheduler = ViewScheduler(app.client, app.call_soon)
+        app.chart_store = MarketChartStore(app.client, path=os.path.join(cache_dir, 'chart.sqlite3'),
+                                           executor=app.scheduler.executor)
+        # Prefetching would compete with the measured requests
+        app.prefetcher = Prefetcher(app.client, app.chart_store, budget_per_minute=0)
+    return app
+
+
+def close_window(app):
+    app.scheduler.shutdown()
+    app.client.close()
+    app.chart_store.close()
+
+
+# Runs queued UI callbacks until no request is pending on channels
+def drain(app, channels, timeout=30):
+    deadline = time.perf_counter() + timeout
+    while any(channel in app.scheduler.futures for channel in channels):
+        callback, args = app.ui_queue.get(timeout=max(0.0, deadline - time.perf_counter()))
+        callback(*args)
+
+
+def bench_set_currency(args, coins):
+    channels = ('price', 'coin_info', 'chart')
+    with tempfile.TemporaryDirectory() as cache_dir:
+        server = StandInServer(args.fixtures, latency=args.latency, jitter=args.jitter, seed=0)
+        server.start()
+        app = headless_window(server.base_url, cache_dir)
+        results = {}
+        try:
+            with patch('main.ctk.CTkButton', MagicMock()):
+                for label in ('cold', 'warm'):
+                    timings = []
+                    for coin in coins:
+                        started = time.perf_counter()
+                        app.set_currency(coin)
+                        drain(app, channels)
+                        timings.append(time.perf_counter() - started)
+                    results[f'set_currency_{label}_ms'] = statistics.median(timings) * 1000
+        finally:
+            close_window(app)
+            server.stop()
+        if server.counts['missing']:
+            print(f'warning: {server.counts["missing"]} requests had no fixture', file=sys.stderr)
+    return results
+
+
+def bench_filter_coins(args):
+    from cryptocurrency.search import CoinIndex
+
+    app = headless_window()
+    keystrokes = [term[:length] for term in ('bitcoin', 'eth', 'zentra cash', 'link')
+                  for length in range(1, len(term) + 1)]
+    results = {}
+    for size in SEARCH_SIZES:
+        app.coin_index = CoinIndex(synthetic_coins(size))
+        timings = []
+        for _ in range(args.repeat):
+            for term in keystrokes:
+                app.search_entry.get.return_value = term
+                started = time.perf_counter()
+                app.run_search()
+                timings.append(time.perf_counter() - started)
+        results[f'filter_coins_{size}_ms'] = statistics.median(timings) * 1000
+        # First keystroke of a search, before its ranked results are memoized: the worst letter
+        first_keys = []
+        for letter in string.ascii_lowercase:
+            app.search_entry.get.return_value = letter
+            letter_timings = []
+            for _ in range(args.repeat):
+                app.coin_index.short_results.clear()
+                started = time.perf_counter()
+                app.run_search()
+                letter_timings.append(time.perf_counter() - started)
+            first_keys.append(statistics.median(letter_timings))
+        results[f'filter_coins_{size}_first_key_max_ms'] = max(first_keys) * 1000
+    return results
+
+
+def random_series(count, seed=0):
+    rng = np.random.default_rng(seed)
+    timestamps = 1_600_000_000_000 + np.arange(count, dtype=np.int64) * HOUR
+    return MarketSeries(timestamps, 100 + np.cumsum(rng.standard_normal(count)), np.abs(rng.standard_normal(count)))
+
+
+def bench_plot(args):
+    app = headless_window()
+    results = {}
+    for size in PLOT_SIZES if not args.quick else PLOT_SIZES[:3]:
+        series = random_series(size)
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            app.set_data_plot(series)
+            app.plot()
+            timings.append(time.perf_counter() - started)
+        results[f'plot_{size}_ms'] = statistics.median(timings) * 1000
+    return results
+
+
+# Aligning and redrawing a comparison overlay of N coins (2000 points each), full canvas draw included
+def bench_compare(args):
+    from cryptocurrency.compare import Comparison
+
+    app = headless_window()
+    app.pinned = ['pinned']
+    results = {}
+    for count in COMPARE_SIZES:
+        series_by_coin = {f'coin{i}': random_series(2_000, seed=i) for i in range(count)}
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            app.show_comparison(Comparison.from_series(series_by_coin, points=800))
+            app.figure.canvas.draw()
+            timings.append(time.perf_counter() - started)
+        results[f'compare_{count}_coins_ms'] = statistics.median(timings) * 1000
+    return results
+
+
+# Drawing N candlesticks with their volume panel (the "All" span), one full frame: the Agg canvas draws right
+# away on draw_idle, like the line chart benchmarks
+def bench_candles(args):
+    from cryptocurrency.candles import Candles
+
+    app = headless_window()
+    app.chart_type = 'candles'
+    results = {}
+    for count in CANDLE_SIZES:
+        candles = Candles.from_series(random_series(count * 4), 4 * HOUR)
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            app.show_candles(candles)
+            timings.append(time.perf_counter() - started)
+        results[f'candles_{count}_ms'] = statistics.median(timings) * 1000
+    return results
+
+
+# All indicators over a series: computed from scratch, after one appended point (a growing span; a sliding
+# window is computed from scratch), and toggling one on with the series already loaded (the Agg canvas draws
+# right away on draw_idle)
+def bench_indicators(args):
+    from cryptocurrency.indicators import INDICATORS, IndicatorEngine
+
+    series = random_series(INDICATOR_POINTS + 1)
+    first = MarketSeries(series.timestamps[:-1], series.prices[:-1], series.volumes[:-1])
+    results = {}
+    for label, warm in (('full', False), ('append', True)):
+        timings = []
+        for _ in range(args.repeat):
+            engine = IndicatorEngine()
+            if warm:
+                for indicator in INDICATORS.values():
+                    engine.compute('bitcoin', '1', indicator, first)
+            started = time.perf_counter()
+            for indicator in INDICATORS.values():
+                engine.compute('bitcoin', '1', indicator, series if warm else first)
+            timings.append(time.perf_counter() - started)
+        results[f'indicators_{label}_ms'] = statistics.median(timings) * 1000
+
+    app = headless_window()
+    app.set_data_plot(first)
+    app.plot()
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        app.toggle_indicator('Bollinger')
+        timings.append(time.perf_counter() - started)
+        app.toggle_indicator('Bollinger')
+    results['indicator_toggle_ms'] = statistics.median(timings) * 1000
+    return results
+
+
+def bench_hover(args):
+    app = headless_window()
+    app.set_data_plot(random_series(100_000))
+    app.plot()
+    app.figure.canvas.draw()
+    ax = app.chart.ax
+    x_min, x_max = ax.get_xlim()
+    y_mid = sum(ax.get_ylim()) / 2
+    events = [MouseEvent('motion_notify_event', app.figure.canvas, *ax.transData.transform((x, y_mid)))
+              for x in np.linspace(x_min, x_max, 500)]
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        for event in events:
+            app.chart.hover.on_motion(event)
+        timings.append((time.perf_counter() - started) / len(events))
+    return {'hover_event_us': statistics.median(timings) * 1e6}
+
+
+def bench_import(args):
+    def run(code):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
+        return time.perf_counter() - started
+
+    interpreter = min(run('pass') for _ in range(args.repeat))
+    return {'import_main_ms': (min(run('import main') for _ in range(args.repeat)) - interpreter) * 1000}
+
+
+def bench_startup(args):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        server = StandInServer(args.fixtures, latency=args.latency, jitter=args.jitter, seed=0)
+        base_url = server.start()
+        env = dict(os.environ, COINGECKO_BASE_URL=base_url, CRYPTOCURRENCY_CACHE_DIR=cache_dir)
+        env.pop('CRYPTOCURRENCY_STARTUP_LOG', None)
+        try:
+            output = subprocess.run([sys.executable, '-c', STARTUP_PROBE.format(root=ROOT)], cwd=ROOT, env=env,
+                                    capture_output=True, text=True, timeout=60)
+        finally:
+            server.stop()
+    lines = output.stdout.strip().splitlines()
+    marks = json.loads(lines[-1]) if lines else {'skipped': output.stderr.strip()[-200:]}
+    if 'skipped' in marks:
+        print(f'startup skipped: {marks["skipped"]}', file=sys.stderr)
+        return {}
+    return {'startup_first_paint_ms': marks['first_paint'] * 1000,
+            'startup_interactive_ms': marks['interactive'] * 1000}
+
+
+# Peak resident set size of this process and of the largest subprocess (import and startup probes), in MB
+def peak_rss():
+    try:
+        import resource
+    except ImportError:
+        return {}
+    # ru_maxrss is KB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    results = {'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale}
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    if children:
+        results['child_peak_rss_mb'] = children / scale
+    return results
+
+
+# Metrics that got worse than baseline by more than tolerance (and by more than the noise floor)
+def regressions(results, baseline, tolerance, floor=0.5):
+    found = {}
+    for name, value in results.items():
+        base = baseline.get(name)
+        if base is not None and value > base * (1 + tolerance) and value - base > floor:
+            found[name] = (base, value)
+    return found
+
+
+def print_table(results, baseline):
+    print(f'{"metric":<28}{"baseline":>12}{"current":>12}{"change":>10}')
+    for name, value in sorted(results.items()):
+        base = baseline.get(name)
+        base_text = f'{base:.2f}' if base is not None else '-'
+        change = f'{(value - base) / base:+.0%}' if base else ''
+        print(f'{name:<28}{base_text:>12}{value:>12.2f}{change:>10}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the app hot paths and compare with a baseline')
+    parser.add_argument('--fixtures', help='recorded fixtures directory (default: synthetic data)')
+    parser.add_argument('--coins', help='comma separated coins for set_currency (must be in --fixtures)')
+    parser.add_argument('--latency', type=float, default=0.0, help='stand-in response delay in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='stand-in random +- delay in seconds')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--quick', action='store_true', help='skip the largest plot size')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--update-baseline', action='store_true', help='store results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown, 0.25 = 25%%')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as synthetic_dir:
+        coins = args.coins.split(',') if args.coins else list(SYNTHETIC_COINS)
+        if args.fixtures is None:
+            args.fixtures = synthetic_dir
+            write_synthetic_fixtures(synthetic_dir, coins)
+
+        results = {}
+        for bench in (bench_import, bench_startup, bench_plot, bench_compare, bench_candles, bench_indicators,
+                      bench_hover,
+                      bench_filter_coins):
+            results.update(bench(args))
+        results.update(bench_set_currency(args, coins))
+        results.update(peak_rss())
+
+    results = {name: round(value, 3) for name, value in results.items()}
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'metrics': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['metrics']
+    print_table(results, baseline)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+        print(f'Baseline written to {args.baseline}')
+        return 0
+
+    found = regressions(results, baseline, args.tolerance)
+    for name, (base, value) in sorted(found.items()):
+        print(f'REGRESSION {name}: {base:.2f} -> {value:.2f}')
+    return 1 if found else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,208 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from fnmatch import fnmatchcase
+
+# Time to live (seconds) per API path pattern, first match wins
+DEFAULT_TTLS = (
+    ('simple/price', 30),
+    ('global', 120),
+    ('coins/markets', 60),
+    ('coins/list', 24 * 60 * 60),
+    ('coins/*/market_chart*', 60),
+    ('coins/*/ohlc', 60),
+    ('coins/*', 6 * 60 * 60),
+)
+
+
+# Set on an in-flight future whose owner was cancelled: waiters claim the key again instead of failing
+class _Abandoned(Exception):
+    pass
+
+
+class _Entry:
+    __slots__ = ('value', 'size', 'stored_at', 'expires_at')
+
+    def __init__(self, value, size, stored_at, expires_at):
+        self.value = value
+        self.size = size
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+
+
+# In-memory response cache keyed by endpoint and params.
+# Evicts least recently used entries by count and by size, and collapses concurrent
+# identical loads into one in-flight future (single-flight).
+class ResponseCache:
+    def __init__(self, max_entries=256, max_bytes=16 * 1024 * 1024, ttls=DEFAULT_TTLS, default_ttl=60,
+                 clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttls = tuple(ttls)
+        self.default_ttl = default_ttl
+        self.clock = clock
+
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.evictions = 0
+
+    # Builds cache key from API path and query params
+    @staticmethod
+    def key(path, params=None):
+        return path.strip('/'), tuple(sorted((params or {}).items()))
+
+    # Gets TTL configured for API path
+    def ttl_for(self, path):
+        path = path.strip('/')
+        for pattern, ttl in self.ttls:
+            if fnmatchcase(path, pattern):
+                return ttl
+        return self.default_ttl
+
+    # Returns fresh cached value or None
+    def get(self, key):
+        with self._lock:
+            entry = self._lookup(key)
+            return entry.value if entry is not None else None
+
+    # Last stored value even past its TTL, as (value, age_seconds, expired), or None.
+    # Does not count as a hit or miss
+    def peek(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            now = self.clock()
+            return entry.value, now - entry.stored_at, entry.expires_at <= now
+
+    # Stores value; size is the payload size in bytes
+    def put(self, key, value, size=0, ttl=None):
+        with self._lock:
+            self._store(key, value, size, ttl)
+
+    # Returns cached value or calls loader() -> (value, size) once for all concurrent callers.
+    # A loader error is shared with the waiters; when the loading caller is cancelled or interrupted
+    # the waiters load it themselves.
+    def get_or_load(self, key, loader, ttl=None):
+        while True:
+            entry, future, owner = self._claim(key)
+            if entry is not None:
+                return entry.value
+            if not owner:
+                try:
+                    return future.result()
+                except _Abandoned:
+                    continue
+            try:
+                value, size = loader()
+            except BaseException as e:
+                self._fail(key, future, e)
+                raise
+            self._finish(key, future, value, size, ttl)
+            return value
+
+    # Async variant of get_or_load, loader() must return an awaitable of (value, size)
+    async def aget_or_load(self, key, loader, ttl=None):
+        while True:
+            entry, future, owner = self._claim(key)
+            if entry is not None:
+                return entry.value
+            if not owner:
+                try:
+                    return await asyncio.wrap_future(future)
+                except _Abandoned:
+                    continue
+            try:
+                value, size = await loader()
+            except BaseException as e:
+                self._fail(key, future, e)
+                raise
+            self._finish(key, future, value, size, ttl)
+            return value
+
+    # Drops cached entries
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    # Hit/miss counters and current usage
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.shared
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'shared': self.shared,
+                'evictions': self.evictions,
+                'hit_ratio': (self.hits + self.shared) / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'inflight': len(self._inflight),
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _claim(self, key):
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self.hits += 1
+                return entry, None, False
+            future = self._inflight.get(key)
+            if future is not None:
+                self.shared += 1
+                return None, future, False
+            self.misses += 1
+            future = self._inflight[key] = Future()
+            # Running futures cannot be cancelled, so a cancelled waiter (wrap_future propagates
+            # cancellation to its source) does not cancel the load for everyone else
+            future.set_running_or_notify_cancel()
+            return None, future, True
+
+    def _finish(self, key, future, value, size, ttl):
+        with self._lock:
+            self._store(key, value, size, ttl)
+            self._inflight.pop(key, None)
+        future.set_result(value)
+
+    def _fail(self, key, future, error):
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_exception(error if isinstance(error, Exception) else _Abandoned())
+        # Nobody may wait on the future, avoid "exception never retrieved" noise
+        future.exception()
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= self.clock():
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key, value, size, ttl):
+        if ttl is None:
+            ttl = self.ttl_for(key[0])
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size
+        now = self.clock()
+        self._entries[key] = _Entry(value, size, now, now + ttl)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self.evictions += 1
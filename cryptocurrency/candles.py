@@ -0,0 +1,93 @@
+import numpy as np
+
+from cryptocurrency.trace import traced
+
+EMPTY_TIMESTAMPS = np.empty(0, dtype=np.int64)
+EMPTY_VALUES = np.empty(0, dtype=np.float64)
+MINUTE = 60_000
+
+
+# Bar length (ms) CoinGecko's /ohlc uses for a span of days: 30 minutes up to 2 days, 4 hours up to 30, 4 days beyond
+def candle_interval(days):
+    days = float('inf') if str(days) == 'max' else float(days)
+    if days <= 2:
+        return 30 * MINUTE
+    if days <= 30:
+        return 4 * 60 * MINUTE
+    return 4 * 24 * 60 * MINUTE
+
+
+# OHLC bars stored as contiguous columns: timestamps (int64, ms, end of each bar), open/high/low/close and
+# volumes (float64, NaN where unknown)
+class Candles:
+    __slots__ = ('timestamps', 'open', 'high', 'low', 'close', 'volumes')
+
+    def __init__(self, timestamps, open, high, low, close, volumes=None):
+        self.timestamps = np.ascontiguousarray(timestamps, dtype=np.int64)
+        self.open = np.ascontiguousarray(open, dtype=np.float64)
+        self.high = np.ascontiguousarray(high, dtype=np.float64)
+        self.low = np.ascontiguousarray(low, dtype=np.float64)
+        self.close = np.ascontiguousarray(close, dtype=np.float64)
+        if volumes is None:
+            volumes = np.full(len(self.timestamps), np.nan)
+        self.volumes = np.ascontiguousarray(volumes, dtype=np.float64)
+
+    # Parses /ohlc response: [[timestamp, open, high, low, close], ...]
+    @classmethod
+    @traced('parse.ohlc')
+    def from_response(cls, data):
+        if not isinstance(data, list):
+            raise ValueError('Server is overloaded. Try again later.')
+        if not data:
+            return cls.empty()
+        table = np.array(data, dtype=np.float64).reshape(-1, 5)
+        table = table[~np.isnan(table).any(axis=1)]
+        table = table[np.argsort(table[:, 0], kind='stable')]
+        return cls(table[:, 0], table[:, 1], table[:, 2], table[:, 3], table[:, 4])
+
+    # Aggregates market chart ticks into bars of interval ms, labelled by their end like /ohlc bars.
+    # Volumes are the last 24h volume seen in each bar.
+    @classmethod
+    @traced('candles.aggregate')
+    def from_series(cls, series, interval):
+        if not len(series):
+            return cls.empty()
+        bucket = -(-series.timestamps // interval)
+        starts = np.flatnonzero(np.diff(bucket, prepend=bucket[0] - 1))
+        ends = np.append(starts[1:], len(bucket)) - 1
+        prices = series.prices
+        return cls(bucket[starts] * interval, prices[starts], np.maximum.reduceat(prices, starts),
+                   np.minimum.reduceat(prices, starts), prices[ends], series.volumes[ends])
+
+    @classmethod
+    def empty(cls):
+        return cls(EMPTY_TIMESTAMPS, EMPTY_VALUES, EMPTY_VALUES, EMPTY_VALUES, EMPTY_VALUES, EMPTY_VALUES)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    # Same bars with volumes taken from a market chart series: the last 24h volume known at each bar's end
+    def with_volumes(self, series):
+        index = np.searchsorted(series.timestamps, self.timestamps, side='right') - 1
+        volumes = np.full(len(self), np.nan)
+        known = index >= 0
+        volumes[known] = series.volumes[index[known]]
+        return Candles(self.timestamps, self.open, self.high, self.low, self.close, volumes)
+
+    # At most max_bars bars, merging runs of consecutive bars (first open, highest high, lowest low, last close)
+    def resample(self, max_bars):
+        if len(self) <= max_bars:
+            return self
+        size = -(-len(self) // max(int(max_bars), 1))
+        starts = np.arange(0, len(self), size)
+        ends = np.append(starts[1:], len(self)) - 1
+        return Candles(self.timestamps[ends], self.open[starts], np.maximum.reduceat(self.high, starts),
+                       np.minimum.reduceat(self.low, starts), self.close[ends], self.volumes[ends])
+
+    def datetimes(self):
+        return self.timestamps.astype('datetime64[ms]')
+
+    # Memory held by the columns, used as the response cache size
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self.__slots__)
@@ -0,0 +1,379 @@
+import numpy as np
+from matplotlib import colormaps
+from matplotlib import dates as mdates
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.legend import Legend
+from matplotlib.lines import Line2D
+from matplotlib.path import Path
+from matplotlib.ticker import EngFormatter
+
+from cryptocurrency.hover import HoverTool
+from cryptocurrency.trace import tracer
+
+PRICE_FORMAT = '${x:1.2f}'
+# Y axis of the comparison overlay per normalization (see compare.NORMALIZATIONS)
+COMPARISON_FORMATS = {'percent': '{x:+.0f}%', 'index': '{x:.0f}'}
+COMPARISON_COLORS = colormaps['tab20'].colors
+INDICATOR_COLORS = colormaps['Dark2'].colors
+# Height of each indicator panel as a share of the price axes' original height
+PANEL_HEIGHT = 0.22
+UP_COLOR = '#26A69A'
+DOWN_COLOR = '#EF5350'
+RECTANGLE_CODES = np.array([Path.MOVETO, Path.LINETO, Path.LINETO, Path.LINETO, Path.CLOSEPOLY], dtype=Path.code_type)
+# CoinGecko's total_volumes are rolling 24h sums, the panel shows the one known at each candle's end
+VOLUME_PANEL = '24h volume'
+# Candles closer than this many pixels get their volumes drawn as one outline per color: bars that thin
+# cannot show gaps anyway, and each full height bar would cost Agg two edges across the whole panel
+DENSE_BAR_PIXELS = 2
+
+
+# Price chart with persistent artists.
+# Axes, line, fill and legend are created once; data and theme changes only update them.
+class PriceChart:
+    def __init__(self, figure):
+        self.figure = figure
+        self.canvas = figure.canvas
+        # draw_idle() only schedules the draw on Tk: 'plot.draw' spans from the first request to the finished frame
+        self.draw_requested = None
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+        self.ax = figure.add_subplot(111)
+        self.ax.xaxis_date()
+        self.ax.spines['top'].set_visible(False)
+        self.ax.spines['right'].set_visible(False)
+        self.ax.yaxis.set_major_formatter(PRICE_FORMAT)
+        self.ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+        # There are no minor ticks, don't run the date locator a second time to drop the ones overlapping
+        self.ax.xaxis.remove_overlapping_locs = False
+
+        self.line, = self.ax.plot([], [], label=' ')
+        self.fill = self.ax.fill_between([0, 1], [0, 0], alpha=0.1)
+        self.legend = self.ax.legend()
+        self.hover = HoverTool(self)
+        self.x = np.empty(0)
+        self.y = np.empty(0)
+        # Comparison overlay, created on first use
+        self.overlay = None
+        self.overlay_legend = None
+        self.colors = None
+        # Indicator lines by name, created on first use; indicators that are not overlays get a panel of their
+        # own under the price axes. Toggling only flips visibility, the price line is never redrawn from data.
+        self.indicator_lines = {}
+        self.panels = {}
+        self.frame = self.ax.get_position().bounds
+        # Candlestick mode: bodies, wicks and volume bars are one collection each, holding one compound path per
+        # color (rising, falling), so neither the artists nor the Path objects grow with the number of candles
+        self.bodies = None
+        self.wicks = None
+        self.volume_bars = None
+        self.candle_limits = None
+
+    # Swaps plotted data (matplotlib datenums and prices).
+    # hover_x/hover_y are the full resolution points the crosshair snaps to, defaults to x/y.
+    def set_data(self, x, y, label=None, hover_x=None, hover_y=None):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.line.set_data(self.x, self.y)
+        if hover_x is None:
+            hover_x, hover_y = self.x, self.y
+        self.hover.set_data(hover_x, hover_y)
+        if len(self.x):
+            # Same polygon fill_between builds: down to zero under the line
+            verts = np.empty((len(self.x) + 2, 2))
+            verts[0] = (self.x[0], 0)
+            verts[1:-1, 0] = self.x
+            verts[1:-1, 1] = self.y
+            verts[-1] = (self.x[-1], 0)
+            self.fill.set_verts([verts])
+        else:
+            self.fill.set_verts([])
+
+        if label is not None and label != self.line.get_label():
+            self.line.set_label(label)
+            self.legend.get_texts()[0].set_text(label)
+
+        self.autoscale()
+        self.request_draw()
+
+    # Price axes limits over the visible lines (hidden indicators left out) and the fill baseline or candles
+    def autoscale(self):
+        self.ax.relim(visible_only=True)
+        # relim() ignores collections, include the fill baseline or the candles' extent explicitly
+        if self.bodies is not None and self.bodies.get_visible():
+            self.ax.update_datalim(self.candle_limits)
+        elif len(self.x) and self.fill.get_visible():
+            self.ax.update_datalim([(self.x[0], 0)])
+        self.ax.autoscale_view()
+
+    # Schedules a redraw, the frame's latency is traced until its draw_event
+    def request_draw(self):
+        if self.draw_requested is None and tracer.enabled:
+            self.draw_requested = tracer.clock()
+        self.canvas.draw_idle()
+
+    def on_draw(self, event):
+        if self.draw_requested is not None:
+            tracer.finish('plot.draw', self.draw_requested, tracer.clock(), {})
+            self.draw_requested = None
+
+    # Candlesticks in place of the price line, with volumes in a panel under them. x are datenums of the
+    # candles' centres, width their width in days; the crosshair snaps to close prices.
+    def set_candles(self, x, open, high, low, close, volumes, width):
+        x = np.asarray(x, dtype=np.float64)
+        open, high, low, close = (np.asarray(values, dtype=np.float64) for values in (open, high, low, close))
+        rising = close >= open
+        groups = (rising, ~rising)
+        colors = [UP_COLOR, DOWN_COLOR]
+
+        if self.bodies is None:
+            self.bodies = PolyCollection([], linewidths=0)
+            self.wicks = LineCollection([], linewidths=0.8)
+            self.ax.add_collection(self.wicks, autolim=False)
+            self.ax.add_collection(self.bodies, autolim=False)
+            panel = self.add_panel(VOLUME_PANEL)
+            panel.yaxis.set_major_formatter(EngFormatter(places=0))
+            # Shown below by set_candles_visible(), which lays the panels out
+            panel.set_visible(False)
+            self.volume_bars = PolyCollection([], linewidths=0, alpha=0.6)
+            panel.add_collection(self.volume_bars, autolim=False)
+
+        self.bodies.set_verts_and_codes(*self.rectangles(
+            self.bars(x, width * 0.7, np.minimum(open, close), np.maximum(open, close)), groups))
+        self.bodies.set_facecolor(colors)
+        # Vertical segments separated by NaN points, which break the path when drawn
+        wicks = np.full((len(x), 3, 2), np.nan)
+        wicks[:, :2, 0] = x[:, None]
+        wicks[:, 0, 1] = low
+        wicks[:, 1, 1] = high
+        self.wicks.set_segments([wicks[group].reshape(-1, 2) for group in groups])
+        self.wicks.set_color(colors)
+        self.candle_limits = np.array([[x.min() - width / 2, np.nanmin(low)], [x.max() + width / 2, np.nanmax(high)]]
+                                      if len(x) else np.empty((0, 2)))
+
+        volumes = np.nan_to_num(np.asarray(volumes, dtype=np.float64))
+        if len(x) * DENSE_BAR_PIXELS > self.ax.bbox.width:
+            self.volume_bars.set_verts_and_codes(*self.outlines(x, width, volumes, groups))
+        else:
+            self.volume_bars.set_verts_and_codes(*self.rectangles(
+                self.bars(x, width * 0.7, np.zeros(len(x)), volumes), groups))
+        self.volume_bars.set_facecolor(colors)
+        panel = self.panels[VOLUME_PANEL]
+        panel.set_ylim(0, volumes.max() * 1.05 if len(volumes) and volumes.max() > 0 else 1)
+
+        self.set_candles_visible(True)
+        self.hover.set_data(x, close)
+        self.autoscale()
+        self.request_draw()
+
+    # Back to the price line, followed by set_data()
+    def clear_candles(self):
+        if self.bodies is not None:
+            self.set_candles_visible(False)
+
+    def set_candles_visible(self, visible):
+        for artist in (self.bodies, self.wicks, self.volume_bars):
+            artist.set_visible(visible)
+        self.line.set_visible(not visible)
+        self.fill.set_visible(not visible)
+        panel = self.panels[VOLUME_PANEL]
+        if panel.get_visible() != visible:
+            panel.set_visible(visible)
+            self.layout()
+
+    # Rectangles (n, 4, 2) centred on x from bottom to top
+    @staticmethod
+    def bars(x, width, bottom, top):
+        verts = np.empty((len(x), 4, 2))
+        verts[:, 0:2, 0] = (x - width / 2)[:, None]
+        verts[:, 2:4, 0] = (x + width / 2)[:, None]
+        verts[:, [0, 3], 1] = bottom[:, None]
+        verts[:, [1, 2], 1] = top[:, None]
+        return verts
+
+    # (vertices, codes) of one compound path of closed rectangles per boolean mask in groups
+    @staticmethod
+    def rectangles(verts, groups):
+        closed = np.concatenate([verts, verts[:, :1]], axis=1)
+        return ([closed[group].reshape(-1, 2) for group in groups],
+                [np.tile(RECTANGLE_CODES, int(group.sum())) for group in groups])
+
+    # (vertices, codes) of one closed outline per boolean mask in groups: the top edges of adjacent full width
+    # bars, down to zero under bars outside the mask
+    @staticmethod
+    def outlines(x, width, heights, groups):
+        verts = np.zeros((2 * len(x) + 3, 2))
+        verts[1:-2:2, 0] = x - width / 2
+        verts[2:-2:2, 0] = x + width / 2
+        if len(x):
+            verts[[0, -1], 0] = verts[1, 0]
+            verts[-2, 0] = verts[-3, 0]
+        codes = np.full(len(verts), Path.LINETO, dtype=Path.code_type)
+        codes[0], codes[-1] = Path.MOVETO, Path.CLOSEPOLY
+        outlines = []
+        for group in groups:
+            outline = verts.copy()
+            outline[1:-2, 1] = np.repeat(np.where(group, heights, 0), 2)
+            outlines.append(outline)
+        return outlines, [codes] * len(groups)
+
+    # Shows indicator `name`: lines is {label: y} over datenums x, drawn over the price line when overlay,
+    # otherwise in a panel under it
+    def set_indicator(self, name, x, lines, overlay=True):
+        artists = self.indicator_lines.get(name)
+        if artists is None:
+            ax = self.ax if overlay else self.add_panel(name)
+            color = INDICATOR_COLORS[len(self.indicator_lines) % len(INDICATOR_COLORS)]
+            artists = self.indicator_lines[name] = [
+                ax.plot([], [], color=color, linewidth=1, alpha=0.9 if i == 0 else 0.6, label=label,
+                        visible=False)[0]
+                for i, label in enumerate(lines)]
+        for artist, y in zip(artists, lines.values()):
+            artist.set_data(x, y)
+        self.set_indicator_visible(name, True)
+
+    def hide_indicator(self, name):
+        if name in self.indicator_lines:
+            self.set_indicator_visible(name, False)
+
+    def set_indicator_visible(self, name, visible):
+        artists = self.indicator_lines[name]
+        changed = artists[0].get_visible() != visible
+        for artist in artists:
+            artist.set_visible(visible)
+        panel = self.panels.get(name)
+        if panel is not None:
+            panel.set_visible(visible)
+            if changed:
+                self.layout()
+            if visible:
+                panel.relim(visible_only=True)
+                panel.autoscale_view()
+        else:
+            if changed:
+                self.update_legend()
+            self.autoscale()
+        self.request_draw()
+
+    # Axes sharing the price axes' dates, placed by layout()
+    def add_panel(self, name):
+        panel = self.figure.add_axes(self.frame, sharex=self.ax)
+        panel.xaxis.remove_overlapping_locs = False
+        panel.set_ylabel(name, fontsize='small')
+        panel.tick_params(axis='y', labelsize='small')
+        panel.spines['top'].set_visible(False)
+        panel.spines['right'].set_visible(False)
+        if self.colors is not None:
+            self.style_axes(panel, self.colors)
+        self.panels[name] = panel
+        return panel
+
+    # Stacks visible panels under the price axes, dates are labelled on the lowest axes only
+    def layout(self):
+        visible = [panel for panel in self.panels.values() if panel.get_visible()]
+        left, bottom, width, height = self.frame
+        step = height * PANEL_HEIGHT
+        self.ax.set_position([left, bottom + step * len(visible), width, height - step * len(visible)])
+        self.ax.tick_params(axis='x', labelbottom=not visible)
+        for i, panel in enumerate(visible):
+            panel.set_position([left, bottom + step * (len(visible) - 1 - i), width, step * 0.85])
+            panel.tick_params(axis='x', labelbottom=i == len(visible) - 1)
+
+    # Price legend: the price line followed by the visible overlay indicators
+    def update_legend(self):
+        handles = [self.line] + [artists[0] for name, artists in self.indicator_lines.items()
+                                 if name not in self.panels and artists[0].get_visible()]
+        labels = [self.line.get_label()] + [name for name, artists in self.indicator_lines.items()
+                                            if name not in self.panels and artists[0].get_visible()]
+        visible = self.legend.get_visible()
+        self.legend = self.ax.legend(handles, labels)
+        self.legend.set_visible(visible)
+        if self.colors is not None:
+            self.style_legend(self.legend, self.colors)
+
+    # Overlays several coins as one LineCollection in place of the price line, so redraw cost does not
+    # grow with an artist per coin. x are datenums shared by all rows of values (one row per label).
+    def set_comparison(self, x, values, labels, mode='percent'):
+        x = np.asarray(x, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        segments = np.empty(values.shape + (2,))
+        segments[:, :, 0] = x
+        segments[:, :, 1] = values
+        colors = [COMPARISON_COLORS[i % len(COMPARISON_COLORS)] for i in range(len(values))]
+
+        if self.overlay is None:
+            self.overlay = LineCollection([], linewidths=1.2)
+            self.ax.add_collection(self.overlay, autolim=False)
+        self.overlay.set_segments(segments)
+        self.overlay.set_color(colors)
+        self.overlay.set_visible(True)
+        # Indicators and candles belong to the price chart, the caller shows them again after clear_comparison()
+        for name in self.indicator_lines:
+            self.hide_indicator(name)
+        if self.bodies is not None:
+            self.set_candles_visible(False)
+        self.line.set_visible(False)
+        self.fill.set_visible(False)
+        self.legend.set_visible(False)
+
+        labels = list(labels)
+        if self.overlay_legend is None or [t.get_text() for t in self.overlay_legend.get_texts()] != labels:
+            if self.overlay_legend is not None:
+                self.overlay_legend.remove()
+            handles = [Line2D([], [], color=color, linewidth=1.2) for color in colors]
+            self.overlay_legend = Legend(self.ax, handles, labels, loc='upper left', fontsize='small',
+                                         ncols=2 if len(labels) > 8 else 1)
+            self.ax.add_artist(self.overlay_legend)
+            if self.colors is not None:
+                self.style_legend(self.overlay_legend, self.colors)
+        self.overlay_legend.set_visible(True)
+
+        self.ax.yaxis.set_major_formatter(COMPARISON_FORMATS[mode])
+        self.hover.set_data([], [])
+        # relim() ignores collections, so the limits come from the segments
+        self.ax.relim(visible_only=True)
+        points = segments.reshape(-1, 2)
+        self.ax.update_datalim(points[np.isfinite(points).all(axis=1)])
+        self.ax.autoscale_view()
+        self.request_draw()
+
+    # Back to the single price line, followed by set_data()
+    def clear_comparison(self):
+        if self.overlay is not None:
+            self.overlay.set_visible(False)
+            self.overlay_legend.set_visible(False)
+        self.line.set_visible(True)
+        self.fill.set_visible(True)
+        self.legend.set_visible(True)
+        self.ax.yaxis.set_major_formatter(PRICE_FORMAT)
+
+    @staticmethod
+    def style_legend(legend, colors):
+        legend.get_frame().set_facecolor(colors['background'])
+        legend.get_frame().set_edgecolor(colors['text'])
+        for text in legend.get_texts():
+            text.set_color(colors['text'])
+
+    @staticmethod
+    def style_axes(ax, colors):
+        ax.set_facecolor(colors['background'])
+        ax.spines['bottom'].set_color(colors['text'])
+        ax.spines['left'].set_color(colors['text'])
+        ax.tick_params(axis='x', colors=colors['text'])
+        ax.tick_params(axis='y', colors=colors['text'])
+        ax.yaxis.label.set_color(colors['text'])
+
+    # Restyles existing artists
+    def apply_theme(self, colors):
+        self.colors = colors
+        self.figure.patch.set_facecolor(colors['background'])
+        self.style_axes(self.ax, colors)
+        for panel in self.panels.values():
+            self.style_axes(panel, colors)
+
+        self.line.set_color(colors['line'])
+        self.fill.set_facecolor(colors['fill'])
+        self.legend.get_lines()[0].set_color(colors['line'])
+        self.style_legend(self.legend, colors)
+        if self.overlay_legend is not None:
+            self.style_legend(self.overlay_legend, colors)
+        self.hover.apply_theme(colors)
+        self.request_draw()
@@ -0,0 +1,245 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from cryptocurrency.series import MarketSeries
+from cryptocurrency.trace import traced
+
+MINUTE = 60 * 1000
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# CoinGecko picks point spacing from the requested range: 5 minutes for 1 day,
+# hourly up to 90 days and daily above that
+GRANULARITY_STEP = {
+    'minutely': 5 * MINUTE,
+    'hourly': HOUR,
+    'daily': DAY,
+}
+
+# Longest tail /market_chart/range still answers at the granularity's spacing (its spacing also depends
+# on the range), older stores are fetched in full instead of being filled with coarser points
+TAIL_REACH = {
+    'minutely': DAY,
+    'hourly': 90 * DAY,
+    'daily': None,
+}
+
+# How long points are kept per granularity (None keeps everything)
+GRANULARITY_RETENTION = {
+    'minutely': 2 * DAY,
+    'hourly': 91 * DAY,
+    'daily': None,
+}
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS points (
+    coin TEXT NOT NULL,
+    vs_currency TEXT NOT NULL,
+    granularity TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    price REAL NOT NULL,
+    volume REAL,
+    PRIMARY KEY (coin, vs_currency, granularity, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS series (
+    coin TEXT NOT NULL,
+    vs_currency TEXT NOT NULL,
+    granularity TEXT NOT NULL,
+    covered_from INTEGER NOT NULL,
+    fetched_at INTEGER NOT NULL,
+    PRIMARY KEY (coin, vs_currency, granularity)
+);
+'''
+
+
+# Default store location, can be moved with CRYPTOCURRENCY_CACHE_DIR
+def default_store_path():
+    cache_dir = os.environ.get('CRYPTOCURRENCY_CACHE_DIR') or os.path.join(
+        os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'cryptocurrency')
+    return os.path.join(cache_dir, 'market_chart.sqlite3')
+
+
+# Maps /market_chart "days" value to the granularity CoinGecko returns for it
+def granularity_for(days):
+    if str(days) == 'max':
+        return 'daily'
+    days = float(days)
+    if days <= 1:
+        return 'minutely'
+    if days <= 90:
+        return 'hourly'
+    return 'daily'
+
+
+# Persistent market chart store keyed by coin/vs_currency/granularity.
+# Serves stored points and fetches only the tail newer than the last stored timestamp.
+class MarketChartStore:
+    def __init__(self, client, path=None, refresh_interval=60, clock=time.time, executor=None):
+        self.client = client
+        # Async calls run SQLite and parsing work here instead of on the event loop
+        self.executor = executor
+        self.path = path or default_store_path()
+        self.refresh_interval = refresh_interval * 1000
+        self.clock = clock
+
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    # Gets market chart as MarketSeries, fetching only what is missing
+    def market_chart(self, coin, days, vs_currency='usd'):
+        action, start = self._plan(coin, vs_currency, days)
+        if action == 'full':
+            data = self.client.market_chart(coin, days, vs_currency)
+        elif action == 'tail':
+            data = self.client.market_chart_range(coin, start // 1000, self._now() // 1000, vs_currency)
+        else:
+            data = None
+        return self._complete(coin, vs_currency, days, action, data)
+
+    # Async variant of market_chart, must be awaited on the client loop
+    async def amarket_chart(self, coin, days, vs_currency='usd'):
+        loop = asyncio.get_running_loop()
+        action, start = await loop.run_in_executor(self.executor, self._plan, coin, vs_currency, days)
+        return await self._arefresh(coin, days, vs_currency, action, start)
+
+    # Stale-while-revalidate variant of amarket_chart, an async generator: yields (stored series, age in
+    # seconds) right away when the store covers the window, then (refreshed series, 0) if it was out of date
+    async def arevalidate(self, coin, days, vs_currency='usd'):
+        loop = asyncio.get_running_loop()
+        action, start = await loop.run_in_executor(self.executor, self._plan, coin, vs_currency, days)
+        if action != 'full':
+            series, fetched_at = await loop.run_in_executor(self.executor, self._stored, coin, vs_currency, days)
+            if len(series):
+                yield series, (self._now() - fetched_at) / 1000
+                if action == 'none':
+                    return
+        yield await self._arefresh(coin, days, vs_currency, action, start), 0
+
+    # Last stored timestamp (ms) or None
+    def last_timestamp(self, coin, days, vs_currency='usd'):
+        with self._lock:
+            row = self._db.execute('SELECT MAX(ts) FROM points WHERE coin=? AND vs_currency=? AND granularity=?',
+                                   (coin, vs_currency, granularity_for(days))).fetchone()
+        return row[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _now(self):
+        return int(self.clock() * 1000)
+
+    def _start(self, days):
+        if str(days) == 'max':
+            return 0
+        return self._now() - int(float(days) * DAY)
+
+    async def _arefresh(self, coin, days, vs_currency, action, start):
+        loop = asyncio.get_running_loop()
+        if action == 'full':
+            data = await self.client.amarket_chart(coin, days, vs_currency)
+        elif action == 'tail':
+            data = await self.client.amarket_chart_range(coin, start // 1000, self._now() // 1000, vs_currency)
+        else:
+            data = None
+        return await loop.run_in_executor(self.executor, self._complete, coin, vs_currency, days, action, data)
+
+    # Decides whether stored points are enough ('none'), need a tail ('tail') or a full fetch ('full')
+    def _plan(self, coin, vs_currency, days):
+        granularity = granularity_for(days)
+        with self._lock:
+            meta = self._db.execute(
+                'SELECT covered_from, fetched_at FROM series WHERE coin=? AND vs_currency=? AND granularity=?',
+                (coin, vs_currency, granularity)).fetchone()
+            last_ts = self._db.execute(
+                'SELECT MAX(ts) FROM points WHERE coin=? AND vs_currency=? AND granularity=?',
+                (coin, vs_currency, granularity)).fetchone()[0]
+        if meta is None or last_ts is None or self._start(days) < meta[0]:
+            return 'full', None
+        if self._now() - meta[1] < self.refresh_interval:
+            return 'none', None
+        reach = TAIL_REACH[granularity]
+        if reach is not None and self._now() - last_ts > reach:
+            return 'full', None
+        return 'tail', last_ts
+
+    # Stored series for the window and when it was last fetched (ms)
+    def _stored(self, coin, vs_currency, days):
+        granularity = granularity_for(days)
+        with self._lock:
+            fetched_at = self._db.execute(
+                'SELECT fetched_at FROM series WHERE coin=? AND vs_currency=? AND granularity=?',
+                (coin, vs_currency, granularity)).fetchone()[0]
+            return self._read(coin, vs_currency, granularity, self._start(days)), fetched_at
+
+    @traced('chart_store.complete')
+    def _complete(self, coin, vs_currency, days, action, data):
+        # Raises ValueError on error payloads (e.g. rate limited) before anything is stored
+        series = MarketSeries.from_response(data) if data is not None else None
+        granularity = granularity_for(days)
+        with self._lock:
+            if action == 'full':
+                # Fresh full response is authoritative, no need to read it back
+                self._replace(coin, vs_currency, granularity, days, series)
+                return series
+            if action == 'tail':
+                self._merge_tail(coin, vs_currency, granularity, series)
+            return self._read(coin, vs_currency, granularity, self._start(days))
+
+    def _replace(self, coin, vs_currency, granularity, days, series):
+        key = (coin, vs_currency, granularity)
+        with self._db:
+            if len(series):
+                self._db.execute('DELETE FROM points WHERE coin=? AND vs_currency=? AND granularity=? AND ts>=?',
+                                 key + (int(series.timestamps[0]),))
+            self._insert(key, series)
+            self._finish(key, self._start(days))
+
+    def _merge_tail(self, coin, vs_currency, granularity, series):
+        key = (coin, vs_currency, granularity)
+        step = GRANULARITY_STEP[granularity]
+        last_ts = self._db.execute('SELECT MAX(ts) FROM points WHERE coin=? AND vs_currency=? AND granularity=?',
+                                   key).fetchone()[0]
+        covered_from = self._db.execute(
+            'SELECT covered_from FROM series WHERE coin=? AND vs_currency=? AND granularity=?', key).fetchone()[0]
+
+        # Range endpoint returns finer points than stored, keep the latest point per bucket
+        series = series.since(last_ts + 1)
+        buckets = series.timestamps // step
+        keep = np.append(buckets[1:] != buckets[:-1], True) if len(series) else np.empty(0, dtype=bool)
+        series = MarketSeries(series.timestamps[keep], series.prices[keep], series.volumes[keep])
+
+        with self._db:
+            if len(series) and last_ts // step == buckets[0]:
+                # Last stored point was a live snapshot inside a bucket that is now newer
+                self._db.execute('DELETE FROM points WHERE coin=? AND vs_currency=? AND granularity=? AND ts=?',
+                                 key + (last_ts,))
+            self._insert(key, series)
+            self._finish(key, covered_from)
+
+    def _insert(self, key, series):
+        self._db.executemany('INSERT OR REPLACE INTO points VALUES (?, ?, ?, ?, ?, ?)',
+                             [key + row for row in series.rows()])
+
+    def _finish(self, key, covered_from):
+        retention = GRANULARITY_RETENTION[key[2]]
+        if retention is not None:
+            cutoff = self._now() - retention
+            self._db.execute('DELETE FROM points WHERE coin=? AND vs_currency=? AND granularity=? AND ts<?',
+                             key + (cutoff,))
+            covered_from = max(covered_from, cutoff)
+        self._db.execute('INSERT OR REPLACE INTO series VALUES (?, ?, ?, ?, ?)', key + (covered_from, self._now()))
+
+    def _read(self, coin, vs_currency, granularity, start):
+        rows = self._db.execute(
+            'SELECT ts, price, volume FROM points WHERE coin=? AND vs_currency=? AND granularity=? AND ts>=? '
+            'ORDER BY ts', (coin, vs_currency, granularity, start)).fetchall()
+        return MarketSeries.from_rows(rows)
@@ -0,0 +1,344 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from cryptocurrency.cache import ResponseCache
+from cryptocurrency.coin_detail import COIN_DETAIL_PARAMS, CoinDetail
+from cryptocurrency.fixtures import RECORD_DIR_ENV, FixtureStore
+from cryptocurrency.ratelimit import CircuitBreaker, RateLimiter, backoff_delay, parse_retry_after, priority_for
+from cryptocurrency.trace import span
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = 'https://api.coingecko.com/api/v3'
+
+# Base URL can be pointed at a local stand-in server without touching the code
+BASE_URL_ENV = 'COINGECKO_BASE_URL'
+
+# Statuses worth retrying, 429 additionally pauses the rate limiter for Retry-After
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+
+class APIError(Exception):
+    def __init__(self, path, status, body=b''):
+        super().__init__(f'{path} failed with HTTP {status}')
+        self.path = path
+        self.status = status
+        self.body = body
+
+    # True when the server asked us to slow down
+    @property
+    def throttled(self):
+        return self.status == 429
+
+
+# Single entry point to the CoinGecko API.
+# Keeps one keep-alive requests.Session for blocking calls and one aiohttp.ClientSession,
+# owned by a background event loop, for concurrent calls. Responses go through a shared ResponseCache;
+# cache misses wait for a RateLimiter token (by priority, see ratelimit.request_priority), are retried
+# with jittered backoff and stop early while the CircuitBreaker is open.
+class CoinGeckoClient:
+    def __init__(self, base_url=None, connect_timeout=3.05, read_timeout=10, pool_size=10, cache=None,
+                 limiter=None, breaker=None, max_retries=3, recorder=None):
+        self.base_url = (base_url or os.environ.get(BASE_URL_ENV) or DEFAULT_BASE_URL).rstrip('/')
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.pool_size = pool_size
+        self.cache = cache if cache is not None else ResponseCache()
+        self.limiter = limiter if limiter is not None else RateLimiter()
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.max_retries = max_retries
+        self.retries = 0
+        self._retries_lock = threading.Lock()
+        # Records successful responses as fixtures for the stand-in server (cryptocurrency.standin)
+        record_dir = os.environ.get(RECORD_DIR_ENV)
+        self.recorder = recorder if recorder is not None else (FixtureStore(record_dir) if record_dir else None)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'Accept': 'application/json'})
+
+        self._loop = None
+        self._loop_thread = None
+        self._async_session = None
+        self._loop_lock = threading.Lock()
+
+    # Builds absolute URL for API path
+    def url(self, path):
+        return f'{self.base_url}/{path.lstrip("/")}'
+
+    # Blocking GET returning decoded JSON, served from cache when fresh.
+    # parse(decoded) -> record is applied before caching, so only the record is kept.
+    def get(self, path, params=None, parse=None):
+        return self.cache.get_or_load(self.cache.key(path, params), lambda: self._fetch(path, params, parse))
+
+    # Non-blocking GET returning decoded JSON, must be awaited on the client loop
+    async def aget(self, path, params=None, parse=None):
+        return await self.cache.aget_or_load(self.cache.key(path, params),
+                                             lambda: self._afetch(path, params, parse))
+
+    # Stale-while-revalidate GET, an async generator: yields (last known value, age in seconds) right away
+    # when one is cached and, unless it is still fresh, (fetched value, 0) once the refetch lands
+    async def arevalidate(self, path, params=None, parse=None):
+        known = self.cache.peek(self.cache.key(path, params))
+        if known is not None:
+            value, age, expired = known
+            yield value, age
+            if not expired:
+                return
+        yield await self.aget(path, params, parse), 0
+
+    # Cache hit/miss counters
+    def cache_stats(self):
+        return self.cache.stats()
+
+    # Rate limiter queue depth and waits, retries and circuit breaker state
+    def throttle_stats(self):
+        stats = self.limiter.stats()
+        stats.update(retries=self.retries, circuit=self.breaker.state, circuit_trips=self.breaker.trips)
+        return stats
+
+    # Runs coroutine on the client loop and returns concurrent.futures.Future
+    def submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    # Runs coroutine on the client loop and waits for its result
+    def run(self, coro, timeout=None):
+        return self.submit(coro).result(timeout)
+
+    # Calls callback(*args) on the client loop after delay seconds
+    def call_later(self, delay, callback, *args):
+        loop = self._ensure_loop()
+        loop.call_soon_threadsafe(loop.call_later, delay, callback, *args)
+
+    # Gets current prices for one or more coins, optionally with 24h change
+    def simple_price(self, ids, vs_currencies='usd', include_24hr_change=False):
+        return self.get('simple/price', self._simple_price_params(ids, vs_currencies, include_24hr_change))
+
+    async def asimple_price(self, ids, vs_currencies='usd', include_24hr_change=False):
+        return await self.aget('simple/price', self._simple_price_params(ids, vs_currencies, include_24hr_change))
+
+    # Gets historical prices and volumes
+    def market_chart(self, coin_id, days, vs_currency='usd'):
+        return self.get(f'coins/{coin_id}/market_chart', {'vs_currency': vs_currency, 'days': days})
+
+    async def amarket_chart(self, coin_id, days, vs_currency='usd'):
+        return await self.aget(f'coins/{coin_id}/market_chart', {'vs_currency': vs_currency, 'days': days})
+
+    # Gets historical prices and volumes between two unix timestamps (seconds)
+    def market_chart_range(self, coin_id, from_timestamp, to_timestamp, vs_currency='usd'):
+        return self.get(f'coins/{coin_id}/market_chart/range',
+                        {'vs_currency': vs_currency, 'from': from_timestamp, 'to': to_timestamp})
+
+    async def amarket_chart_range(self, coin_id, from_timestamp, to_timestamp, vs_currency='usd'):
+        return await self.aget(f'coins/{coin_id}/market_chart/range',
+                               {'vs_currency': vs_currency, 'from': from_timestamp, 'to': to_timestamp})
+
+    # Gets OHLC candles, their length depends on days (see candles.candle_interval)
+    def ohlc(self, coin_id, days, vs_currency='usd'):
+        from cryptocurrency.candles import Candles
+        return self.get(f'coins/{coin_id}/ohlc', {'vs_currency': vs_currency, 'days': days}, Candles.from_response)
+
+    async def aohlc(self, coin_id, days, vs_currency='usd'):
+        from cryptocurrency.candles import Candles
+        return await self.aget(f'coins/{coin_id}/ohlc', {'vs_currency': vs_currency, 'days': days},
+                               Candles.from_response)
+
+    # Gets coin details (description, links)
+    def coin(self, coin_id):
+        return self.get(f'coins/{coin_id}', COIN_DETAIL_PARAMS, CoinDetail.from_response)
+
+    async def acoin(self, coin_id):
+        return await self.aget(f'coins/{coin_id}', COIN_DETAIL_PARAMS, CoinDetail.from_response)
+
+    # Gets ids, symbols and names of every listed coin
+    def coins_list(self):
+        return self.get('coins/list')
+
+    async def acoins_list(self):
+        return await self.aget('coins/list')
+
+    # Gets global market data
+    def global_data(self):
+        return self.get('global')
+
+    async def aglobal_data(self):
+        return await self.aget('global')
+
+    # Gets a page of coins sorted by market cap
+    def markets(self, page=1, per_page=100, vs_currency='usd'):
+        return self.get('coins/markets', self._markets_params(page, per_page, vs_currency))
+
+    async def amarkets(self, page=1, per_page=100, vs_currency='usd'):
+        return await self.aget('coins/markets', self._markets_params(page, per_page, vs_currency))
+
+    # Stale-while-revalidate variants of the endpoints shown in the UI, see arevalidate
+    def revalidate_price(self, ids, vs_currencies='usd'):
+        return self.arevalidate('simple/price', self._simple_price_params(ids, vs_currencies))
+
+    def revalidate_coin(self, coin_id):
+        return self.arevalidate(f'coins/{coin_id}', COIN_DETAIL_PARAMS, CoinDetail.from_response)
+
+    def revalidate_global(self):
+        return self.arevalidate('global')
+
+    # Closes both HTTP sessions and stops the client loop
+    def close(self):
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            if self._async_session is not None:
+                asyncio.run_coroutine_threadsafe(self._async_session.close(), loop).result(5)
+                self._async_session = None
+            loop.call_soon_threadsafe(loop.stop)
+            self._loop_thread.join(5)
+            loop.close()
+        self.session.close()
+
+    def _fetch(self, path, params, parse=None):
+        priority = priority_for(path)
+        attempt = 0
+        while True:
+            # Rejected before taking a token: an open circuit must not spend rate limit budget
+            trial = self.breaker.before_request()
+            try:
+                self.limiter.acquire(priority)
+                with span('http', path=path, attempt=attempt):
+                    response = self.session.get(self.url(path), params=params,
+                                                timeout=(self.connect_timeout, self.read_timeout))
+            except (requests.ConnectionError, requests.Timeout) as e:
+                delay = self._transport_failed(path, e, attempt)
+            else:
+                delay = self._check_status(path, response.status_code, response.ok, response.headers,
+                                           response.content, attempt)
+                if delay is None:
+                    with span('parse.json', path=path):
+                        value = response.json()
+                    self._record(path, params, value)
+                    return self._parse(path, value, parse, len(response.content))
+            finally:
+                if trial:
+                    self.breaker.release_trial()
+            time.sleep(delay)
+            attempt += 1
+
+    async def _afetch(self, path, params, parse=None):
+        import aiohttp
+        session = self._get_async_session()
+        priority = priority_for(path)
+        attempt = 0
+        while True:
+            trial = self.breaker.before_request()
+            try:
+                await self.limiter.aacquire(priority)
+                with span('http', path=path, attempt=attempt):
+                    async with session.get(self.url(path), params=params) as response:
+                        body = await response.read()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                delay = self._transport_failed(path, e, attempt)
+            else:
+                delay = self._check_status(path, response.status, response.ok, response.headers, body, attempt)
+                if delay is None:
+                    with span('parse.json', path=path):
+                        value = json.loads(body)
+                    self._record(path, params, value)
+                    return self._parse(path, value, parse, len(body))
+            finally:
+                # Cancelled or failed without an outcome: the trial must not block the circuit for good
+                if trial:
+                    self.breaker.release_trial()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _record(self, path, params, value):
+        if self.recorder is not None:
+            self.recorder.save(path, params, value)
+
+    # (value, cache size): parsed records are sized by their nbytes, raw responses by their body
+    @staticmethod
+    def _parse(path, value, parse, size):
+        if parse is None:
+            return value, size
+        with span('parse.record', path=path):
+            record = parse(value)
+        return record, getattr(record, 'nbytes', size)
+
+    # Returns None when the response can be used, otherwise seconds to wait before the next attempt.
+    # Raises APIError for statuses that are not retryable or when retries are exhausted.
+    def _check_status(self, path, status, ok, headers, body, attempt):
+        if ok:
+            self.breaker.record_success()
+            return None
+        if status not in RETRY_STATUSES:
+            # Server is healthy, the request itself is wrong (e.g. unknown coin)
+            self.breaker.record_success()
+            raise APIError(path, status, body)
+        self.breaker.record_failure()
+        if attempt >= self.max_retries:
+            raise APIError(path, status, body)
+        self._count_retry()
+        delay = backoff_delay(attempt)
+        if status == 429:
+            retry_after = parse_retry_after(headers.get('Retry-After'))
+            self.limiter.throttle(retry_after if retry_after is not None else delay)
+            logger.warning('%s throttled (HTTP 429), pausing requests', path)
+            return 0
+        logger.warning('%s failed with HTTP %s, retrying in %.1fs', path, status, delay)
+        return delay
+
+    # Seconds to wait before retrying after a connection error or timeout, re-raises when retries are exhausted
+    def _transport_failed(self, path, error, attempt):
+        self.breaker.record_failure()
+        if attempt >= self.max_retries:
+            raise error
+        self._count_retry()
+        delay = backoff_delay(attempt)
+        logger.warning('%s failed (%s), retrying in %.1fs', path, error, delay)
+        return delay
+
+    # Retries are counted from the requests threads and the client loop
+    def _count_retry(self):
+        with self._retries_lock:
+            self.retries += 1
+
+    def _simple_price_params(self, ids, vs_currencies, include_24hr_change=False):
+        if not isinstance(ids, str):
+            ids = ','.join(ids)
+        if not isinstance(vs_currencies, str):
+            vs_currencies = ','.join(vs_currencies)
+        params = {'ids': ids, 'vs_currencies': vs_currencies}
+        if include_24hr_change:
+            params['include_24hr_change'] = 'true'
+        return params
+
+    def _markets_params(self, page, per_page, vs_currency):
+        return {'vs_currency': vs_currency, 'order': 'market_cap_desc', 'per_page': per_page, 'page': page}
+
+    # Starts the background event loop on first use
+    def _ensure_loop(self):
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(target=self._loop.run_forever,
+                                                     name='coingecko-client', daemon=True)
+                self._loop_thread.start()
+            return self._loop
+
+    # aiohttp session is bound to the loop, so it is created lazily from inside it
+    def _get_async_session(self):
+        if self._async_session is None:
+            # Imported here, on the client loop thread, to keep aiohttp off the app's startup path
+            import aiohttp
+            timeout = aiohttp.ClientTimeout(sock_connect=self.connect_timeout, sock_read=self.read_timeout)
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            self._async_session = aiohttp.ClientSession(timeout=timeout, connector=connector,
+                                                        headers={'Accept': 'application/json'})
+        return self._async_session
@@ -0,0 +1,56 @@
+import sys
+
+# Query for /coins/{id} leaving out what the coin view never reads: localized names and descriptions,
+# tickers, market data, community and developer stats. Cuts the response from hundreds of KB to a few.
+COIN_DETAIL_PARAMS = {
+    'localization': 'false',
+    'tickers': 'false',
+    'market_data': 'false',
+    'community_data': 'false',
+    'developer_data': 'false',
+    'sparkline': 'false',
+}
+
+NO_DESCRIPTION = 'No description available'
+
+
+# Fields of /coins/{id} shown next to the chart, kept instead of the decoded response
+class CoinDetail:
+    __slots__ = ('id', 'symbol', 'name', 'description', 'twitter', 'facebook', 'reddit')
+
+    def __init__(self, id, symbol='', name='', description=NO_DESCRIPTION, twitter=None, facebook=None,
+                 reddit=None):
+        self.id = id
+        self.symbol = symbol
+        self.name = name
+        self.description = description
+        self.twitter = twitter
+        self.facebook = facebook
+        self.reddit = reddit
+
+    # Parses /coins/{id} response (full or requested with COIN_DETAIL_PARAMS)
+    @classmethod
+    def from_response(cls, data):
+        links = data.get('links') or {}
+        return cls(
+            data.get('id', ''),
+            data.get('symbol', ''),
+            data.get('name', ''),
+            (data.get('description') or {}).get('en', NO_DESCRIPTION),
+            links.get('twitter_screen_name'),
+            links.get('facebook_username'),
+            links.get('subreddit_url'),
+        )
+
+    # Approximate memory held by the record, used as its response cache size
+    @property
+    def nbytes(self):
+        return sys.getsizeof(self) + sum(sys.getsizeof(getattr(self, name)) for name in self.__slots__)
+
+    def __eq__(self, other):
+        if not isinstance(other, CoinDetail):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f'CoinDetail({self.id!r}, name={self.name!r})'
@@ -0,0 +1,219 @@
+import math
+
+import customtkinter as ctk
+
+from cryptocurrency.trace import traced
+
+# How long the pointer has to rest on a card before on_hover is called
+HOVER_DELAY_MS = 400
+
+
+# Formats coin fields the way the list shows them
+def coin_texts(coin):
+    # Coins known only from /coins/list have no market data
+    if 'current_price' not in coin:
+        return {'name': coin.get('name', 'N/A'), 'rank': '', 'price': 'N/A', 'change': '', 'change_color': 'gray'}
+    change = coin.get('price_change_percentage_24h') or 0
+    return {
+        'name': coin.get('name', 'N/A'),
+        'rank': f'#{coin.get("market_cap_rank", "N/A")}',
+        'price': f"${coin.get('current_price') or 0:,}",
+        'change': f'{change:.2f}%',
+        'change_color': 'green' if change >= 0 else 'red',
+    }
+
+
+# One coin card, created once and rebound to different coins while scrolling
+class CoinCard(ctk.CTkFrame):
+    def __init__(self, master, on_select, on_hover=None, height=66):
+        super().__init__(master, height=height)
+        self.on_select = on_select
+        self.on_hover = on_hover
+        self.hover_job = None
+        self.coin = None
+        self.coin_id = None
+        self.texts = {}
+        self.placed_at = None
+        self.grid_propagate(False)
+        self.grid_columnconfigure(0, weight=1)
+
+        name_frame = ctk.CTkFrame(self)
+        name_frame.grid(row=0, column=0, pady=(5, 0), sticky='ew')
+        name_frame.grid_columnconfigure(0, weight=1)
+
+        self.coin_label = ctk.CTkLabel(name_frame, text='', font=("Roboto", 14, "bold"))
+        self.coin_label.grid(row=0, column=0, padx=5, pady=(0, 5), sticky='ew')
+
+        self.rank_label = ctk.CTkLabel(name_frame, text='', font=("Roboto", 10), text_color="#808080")
+        self.rank_label.grid(row=0, column=1, padx=5, pady=(0, 5), sticky='e')
+
+        info_frame = ctk.CTkFrame(self)
+        info_frame.grid(row=1, column=0, sticky='ew')
+        info_frame.grid_columnconfigure((0, 1), weight=1)
+
+        self.price_label = ctk.CTkLabel(info_frame, text='', font=("Roboto", 12))
+        self.price_label.grid(row=0, column=0, padx=5, sticky='w')
+
+        self.change_label = ctk.CTkLabel(info_frame, text='', font=("Roboto", 12))
+        self.change_label.grid(row=0, column=1, padx=5, sticky='e')
+
+        # Bound once, handlers read the coin currently shown by the card
+        for label in (self.coin_label, self.price_label, self.change_label):
+            label.bind('<Button-1>', self.clicked)
+            label.bind('<Enter>', self.entered)
+            label.bind('<Leave>', self.left)
+
+    # Shows coin, only labels whose text changed are reconfigured
+    def bind_coin(self, coin):
+        self.coin = coin
+        self.coin_id = coin.get('id')
+        texts = coin_texts(coin)
+        if texts['name'] != self.texts.get('name'):
+            self.coin_label.configure(text=texts['name'])
+        if texts['rank'] != self.texts.get('rank'):
+            self.rank_label.configure(text=texts['rank'])
+        if texts['price'] != self.texts.get('price'):
+            self.price_label.configure(text=texts['price'])
+        if texts['change'] != self.texts.get('change') or texts['change_color'] != self.texts.get('change_color'):
+            self.change_label.configure(text=texts['change'], text_color=texts['change_color'])
+        self.texts = texts
+
+    def clicked(self, event):
+        if self.coin_id is not None:
+            self.on_select(self.coin_id)
+
+    def entered(self, event):
+        event.widget.config(cursor='hand2')
+        if self.on_hover is not None and self.coin_id is not None:
+            self.cancel_hover()
+            self.hover_job = self.after(HOVER_DELAY_MS, self.hovered, self.coin_id)
+
+    def left(self, event):
+        event.widget.config(cursor='')
+        self.cancel_hover()
+
+    def cancel_hover(self):
+        if self.hover_job is not None:
+            self.after_cancel(self.hover_job)
+            self.hover_job = None
+
+    def hovered(self, coin_id):
+        self.hover_job = None
+        # Card may have been rebound to another coin by scrolling meanwhile
+        if coin_id == self.coin_id:
+            self.on_hover(coin_id)
+
+
+# Scrollable coins grid that only creates cards for the visible rows.
+# Cards come from a pool and are rebound to other coins on scroll or when the data changes.
+class VirtualCoinList(ctk.CTkFrame):
+    def __init__(self, master, on_select, on_hover=None, columns=2, row_height=76, **kwargs):
+        super().__init__(master, **kwargs)
+        self.on_select = on_select
+        self.on_hover = on_hover
+        self.columns = columns
+        self.row_height = row_height
+        self.coins = []
+        self.offset = 0
+        self.pool = []
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+        self.body = ctk.CTkFrame(self, fg_color='transparent')
+        self.body.grid(row=0, column=0, sticky='nsew')
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky='ns')
+        self.message_label = ctk.CTkLabel(self.body, text='')
+
+        self.body.bind('<Configure>', lambda e: self.refresh())
+        self.bind_all('<MouseWheel>', self.on_mousewheel, add='+')
+        self.bind_all('<Button-4>', self.on_mousewheel, add='+')
+        self.bind_all('<Button-5>', self.on_mousewheel, add='+')
+
+    # Replaces listed coins, keeps scroll position when possible
+    def set_coins(self, coins, reset_scroll=False):
+        self.coins = coins
+        if reset_scroll:
+            self.offset = 0
+        self.refresh()
+
+    # Shows a text (e.g. "Loading...") instead of coins
+    def show_message(self, text):
+        self.set_coins([], reset_scroll=True)
+        self.message_label.configure(text=text)
+        self.message_label.place(relx=0.5, y=10, anchor='n')
+
+    @property
+    def content_height(self):
+        return math.ceil(len(self.coins) / self.columns) * self.row_height
+
+    # Places pooled cards for the rows inside the viewport
+    @traced('widgets.coin_list')
+    def refresh(self):
+        if self.coins:
+            self.message_label.place_forget()
+        height = self.body.winfo_height()
+        content_height = self.content_height
+        self.offset = max(0, min(self.offset, content_height - height))
+
+        first_row = self.offset // self.row_height
+        visible_rows = min(math.ceil(len(self.coins) / self.columns) - first_row, height // self.row_height + 2)
+        needed = max(visible_rows, 0) * self.columns
+        while len(self.pool) < needed:
+            self.pool.append(CoinCard(self.body, self.on_select, self.on_hover, height=self.row_height - 10))
+
+        for slot, card in enumerate(self.pool):
+            index = first_row * self.columns + slot
+            if slot < needed and index < len(self.coins):
+                row, column = divmod(slot, self.columns)
+                card.bind_coin(self.coins[index])
+                geometry = (column, (first_row + row) * self.row_height - self.offset + 5)
+                if card.placed_at != geometry:
+                    card.place(relx=column / self.columns + 0.02, y=geometry[1], relwidth=1 / self.columns - 0.04)
+                    card.placed_at = geometry
+            elif card.placed_at is not None:
+                card.place_forget()
+                card.placed_at = None
+
+        if content_height > height > 0:
+            self.scrollbar.set(self.offset / content_height, (self.offset + height) / content_height)
+        else:
+            self.scrollbar.set(0, 1)
+
+    # Cards currently placed, with the coin id they show
+    def visible_cards(self):
+        return [card for card in self.pool if card.placed_at is not None]
+
+    # Rebinds visible cards showing one of coin_ids after their data changed in place,
+    # off-screen coins pick the change up when scrolled into view
+    @traced('widgets.coin_list.update')
+    def update_coins(self, coin_ids):
+        updated = 0
+        for card in self.visible_cards():
+            if card.coin_id in coin_ids:
+                card.bind_coin(card.coin)
+                updated += 1
+        return updated
+
+    def scroll_to(self, offset):
+        offset = int(offset)
+        if offset != self.offset:
+            self.offset = offset
+            self.refresh()
+
+    def on_scrollbar(self, command, value, units=None):
+        if command == 'moveto':
+            self.scroll_to(float(value) * self.content_height)
+        elif command == 'scroll':
+            self.scroll_to(self.offset + int(value) * self.row_height // 2)
+
+    def on_mousewheel(self, event):
+        if not str(event.widget).startswith(str(self.body)):
+            return
+        if event.num == 4:
+            delta = -1
+        elif event.num == 5:
+            delta = 1
+        else:
+            delta = -1 if event.delta > 0 else 1
+        self.scroll_to(self.offset + delta * self.row_height // 2)
@@ -0,0 +1,57 @@
+import numpy as np
+
+# How overlaid series are scaled: change since the first point in percent, or indexed to 100
+NORMALIZATIONS = ('percent', 'index')
+
+
+# Evenly spaced timestamps (ms) over the span all series cover
+def common_grid(series_list, points):
+    start = max(int(series.timestamps[0]) for series in series_list)
+    end = min(int(series.timestamps[-1]) for series in series_list)
+    if end <= start:
+        raise ValueError('Charts of the compared coins do not overlap.')
+    return np.linspace(start, end, max(points, 2)).astype(np.int64)
+
+
+# Prices of every series linearly interpolated onto grid, shape (len(series_list), len(grid))
+def align(series_list, grid):
+    values = np.empty((len(series_list), len(grid)))
+    for row, series in enumerate(series_list):
+        values[row] = np.interp(grid, series.timestamps, series.prices)
+    return values
+
+
+# Scales each row of values relative to its first point
+def normalize(values, mode='percent'):
+    if mode not in NORMALIZATIONS:
+        raise ValueError(f'unknown normalization {mode!r}')
+    base = values[:, :1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scaled = np.where(base != 0, values / base, np.nan)
+    return (scaled - 1) * 100 if mode == 'percent' else scaled * 100
+
+
+# Coins overlaid on one chart: prices aligned to a common time grid, normalized on display
+class Comparison:
+    __slots__ = ('coins', 'timestamps', 'prices')
+
+    def __init__(self, coins, timestamps, prices):
+        self.coins = list(coins)
+        self.timestamps = timestamps
+        self.prices = prices
+
+    # Aligns {coin: MarketSeries} (empty series skipped) onto at most `points` grid points
+    @classmethod
+    def from_series(cls, series_by_coin, points=1000):
+        series_by_coin = {coin: series for coin, series in series_by_coin.items() if len(series)}
+        if not series_by_coin:
+            raise ValueError('Server is overloaded. Try again later.')
+        series_list = list(series_by_coin.values())
+        grid = common_grid(series_list, min(points, max(len(series) for series in series_list)))
+        return cls(series_by_coin, grid, align(series_list, grid))
+
+    def normalized(self, mode='percent'):
+        return normalize(self.prices, mode)
+
+    def datetimes(self):
+        return self.timestamps.astype('datetime64[ms]')
@@ -0,0 +1,76 @@
+import numpy as np
+
+# Points kept per horizontal pixel, beyond this extra points are not visible anyway
+POINTS_PER_PIXEL = 2
+
+
+# Index of min and max point in each of n_buckets equal buckets (fully vectorized)
+def minmax_indices(y, n_buckets):
+    y = np.asarray(y, dtype=np.float64)
+    size = len(y)
+    if n_buckets <= 0 or size <= 2 * n_buckets:
+        return np.arange(size)
+    bucket_size = -(-size // n_buckets)
+    n_buckets = -(-size // bucket_size)
+    lows = np.full(n_buckets * bucket_size, np.inf)
+    highs = np.full(n_buckets * bucket_size, -np.inf)
+    lows[:size] = y
+    highs[:size] = y
+    offsets = np.arange(n_buckets) * bucket_size
+    low_index = offsets + lows.reshape(n_buckets, bucket_size).argmin(axis=1)
+    high_index = offsets + highs.reshape(n_buckets, bucket_size).argmax(axis=1)
+    return np.unique(np.concatenate(([0, size - 1], low_index, high_index)))
+
+
+# Largest-Triangle-Three-Buckets: picks threshold points that best preserve the visual shape
+def lttb_indices(x, y, threshold):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    size = len(y)
+    if threshold < 3 or size <= threshold:
+        return np.arange(size)
+
+    # Inner points split into threshold - 2 buckets, first and last point always kept
+    edges = np.linspace(1, size - 1, threshold - 1).astype(np.int64)
+    counts = np.diff(edges)
+    x_means = np.add.reduceat(x[1:size - 1], edges[:-1] - 1) / counts
+    y_means = np.add.reduceat(y[1:size - 1], edges[:-1] - 1) / counts
+    x_means = np.append(x_means, x[-1])
+    y_means = np.append(y_means, y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = size - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_x, next_y = x_means[bucket + 1], y_means[bucket + 1]
+        areas = np.abs((x[previous] - next_x) * (y[start:stop] - y[previous])
+                       - (x[previous] - x[start:stop]) * (next_y - y[previous]))
+        previous = start + int(areas.argmax())
+        selected[bucket + 1] = previous
+    return selected
+
+
+# Reduces (x, y) to what a canvas of width_px can show, always keeping the global extrema
+def downsample(x, y, width_px, method='minmax'):
+    y = np.asarray(y)
+    target = max(int(width_px), 1) * POINTS_PER_PIXEL
+    if len(y) <= target:
+        return np.asarray(x), y
+    if method == 'minmax':
+        index = minmax_indices(y, target // 2)
+    elif method == 'lttb':
+        index = lttb_indices(x, y, target)
+        index = np.union1d(index, [int(y.argmin()), int(y.argmax())])
+    else:
+        raise ValueError(f'Unknown downsampling method: {method}')
+    return np.asarray(x)[index], y[index]
+
+
+# Evenly spaced indices keeping what a canvas of width_px can show, for smooth lines such as indicators
+def stride_indices(length, width_px):
+    target = max(int(width_px), 1) * POINTS_PER_PIXEL
+    if length <= target:
+        return np.arange(length)
+    return np.linspace(0, length - 1, target).astype(np.int64)
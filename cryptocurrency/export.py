@@ -0,0 +1,217 @@
+import argparse
+import asyncio
+import csv
+import logging
+import os
+import re
+import sys
+from datetime import datetime, timezone
+
+import aiohttp
+import numpy as np
+
+from cryptocurrency.client import APIError, CoinGeckoClient
+from cryptocurrency.ratelimit import CircuitOpenError, RateLimiter
+from cryptocurrency.series import MarketSeries
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ('coin', 'vs_currency', 'range', 'timestamp', 'price', 'volume')
+PART_NAME = re.compile(r'^part-(\d{5})\.(csv|parquet)$')
+# Shortest wait before retrying while the circuit is open, so a zero retry_in doesn't spin
+MIN_CIRCUIT_WAIT = 1.0
+
+
+# Range spec: a /market_chart days value ("30", "max") or "FROM:TO" dates (YYYY-MM-DD, UTC)
+def parse_range(text):
+    text = text.strip()
+    if ':' in text:
+        start, end = (datetime.strptime(part, '%Y-%m-%d').replace(tzinfo=timezone.utc) for part in text.split(':', 1))
+        if end <= start:
+            raise ValueError(f'empty range {text!r}')
+        return text, int(start.timestamp()), int(end.timestamp())
+    if text != 'max' and not text.isdigit():
+        raise ValueError(f'invalid range {text!r}, expected days, "max" or FROM:TO dates')
+    return text, None, None
+
+
+# Coin ids from the command line and an optional file (one id per line, # comments)
+def read_ids(ids, ids_file=None):
+    result = list(ids)
+    if ids_file:
+        with open(ids_file, encoding='utf-8') as f:
+            result.extend(line.split('#', 1)[0].strip() for line in f)
+    return list(dict.fromkeys(coin for coin in result if coin))
+
+
+class CsvParts:
+    extension = 'csv'
+
+    @staticmethod
+    def write(path, columns):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            # NaN volumes are written as empty cells
+            volumes = ['' if np.isnan(v) else repr(v) for v in columns['volume'].tolist()]
+            writer.writerows(zip(columns['coin'], columns['vs_currency'], columns['range'],
+                                 columns['timestamp'].tolist(), map(repr, columns['price'].tolist()), volumes))
+
+    @staticmethod
+    def keys(path):
+        with open(path, newline='', encoding='utf-8') as f:
+            return {(row['coin'], row['vs_currency'], row['range']) for row in csv.DictReader(f)}
+
+
+class ParquetParts:
+    extension = 'parquet'
+
+    def __init__(self):
+        import pyarrow
+        import pyarrow.parquet
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+
+    def write(self, path, columns):
+        table = self.pa.table({name: columns[name] for name in COLUMNS})
+        self.pq.write_table(table, path)
+
+    def keys(self, path):
+        table = self.pq.read_table(path, columns=['coin', 'vs_currency', 'range'])
+        return set(zip(*(table.column(name).to_pylist() for name in ('coin', 'vs_currency', 'range'))))
+
+
+# Output directory of numbered part files, each holding whole series only.
+# Parts are written under a temporary name and renamed, so after an interruption every part on disk is
+# complete; the series they hold are skipped when the export is run again.
+class PartWriter:
+    def __init__(self, directory, fmt='csv'):
+        self.directory = directory
+        self.parts = ParquetParts() if fmt == 'parquet' else CsvParts()
+        os.makedirs(directory, exist_ok=True)
+        self.next_index = 0
+        self.written = set()
+        for name in sorted(os.listdir(directory)):
+            if name.endswith('.tmp'):
+                os.remove(os.path.join(directory, name))
+                continue
+            match = PART_NAME.match(name)
+            if match:
+                self.next_index = max(self.next_index, int(match.group(1)) + 1)
+                if match.group(2) == self.parts.extension:
+                    self.written |= self.parts.keys(os.path.join(directory, name))
+
+    # Writes [((coin, vs_currency, range), MarketSeries)] as the next part, returns its path
+    def write(self, chunk):
+        columns = {
+            'coin': [key[0] for key, series in chunk for _ in range(len(series))],
+            'vs_currency': [key[1] for key, series in chunk for _ in range(len(series))],
+            'range': [key[2] for key, series in chunk for _ in range(len(series))],
+            'timestamp': np.concatenate([series.timestamps for _, series in chunk]),
+            'price': np.concatenate([series.prices for _, series in chunk]),
+            'volume': np.concatenate([series.volumes for _, series in chunk]),
+        }
+        path = os.path.join(self.directory, f'part-{self.next_index:05d}.{self.parts.extension}')
+        self.parts.write(path + '.tmp', columns)
+        os.replace(path + '.tmp', path)
+        self.next_index += 1
+        self.written.update(key for key, _ in chunk)
+        return path
+
+
+# Fetches market charts for every (coin, range) not exported yet, `concurrency` at a time within
+# the client's rate budget, and writes them in parts of about `chunk_rows` rows.
+# Returns {'exported', 'skipped', 'failed', 'rows', 'parts'}.
+async def export(client, writer, coins, ranges, vs_currency='usd', concurrency=4, chunk_rows=100_000):
+    jobs = [(coin, spec) for coin in coins for spec in ranges]
+    todo = [(coin, spec) for coin, spec in jobs if (coin, vs_currency, spec[0]) not in writer.written]
+    stats = {'exported': 0, 'skipped': len(jobs) - len(todo), 'failed': 0, 'rows': 0, 'parts': 0}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(coin, spec):
+        label, start, end = spec
+        async with semaphore:
+            while True:
+                try:
+                    if start is None:
+                        data = await client.amarket_chart(coin, label, vs_currency)
+                    else:
+                        data = await client.amarket_chart_range(coin, start, end, vs_currency)
+                    return (coin, vs_currency, label), MarketSeries.from_response(data)
+                except CircuitOpenError as e:
+                    # API is down for a while, an overnight backfill can wait it out
+                    wait = max(e.retry_in, MIN_CIRCUIT_WAIT)
+                    logger.warning('API unavailable, waiting %.0fs', wait)
+                    await asyncio.sleep(wait)
+
+    chunk = []
+    chunk_size = 0
+    for done in asyncio.as_completed([fetch(coin, spec) for coin, spec in todo]):
+        try:
+            key, series = await done
+        except (APIError, ValueError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            stats['failed'] += 1
+            logger.warning('Export failed: %s', e)
+            continue
+        chunk.append((key, series))
+        chunk_size += len(series)
+        stats['exported'] += 1
+        logger.info('Fetched %s %s %s (%d points)', *key, len(series))
+        if chunk_size >= chunk_rows:
+            await asyncio.to_thread(writer.write, chunk)
+            stats['rows'] += chunk_size
+            stats['parts'] += 1
+            chunk, chunk_size = [], 0
+    if chunk:
+        await asyncio.to_thread(writer.write, chunk)
+        stats['rows'] += chunk_size
+        stats['parts'] += 1
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m cryptocurrency.export',
+        description='Export CoinGecko market chart history (prices, volumes) to CSV or Parquet parts.')
+    parser.add_argument('coins', nargs='*', help='coin ids, e.g. bitcoin ethereum')
+    parser.add_argument('--ids-file', help='file with one coin id per line')
+    parser.add_argument('--range', dest='ranges', action='append',
+                        help='days ("1", "30", "max") or FROM:TO dates (2024-01-01:2024-07-01), repeatable; '
+                             'default max')
+    parser.add_argument('--vs-currency', default='usd')
+    parser.add_argument('--output', required=True, help='directory for the part files, reused to resume')
+    parser.add_argument('--format', choices=('csv', 'parquet'), default='csv')
+    parser.add_argument('--concurrency', type=int, default=4, help='requests in flight')
+    parser.add_argument('--rate-per-minute', type=float, default=30, help='request budget, 0 for unlimited')
+    parser.add_argument('--chunk-rows', type=int, default=100_000, help='rows per part file')
+    args = parser.parse_args(argv)
+
+    coins = read_ids(args.coins, args.ids_file)
+    if not coins:
+        parser.error('no coin ids given')
+    try:
+        ranges = [parse_range(text) for text in args.ranges or ['max']]
+    except ValueError as e:
+        parser.error(str(e))
+    try:
+        writer = PartWriter(args.output, args.format)
+    except ImportError:
+        parser.error('Parquet output needs pyarrow (pip install pyarrow)')
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    client = CoinGeckoClient(limiter=RateLimiter(rate_per_minute=args.rate_per_minute or None))
+    try:
+        stats = client.run(export(client, writer, coins, ranges, args.vs_currency, args.concurrency,
+                                  args.chunk_rows))
+    except KeyboardInterrupt:
+        # Parts written so far are complete, the next run continues from them
+        return 130
+    finally:
+        client.close()
+    print(f'Exported {stats["exported"]} series ({stats["rows"]} rows, {stats["parts"]} parts) to {args.output}, '
+          f'{stats["skipped"]} already exported, {stats["failed"]} failed')
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
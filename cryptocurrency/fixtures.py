@@ -0,0 +1,52 @@
+import gzip
+import hashlib
+import json
+import os
+from urllib.parse import urlencode
+
+# Set to a directory to record every successful API response there (see CoinGeckoClient)
+RECORD_DIR_ENV = 'COINGECKO_RECORD_DIR'
+
+
+# Canonical query string, params are compared as strings the way they arrive over HTTP
+def canonical_query(params=None):
+    return urlencode(sorted((str(name), str(value)) for name, value in (params or {}).items()))
+
+
+# File name for a request: readable path plus a hash of its query
+def fixture_name(path, params=None):
+    path = path.strip('/')
+    digest = hashlib.sha1(canonical_query(params).encode()).hexdigest()[:12]
+    return f'{path.replace("/", "__")}-{digest}.json.gz'
+
+
+# Directory of gzip-compressed JSON fixtures, one per API path and query
+class FixtureStore:
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path_for(self, path, params=None):
+        return os.path.join(self.directory, fixture_name(path, params))
+
+    # Records response body (decoded JSON) for a request, replacing an earlier recording
+    def save(self, path, params, body, status=200):
+        os.makedirs(self.directory, exist_ok=True)
+        record = {'path': path.strip('/'), 'query': canonical_query(params), 'status': status, 'body': body}
+        target = self.path_for(path, params)
+        # Written next to the target and renamed so a reader never sees half a file
+        with gzip.open(target + '.tmp', 'wt', encoding='utf-8') as f:
+            json.dump(record, f, separators=(',', ':'))
+        os.replace(target + '.tmp', target)
+
+    # Recorded {'path', 'query', 'status', 'body'} for a request or None
+    def load(self, path, params=None):
+        try:
+            with gzip.open(self.path_for(path, params), 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def __len__(self):
+        if not os.path.isdir(self.directory):
+            return 0
+        return sum(name.endswith('.json.gz') for name in os.listdir(self.directory))
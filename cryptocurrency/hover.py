@@ -0,0 +1,129 @@
+import numpy as np
+from matplotlib import dates as mdates
+from matplotlib.lines import Line2D
+from matplotlib.text import Annotation
+from matplotlib.transforms import Bbox
+
+
+# Crosshair and tooltip drawn on a blitted overlay.
+# Nearest point is found by binary search over the sorted x array, so the cost of a
+# motion event does not depend on the number of points.
+class HoverTool:
+    def __init__(self, chart):
+        self.chart = chart
+        self.ax = chart.ax
+        self.canvas = chart.canvas
+        self.x = np.empty(0)
+        self.y = np.empty(0)
+        self.index = None
+        self.background = None
+        # Tooltip area drawn by the last overlay, the tooltip can reach outside the axes
+        self.tooltip_extent = None
+
+        # Overlay artists are only drawn by draw_overlay(), they are not children of the axes
+        # so they never take part in autoscaling or full redraws
+        self.vline = Line2D([0, 0], [0, 1], transform=self.ax.get_xaxis_transform(),
+                            linewidth=0.8, linestyle='--', visible=False)
+        self.hline = Line2D([0, 1], [0, 0], transform=self.ax.get_yaxis_transform(),
+                            linewidth=0.8, linestyle='--', visible=False)
+        self.marker = Line2D([0], [0], marker='o', markersize=5, transform=self.ax.transData, visible=False)
+        self.annotation = Annotation('', xy=(0, 0), xytext=(12, 12), textcoords='offset points',
+                                     bbox={'boxstyle': 'round', 'alpha': 0.9}, visible=False)
+        self.annotation.set_transform(self.ax.transData)
+        self.artists = (self.vline, self.hline, self.marker, self.annotation)
+        for artist in self.artists:
+            artist.axes = self.ax
+            artist.set_figure(chart.figure)
+            artist.set_clip_path(self.ax.patch)
+        self.annotation.set_clip_on(False)
+
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+        self.canvas.mpl_connect('motion_notify_event', self.on_motion)
+        self.canvas.mpl_connect('axes_leave_event', self.on_leave)
+        self.canvas.mpl_connect('figure_leave_event', self.on_leave)
+
+    # Full resolution data to snap to (x must be sorted)
+    def set_data(self, x, y):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        # Background is stale until the next full draw
+        self.background = None
+        self.index = None
+        for artist in self.artists:
+            artist.set_visible(False)
+
+    # Nearest point index for x coordinate
+    def nearest(self, x):
+        index = int(np.searchsorted(self.x, x))
+        if index >= len(self.x):
+            return len(self.x) - 1
+        if index > 0 and x - self.x[index - 1] < self.x[index] - x:
+            return index - 1
+        return index
+
+    def on_draw(self, event):
+        # Full redraw happened, cache it as the clean background for the overlay
+        self.background = self.canvas.copy_from_bbox(self.chart.figure.bbox)
+        self.tooltip_extent = None
+        if self.index is not None:
+            self.draw_overlay()
+
+    def on_motion(self, event):
+        if event.inaxes is not self.ax or not len(self.x) or event.xdata is None:
+            self.hide()
+            return
+        index = self.nearest(event.xdata)
+        if index == self.index:
+            return
+        self.index = index
+        x, y = self.x[index], self.y[index]
+        self.vline.set_xdata([x, x])
+        self.hline.set_ydata([y, y])
+        self.marker.set_data([x], [y])
+        self.annotation.xy = (x, y)
+        self.annotation.set_text(f'Date: {mdates.num2date(x).strftime("%Y-%m-%d %H:%M:%S")}\nPrice: ${y:,.2f}')
+        # Keep the tooltip inside the axes on the right half
+        self.annotation.set_position((-12, 12) if event.x > self.ax.bbox.x0 + self.ax.bbox.width / 2 else (12, 12))
+        self.annotation.set_horizontalalignment('right' if event.x > self.ax.bbox.x0 + self.ax.bbox.width / 2
+                                                else 'left')
+        for artist in self.artists:
+            artist.set_visible(True)
+        self.draw_overlay()
+
+    def on_leave(self, event):
+        self.hide()
+
+    # Hides crosshair and tooltip
+    def hide(self):
+        if self.index is None:
+            return
+        self.index = None
+        for artist in self.artists:
+            artist.set_visible(False)
+        self.draw_overlay()
+
+    # Restores the cached background and draws only the overlay artists. Only the axes and the old and new
+    # tooltip areas are blitted, not the whole figure.
+    def draw_overlay(self):
+        if self.background is None:
+            return
+        self.canvas.restore_region(self.background)
+        dirty = [self.ax.bbox]
+        if self.tooltip_extent is not None:
+            dirty.append(self.tooltip_extent)
+            self.tooltip_extent = None
+        if self.index is not None:
+            for artist in self.artists:
+                self.ax.draw_artist(artist)
+            self.tooltip_extent = Bbox.union([self.annotation.get_window_extent(),
+                                              self.annotation.get_bbox_patch().get_window_extent()]).padded(2)
+            dirty.append(self.tooltip_extent)
+        self.canvas.blit(Bbox.union(dirty))
+
+    def apply_theme(self, colors):
+        for line in (self.vline, self.hline):
+            line.set_color(colors['text'])
+        self.marker.set_color(colors['line'])
+        self.annotation.set_color(colors['text'])
+        self.annotation.get_bbox_patch().set_facecolor(colors['background'])
+        self.annotation.get_bbox_patch().set_edgecolor(colors['text'])
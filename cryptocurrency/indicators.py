@@ -0,0 +1,256 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+EMPTY = np.empty(0, dtype=np.float64)
+EMPTY_TIMESTAMPS = np.empty(0, dtype=np.int64)
+
+
+# Exponential moving average y[i] = alpha * x[i] + (1 - alpha) * y[i - 1], starting from seed (x[0] by default).
+# Vectorized in closed form over blocks short enough that (1 - alpha) ** -block stays below ~1e12,
+# so the scaled cumulative sum keeps its precision.
+def ema(values, alpha, seed=None):
+    values = np.asarray(values, dtype=np.float64)
+    out = np.empty_like(values)
+    if not len(values):
+        return out
+    if alpha >= 1:
+        out[:] = values
+        return out
+    decay = 1.0 - alpha
+    previous = values[0] if seed is None else seed
+    block = max(1, int(27.6 / -np.log(decay)))
+    for start in range(0, len(values), block):
+        chunk = values[start:start + block]
+        powers = decay ** np.arange(len(chunk))
+        out[start:start + len(chunk)] = powers * (decay * previous + alpha * np.cumsum(chunk / powers))
+        previous = out[start + len(chunk) - 1]
+    return out
+
+
+# func over each window of `window` points ending at every point of values; history supplies the points
+# before values, windows that would reach past it are NaN
+def rolling(history, values, window, func):
+    context = np.concatenate([history[len(history) - (window - 1):] if window > 1 else EMPTY, values])
+    out = np.full(len(values), np.nan)
+    if len(context) >= window:
+        result = func(sliding_window_view(context, window), axis=1)
+        count = min(len(result), len(values))
+        out[len(values) - count:] = result[len(result) - count:]
+    return out
+
+
+# Indicator over a growing price series. Per-point results and the internal state needed to continue are kept as
+# arrays in self.state, so new points are computed from the tail alone (append) and a rewritten tail is cut off
+# first (truncate).
+class Indicator(ABC):
+    # Drawn on the price axes, otherwise in a panel of its own under it
+    overlay = True
+    state_names = ()
+
+    def __init__(self, *params):
+        self.params = params
+        self.reset()
+
+    @property
+    def key(self):
+        return (type(self).__name__,) + self.params
+
+    @property
+    def label(self):
+        return ' '.join(str(part) for part in (type(self).__name__,) + self.params)
+
+    # Same indicator and parameters, no data
+    def spawn(self):
+        return type(self)(*self.params)
+
+    def reset(self):
+        self.prices = EMPTY
+        self.volumes = EMPTY
+        self.state = {name: EMPTY for name in self.state_names}
+
+    def __len__(self):
+        return len(self.prices)
+
+    def append(self, prices, volumes):
+        prices = np.asarray(prices, dtype=np.float64)
+        volumes = np.asarray(volumes, dtype=np.float64)
+        if not len(prices):
+            return
+        new = self.compute(prices, volumes)
+        self.state = {name: np.concatenate([self.state[name], new[name]]) for name in self.state_names}
+        self.prices = np.concatenate([self.prices, prices])
+        self.volumes = np.concatenate([self.volumes, volumes])
+
+    def truncate(self, length):
+        self.prices = self.prices[:length]
+        self.volumes = self.volumes[:length]
+        self.state = {name: values[:length] for name, values in self.state.items()}
+
+    # {label: per-point values}
+    def lines(self):
+        return {self.label: self.state[self.state_names[0]]}
+
+    # State arrays for prices, volumes appended after the current ones
+    @abstractmethod
+    def compute(self, prices, volumes):
+        pass
+
+
+class SMA(Indicator):
+    state_names = ('sma',)
+
+    def __init__(self, window=20):
+        super().__init__(window)
+        self.window = window
+
+    def compute(self, prices, volumes):
+        return {'sma': rolling(self.prices, prices, self.window, np.mean)}
+
+
+class EMA(Indicator):
+    state_names = ('ema',)
+
+    def __init__(self, span=50):
+        super().__init__(span)
+        self.alpha = 2 / (span + 1)
+
+    def compute(self, prices, volumes):
+        seed = self.state['ema'][-1] if len(self) else None
+        return {'ema': ema(prices, self.alpha, seed)}
+
+
+class Bollinger(Indicator):
+    state_names = ('middle', 'upper', 'lower')
+
+    def __init__(self, window=20, width=2):
+        super().__init__(window, width)
+        self.window = window
+        self.width = width
+
+    def compute(self, prices, volumes):
+        middle = rolling(self.prices, prices, self.window, np.mean)
+        spread = self.width * rolling(self.prices, prices, self.window, np.std)
+        return {'middle': middle, 'upper': middle + spread, 'lower': middle - spread}
+
+    def lines(self):
+        return {f'{self.label} {name}': self.state[name] for name in self.state_names}
+
+
+# Relative strength index with Wilder's smoothing, NaN for the first `period` points
+class RSI(Indicator):
+    overlay = False
+    state_names = ('rsi', 'avg_gain', 'avg_loss')
+
+    def __init__(self, period=14):
+        super().__init__(period)
+        self.period = period
+
+    def compute(self, prices, volumes):
+        previous = self.prices[-1] if len(self) else prices[0]
+        changes = np.diff(prices, prepend=previous)
+        alpha = 1 / self.period
+        avg_gain = ema(np.clip(changes, 0, None), alpha, self.state['avg_gain'][-1] if len(self) else None)
+        avg_loss = ema(np.clip(-changes, 0, None), alpha, self.state['avg_loss'][-1] if len(self) else None)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(avg_loss > 0, 100 - 100 / (1 + avg_gain / avg_loss), 100.0)
+        seen = len(self) + np.arange(len(prices))
+        rsi[seen < self.period] = np.nan
+        return {'rsi': rsi, 'avg_gain': avg_gain, 'avg_loss': avg_loss}
+
+
+# Volume weighted average price anchored at the first point of the chart window (points without volume don't count)
+class VWAP(Indicator):
+    state_names = ('price_volume', 'volume')
+
+    def compute(self, prices, volumes):
+        volumes = np.nan_to_num(volumes)
+        base_pv = self.state['price_volume'][-1] if len(self) else 0.0
+        base_volume = self.state['volume'][-1] if len(self) else 0.0
+        return {'price_volume': base_pv + np.cumsum(prices * volumes), 'volume': base_volume + np.cumsum(volumes)}
+
+    def lines(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return {self.label: np.where(self.state['volume'] > 0, self.state['price_volume'] / self.state['volume'],
+                                         np.nan)}
+
+
+# Rolling standard deviation of log returns, in percent per point
+class Volatility(Indicator):
+    overlay = False
+    state_names = ('volatility', 'returns')
+
+    def __init__(self, window=20):
+        super().__init__(window)
+        self.window = window
+
+    def compute(self, prices, volumes):
+        previous = self.prices[-1] if len(self) else np.nan
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.diff(np.log(np.concatenate([[previous], prices])))
+        return {'volatility': rolling(self.state['returns'], returns, self.window, np.std) * 100, 'returns': returns}
+
+
+# Indicators offered in the UI, by name
+INDICATORS = {
+    'SMA': SMA(20),
+    'EMA': EMA(50),
+    'Bollinger': Bollinger(20, 2),
+    'VWAP': VWAP(),
+    'RSI': RSI(14),
+    'Volatility': Volatility(20),
+}
+
+
+# Indicator results cached per (coin, timespan, indicator, params), least recently used dropped first.
+# When the chart series is refreshed and still starts at the same point, only what changed is computed: a rewritten
+# tail is cut off and the appended points are computed from the cached state. A series whose front moved (a sliding
+# window) is computed from scratch: EMA and RSI carry state from every earlier point and the first rolling windows
+# turn NaN, so continuing the cached state would not match a full computation.
+class IndicatorEngine:
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.incremental = 0
+        self.full = 0
+
+    # {label: values aligned with series} for indicator over series of coin / timespan.
+    # Series are not modified in place, the same series object is a cache hit.
+    def compute(self, coin, timespan, indicator, series):
+        key = (coin, str(timespan)) + indicator.key
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = [indicator.spawn(), None]
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        else:
+            self.entries.move_to_end(key)
+        state, computed = entry
+        if computed is not series:
+            self._sync(state, EMPTY_TIMESTAMPS if computed is None else computed.timestamps, series)
+            entry[1] = series
+        else:
+            self.hits += 1
+        return state.lines()
+
+    def stats(self):
+        return {'entries': len(self.entries), 'hits': self.hits, 'incremental': self.incremental,
+                'full': self.full}
+
+    def _sync(self, state, timestamps, series):
+        if len(state) and len(series) and timestamps[0] == series.timestamps[0]:
+            overlap = min(len(timestamps), len(series))
+            same = ((timestamps[:overlap] == series.timestamps[:overlap])
+                    & (state.prices[:overlap] == series.prices[:overlap]))
+            kept = overlap if same.all() else int(np.argmin(same))
+            if kept:
+                state.truncate(kept)
+                state.append(series.prices[kept:], series.volumes[kept:])
+                self.incremental += 1
+                return
+        state.reset()
+        state.append(series.prices, series.volumes)
+        self.full += 1
@@ -0,0 +1,65 @@
+import asyncio
+import logging
+
+from cryptocurrency.ratelimit import PRIORITY_BACKGROUND, PRIORITY_DETAIL, request_priority
+
+logger = logging.getLogger(__name__)
+
+
+# Coins from /coins/markets pages, ordered by page and indexed by id
+class MarketListing:
+    def __init__(self):
+        self.pages = {}
+        self.coins = []
+        self.by_id = {}
+
+    def __len__(self):
+        return len(self.coins)
+
+    def __iter__(self):
+        return iter(self.coins)
+
+    def __contains__(self, coin_id):
+        return coin_id in self.by_id
+
+    # Adds or replaces one page, pages may arrive in any order
+    def add_page(self, page, coins):
+        self.pages[page] = coins
+        self.coins = [coin for number in sorted(self.pages) for coin in self.pages[number]]
+        for coin in coins:
+            self.by_id[coin['id']] = coin
+
+    # Coin by id in O(1)
+    def get(self, coin_id, default=None):
+        return self.by_id.get(coin_id, default)
+
+
+# Fetches /coins/markets pages concurrently, at most `concurrency` in flight. The request budget is the
+# client's rate limiter: the first page (on screen right away) is sent with detail priority, the rest in the
+# background so they don't hold up what the user opens meanwhile.
+class MarketPagesLoader:
+    def __init__(self, client, per_page=250, concurrency=3):
+        self.client = client
+        self.per_page = per_page
+        self.concurrency = concurrency
+
+    # Calls on_page(page, coins) as each page arrives, returns number of coins loaded
+    async def load(self, pages, on_page, vs_currency='usd'):
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(page):
+            async with semaphore:
+                try:
+                    with request_priority(PRIORITY_DETAIL if page == 1 else PRIORITY_BACKGROUND):
+                        coins = await self.client.amarkets(page=page, per_page=self.per_page,
+                                                           vs_currency=vs_currency)
+                except Exception as e:
+                    coins = e
+            if not isinstance(coins, list):
+                logger.warning('Markets page %s failed: %s', page, coins)
+                return 0
+            on_page(page, coins)
+            return len(coins)
+
+        counts = await asyncio.gather(*(fetch(page) for page in range(1, pages + 1)))
+        return sum(counts)
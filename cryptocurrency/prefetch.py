@@ -0,0 +1,153 @@
+import logging
+import threading
+import time
+from collections import deque
+
+from cryptocurrency.ratelimit import PRIORITY_BACKGROUND, request_priority
+
+logger = logging.getLogger(__name__)
+
+# Shortest wait before pumping again after running out of budget
+MIN_WAKE = 0.05
+
+# Timespans likely to be opened next after the one on screen, closest first
+ADJACENT_TIMESPANS = {
+    '1': ('7', '30'),
+    '7': ('30', '1'),
+    '30': ('90', '7'),
+    '90': ('365', '30'),
+    '365': ('max', '90'),
+    'max': ('365',),
+}
+
+
+# Warms the response cache and chart store with data the user is likely to open next.
+# Prefetches only run on spare request budget: at most `budget_per_minute` of them, `max_in_flight`
+# at a time, and only while the rate limiter has no queued requests and keeps `reserve` tokens for
+# foreground work. They are sent with background priority, so anything the user asks for still goes
+# first. Waiting prefetches are kept in a short queue, the oldest are dropped when it overflows.
+# A budget of 0 turns prefetching off. Warmed data is prefetched again once it is `warm_ttl` seconds old.
+class Prefetcher:
+    def __init__(self, client, chart_store, budget_per_minute=6, max_in_flight=1, reserve=2, max_pending=8,
+                 warm_ttl=60, clock=time.monotonic):
+        self.client = client
+        self.chart_store = chart_store
+        self.budget_per_minute = budget_per_minute
+        self.max_in_flight = max_in_flight
+        self.reserve = reserve
+        self.warm_ttl = warm_ttl
+        self.clock = clock
+
+        self.started = deque()
+        self.pending = deque(maxlen=max_pending)
+        self.in_flight = set()
+        # key -> when its prefetch finished
+        self.warmed = {}
+        self._wake_scheduled = False
+        self._lock = threading.Lock()
+
+        self.issued = 0
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.used = 0
+
+    # Warms market chart of coin for timespan (days)
+    def chart(self, coin, days):
+        self._submit(('chart', coin, str(days)), lambda: self.chart_store.amarket_chart(coin, days))
+
+    # Warms coin details (description, links)
+    def coin(self, coin_id):
+        self._submit(('coin', coin_id), lambda: self.client.acoin(coin_id))
+
+    # Charts of timespans next to the one just shown
+    def adjacent_charts(self, coin, days):
+        for adjacent in ADJACENT_TIMESPANS.get(str(days), ()):
+            self.chart(coin, adjacent)
+
+    # Called for every foreground load so prefetches that paid off can be counted
+    def record_use(self, key):
+        with self._lock:
+            if self.warmed.pop(key, None) is not None:
+                self.used += 1
+
+    # Prefetch counters and cache hit ratio, for tuning the budget
+    def stats(self):
+        with self._lock:
+            return {
+                'issued': self.issued,
+                'completed': self.completed,
+                'failed': self.failed,
+                'skipped': self.skipped,
+                'used': self.used,
+                'useful_ratio': self.used / self.completed if self.completed else 0.0,
+                'cache_hit_ratio': self.client.cache_stats()['hit_ratio'],
+            }
+
+    def report(self):
+        logger.info('Prefetch stats: %s', self.stats())
+
+    # Queues loader() -> awaitable for key, unless it is already warm or queued
+    def _submit(self, key, loader):
+        if self.budget_per_minute <= 0:
+            return
+        with self._lock:
+            warmed_at = self.warmed.get(key)
+            if warmed_at is not None:
+                if self.clock() - warmed_at < self.warm_ttl:
+                    return
+                del self.warmed[key]
+            if key in self.in_flight or any(key == queued for queued, _ in self.pending):
+                return
+            if len(self.pending) == self.pending.maxlen:
+                self.skipped += 1
+            self.pending.append((key, loader))
+        self._pump()
+
+    # Starts queued prefetches while the budget allows, called again whenever one finishes.
+    # When the per-minute budget or the limiter's spare tokens hold them back, pumps again once they may allow.
+    def _pump(self):
+        now = self.clock()
+        while True:
+            with self._lock:
+                while self.started and now - self.started[0] >= 60:
+                    self.started.popleft()
+                if not self.pending or len(self.in_flight) >= self.max_in_flight:
+                    return
+                if len(self.started) >= self.budget_per_minute:
+                    self._wake_after(60 - (now - self.started[0]))
+                    return
+                if not self.client.limiter.has_spare(self.reserve):
+                    self._wake_after(self.client.limiter.spare_in(self.reserve))
+                    return
+                key, loader = self.pending.popleft()
+                self.started.append(now)
+                self.in_flight.add(key)
+                self.issued += 1
+            future = self.client.submit(self._run(loader))
+            future.add_done_callback(lambda done, key=key: self._finished(key, done))
+
+    # Schedules one _pump after wait seconds (None: nothing to wait for), called with the lock held
+    def _wake_after(self, wait):
+        if wait is not None and not self._wake_scheduled:
+            self._wake_scheduled = True
+            self.client.call_later(max(wait, MIN_WAKE), self._wake)
+
+    def _wake(self):
+        with self._lock:
+            self._wake_scheduled = False
+        self._pump()
+
+    async def _run(self, loader):
+        with request_priority(PRIORITY_BACKGROUND):
+            return await loader()
+
+    def _finished(self, key, future):
+        with self._lock:
+            self.in_flight.discard(key)
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+                self.warmed[key] = self.clock()
+        self._pump()
@@ -0,0 +1,66 @@
+import asyncio
+import logging
+
+from cryptocurrency.ratelimit import PRIORITY_BACKGROUND, request_priority
+
+logger = logging.getLogger(__name__)
+
+
+# Splits ids into lists that fit into one /simple/price request
+def batched(ids, size):
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+# Copies a (price, change_24h) quote into a /coins/markets coin dict
+def apply_quote(coin, quote):
+    price, change = quote
+    coin['current_price'] = price
+    if change is not None:
+        coin['price_change_percentage_24h'] = change
+
+
+# Live prices for many coins at a few requests per poll: ids are sent to /simple/price
+# in batches of `batch_size`, and the last snapshot is kept so that only coins whose
+# quote actually changed are handed to the UI.
+class PricePoller:
+    def __init__(self, client, batch_size=250, vs_currency='usd'):
+        self.client = client
+        self.batch_size = batch_size
+        self.vs_currency = vs_currency
+        self.snapshot = {}
+        self.requests = 0
+
+    # Fetches {coin_id: (price, change_24h)} for ids, failed batches are skipped
+    async def fetch(self, ids):
+        batches = list(batched(ids, self.batch_size))
+        self.requests += len(batches)
+        # Refreshing the whole listing must not hold up requests for the coin being looked at
+        with request_priority(PRIORITY_BACKGROUND):
+            responses = await asyncio.gather(
+                *(self.client.asimple_price(batch, self.vs_currency, include_24hr_change=True) for batch in batches),
+                return_exceptions=True)
+
+        quotes = {}
+        for response in responses:
+            if not isinstance(response, dict) or 'status' in response:
+                logger.warning('Price batch failed: %s', response)
+                continue
+            for coin_id, values in response.items():
+                price = values.get(self.vs_currency)
+                if price is not None:
+                    quotes[coin_id] = (price, values.get(f'{self.vs_currency}_24h_change'))
+        return quotes
+
+    # Takes quotes already known from elsewhere (e.g. /coins/markets) as the current snapshot
+    def seed(self, coins):
+        for coin in coins:
+            if coin.get('current_price') is not None:
+                self.snapshot[coin['id']] = (coin['current_price'], coin.get('price_change_percentage_24h'))
+
+    # Stores quotes and returns only the ones that differ from the last snapshot
+    def diff(self, quotes):
+        changed = {coin_id: quote for coin_id, quote in quotes.items() if self.snapshot.get(coin_id) != quote}
+        self.snapshot.update(changed)
+        return changed
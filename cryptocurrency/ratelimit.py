@@ -0,0 +1,280 @@
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from fnmatch import fnmatchcase
+
+# Priority classes, lower value is served first
+PRIORITY_CHART = 0
+PRIORITY_DETAIL = 1
+PRIORITY_BACKGROUND = 2
+PRIORITY_NAMES = {PRIORITY_CHART: 'chart', PRIORITY_DETAIL: 'detail', PRIORITY_BACKGROUND: 'background'}
+
+# Priority per API path pattern, first match wins (see request_priority for overrides)
+DEFAULT_PRIORITIES = (
+    ('coins/*/market_chart*', PRIORITY_CHART),
+    ('coins/*/ohlc', PRIORITY_CHART),
+    ('coins/list', PRIORITY_BACKGROUND),
+)
+
+# Waiters that are not first in line re-check this often while tokens are available
+POLL_INTERVAL = 0.01
+# How often spare_in() suggests checking again while requests are queued
+SPARE_RECHECK = 0.5
+
+_priority = contextvars.ContextVar('request_priority', default=None)
+
+
+# Runs requests made inside the block (same thread or asyncio task) with given priority
+@contextlib.contextmanager
+def request_priority(priority):
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+# Priority for API path: request_priority override, then DEFAULT_PRIORITIES
+def priority_for(path, priorities=DEFAULT_PRIORITIES):
+    override = _priority.get()
+    if override is not None:
+        return override
+    path = path.strip('/')
+    for pattern, priority in priorities:
+        if fnmatchcase(path, pattern):
+            return priority
+    return PRIORITY_DETAIL
+
+
+# Exponential backoff with full jitter: uniform in [0, min(cap, base * 2 ** attempt)]
+def backoff_delay(attempt, base=0.5, cap=30, rng=random.random):
+    return rng() * min(cap, base * 2 ** attempt)
+
+
+# Seconds from a Retry-After header (delta seconds or HTTP date), None when missing or invalid
+def parse_retry_after(value, now=time.time):
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - now())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, retry_in):
+        super().__init__(f'API unavailable, retrying in {retry_in:.0f}s')
+        self.retry_in = retry_in
+
+
+# Token bucket shared by all requests of a client.
+# Waiters queue by (priority, arrival) and only the first one in line takes a token, so
+# background work yields to user-visible requests. A 429 pauses the bucket for Retry-After.
+class RateLimiter:
+    def __init__(self, rate_per_minute=30, burst=10, clock=time.monotonic):
+        self.rate = rate_per_minute / 60 if rate_per_minute else None
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+        self.paused_until = 0.0
+
+        self._lock = threading.Lock()
+        self._queue = []
+        self._abandoned = set()
+        self._arrivals = itertools.count()
+
+        self.granted = dict.fromkeys(PRIORITY_NAMES, 0)
+        self.wait_time = dict.fromkeys(PRIORITY_NAMES, 0.0)
+        self.max_wait = dict.fromkeys(PRIORITY_NAMES, 0.0)
+        self.throttled = 0
+
+    # Blocks until a token is granted, returns seconds waited
+    def acquire(self, priority=PRIORITY_DETAIL):
+        ticket, started = self._enqueue(priority)
+        try:
+            delay = self._take(ticket)
+            while delay is not None:
+                time.sleep(delay)
+                delay = self._take(ticket)
+        except BaseException:
+            self._abandon(ticket)
+            raise
+        return self._record(priority, started)
+
+    # Async variant of acquire, waiting does not block the event loop
+    async def aacquire(self, priority=PRIORITY_DETAIL):
+        ticket, started = self._enqueue(priority)
+        try:
+            delay = self._take(ticket)
+            while delay is not None:
+                await asyncio.sleep(delay)
+                delay = self._take(ticket)
+        except BaseException:
+            self._abandon(ticket)
+            raise
+        return self._record(priority, started)
+
+    # Pauses all requests for retry_after seconds (server answered 429)
+    def throttle(self, retry_after):
+        with self._lock:
+            self.throttled += 1
+            # Bucket refills only once the pause is over
+            self.tokens = 0.0
+            self.paused_until = max(self.paused_until, self.clock() + retry_after)
+            self.updated = self.paused_until
+
+    # True when nobody is waiting and at least `reserve` tokens would be left after taking one,
+    # i.e. an optional request now would not delay anything else
+    def has_spare(self, reserve=1):
+        with self._lock:
+            now = self.clock()
+            if now < self.paused_until or len(self._queue) > len(self._abandoned):
+                return False
+            if self.rate is None:
+                return True
+            tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            return tokens - 1 >= reserve
+
+    # Seconds until has_spare(reserve) may turn true (0 when it is), None when the burst can never leave it spare.
+    # While requests are queued the answer is a recheck interval, they finish at the server's pace.
+    def spare_in(self, reserve=1):
+        with self._lock:
+            now = self.clock()
+            if now < self.paused_until:
+                return self.paused_until - now
+            if len(self._queue) > len(self._abandoned):
+                return SPARE_RECHECK
+            if self.rate is None:
+                return 0.0
+            if reserve + 1 > self.burst:
+                return None
+            tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            return max(0.0, (reserve + 1 - tokens) / self.rate)
+
+    # Queue depth per priority, throttle count and wait times
+    def stats(self):
+        with self._lock:
+            depth = dict.fromkeys(PRIORITY_NAMES.values(), 0)
+            for ticket in self._queue:
+                if ticket not in self._abandoned:
+                    depth[PRIORITY_NAMES[ticket[0]]] += 1
+            return {
+                'queue_depth': depth,
+                'throttled': self.throttled,
+                'paused_for': max(0.0, self.paused_until - self.clock()),
+                'granted': {PRIORITY_NAMES[p]: n for p, n in self.granted.items()},
+                'avg_wait': {PRIORITY_NAMES[p]: self.wait_time[p] / n if n else 0.0
+                             for p, n in self.granted.items()},
+                'max_wait': {PRIORITY_NAMES[p]: wait for p, wait in self.max_wait.items()},
+            }
+
+    def _enqueue(self, priority):
+        ticket = (priority, next(self._arrivals))
+        with self._lock:
+            heapq.heappush(self._queue, ticket)
+        return ticket, self.clock()
+
+    def _abandon(self, ticket):
+        with self._lock:
+            self._abandoned.add(ticket)
+            self._drop_abandoned()
+
+    def _drop_abandoned(self):
+        while self._queue and self._queue[0] in self._abandoned:
+            self._abandoned.discard(heapq.heappop(self._queue))
+
+    # Takes a token for ticket and returns None, or returns seconds to wait before trying again
+    def _take(self, ticket):
+        with self._lock:
+            now = self.clock()
+            if now < self.paused_until:
+                return self.paused_until - now
+            if self.rate is not None:
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self._drop_abandoned()
+            if self.rate is None or self.tokens >= 1:
+                if self._queue[0] != ticket:
+                    return POLL_INTERVAL
+                heapq.heappop(self._queue)
+                if self.rate is not None:
+                    self.tokens -= 1
+                return None
+            return (1 - self.tokens) / self.rate
+
+    def _record(self, priority, started):
+        waited = self.clock() - started
+        with self._lock:
+            self.granted[priority] += 1
+            self.wait_time[priority] += waited
+            self.max_wait[priority] = max(self.max_wait[priority], waited)
+        return waited
+
+
+# Stops sending requests after `failure_threshold` consecutive failures.
+# After `reset_timeout` seconds one trial request is let through (half open);
+# its success closes the circuit, its failure opens it again. A trial that ends without either
+# (cancelled, unexpected error) must be handed back with release_trial().
+class CircuitBreaker:
+    # Suggested wait for other requests while the half-open trial is in flight
+    TRIAL_RETRY = 1.0
+
+    def __init__(self, failure_threshold=5, reset_timeout=30, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self.trips = 0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    # Raises CircuitOpenError when requests must not be sent now.
+    # Returns True when this request is the half-open trial.
+    def before_request(self):
+        with self._lock:
+            if self.state == 'closed':
+                return False
+            retry_in = self.opened_at + self.reset_timeout - self.clock()
+            if self.state == 'open' and retry_in <= 0:
+                self.state = 'half_open'
+            if self.state == 'half_open':
+                if not self._trial:
+                    self._trial = True
+                    return True
+                raise CircuitOpenError(self.TRIAL_RETRY)
+            raise CircuitOpenError(max(retry_in, 0))
+
+    # Lets the next request be the trial when the current one finished without an outcome
+    def release_trial(self):
+        with self._lock:
+            if self.state == 'half_open':
+                self._trial = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.trips += 1
+                self.state = 'open'
+                self.opened_at = self.clock()
+                self._trial = False
@@ -0,0 +1,81 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+# Runs view requests on the client loop, one channel per view ('chart', 'price', ...).
+# Each new request on a channel gets the next generation id and cancels the previous one;
+# results of superseded generations are dropped, only the latest one is delivered.
+# request() and the delivery callbacks run on the UI thread, dispatch(callback, *args)
+# must hand work over to it.
+class ViewScheduler:
+    def __init__(self, client, dispatch, max_workers=4):
+        self.client = client
+        self.dispatch = dispatch
+        # Long-lived pool for blocking work (parsing, local storage) started from coroutines
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='view-worker')
+        self.generations = {}
+        self.futures = {}
+        self.dropped = 0
+
+    # Starts coroutine for a channel, superseding whatever that channel was doing
+    def request(self, channel, coro, on_result, on_error=None):
+        generation = self.generations.get(channel, 0) + 1
+        self.generations[channel] = generation
+        previous = self.futures.get(channel)
+        if previous is not None and not previous.done():
+            previous.cancel()
+
+        future = self.client.submit(coro)
+        self.futures[channel] = future
+        future.add_done_callback(
+            lambda f: self.dispatch(self._deliver, channel, generation, f, on_result, on_error))
+        return generation
+
+    # Like request() for an async generator: each item it yields is passed to on_item while the
+    # request is current (e.g. a cached value first, then the refetched one)
+    def stream(self, channel, agen, on_item, on_error=None):
+        generation = self.generations.get(channel, 0) + 1
+
+        async def pump():
+            async for item in agen:
+                self.dispatch(self._deliver_item, channel, generation, item, on_item)
+
+        return self.request(channel, pump(), lambda result: None, on_error)
+
+    # True while generation is the latest request on channel
+    def is_current(self, channel, generation):
+        return self.generations.get(channel) == generation
+
+    # Cancels pending request on channel (or all channels)
+    def cancel(self, channel=None):
+        channels = [channel] if channel is not None else list(self.generations)
+        for name in channels:
+            self.generations[name] = self.generations.get(name, 0) + 1
+            future = self.futures.pop(name, None)
+            if future is not None:
+                future.cancel()
+
+    def shutdown(self):
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _deliver_item(self, channel, generation, item, on_item):
+        if not self.is_current(channel, generation):
+            self.dropped += 1
+            return
+        on_item(item)
+
+    def _deliver(self, channel, generation, future, on_result, on_error):
+        if not self.is_current(channel, generation) or future.cancelled():
+            self.dropped += 1
+            return
+        self.futures.pop(channel, None)
+        error = future.exception()
+        if error is None:
+            on_result(future.result())
+        elif on_error is not None:
+            on_error(error)
+        else:
+            logger.warning('Request on %s failed: %s', channel, error)
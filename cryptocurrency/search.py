@@ -0,0 +1,211 @@
+import bisect
+import math
+import re
+from collections import defaultdict
+
+import numpy as np
+
+WORD_SPLIT = re.compile(r'[\s\-_.()]+')
+# Sorts after every string starting with a given prefix
+PREFIX_END = '\U0010ffff'
+EMPTY_POSITIONS = np.empty(0, dtype=np.int64)
+TIER_EXACT_SYMBOL, TIER_EXACT_NAME, TIER_PREFIX, TIER_SUBSTRING = range(4)
+# Coins added or re-ranked in one batch are merged into the sorted words and the market cap order
+# while they are fewer than 1 / REORDER_MERGE_LIMIT of the index, larger batches are sorted from scratch
+REORDER_MERGE_LIMIT = 8
+
+
+# Overlapping three letter chunks of text
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+# Search index over coin names, symbols and ids.
+# Queries of 3+ letters are substring matches resolved through a trigram index, shorter
+# queries are prefix matches resolved by binary search over sorted words. When a query
+# extends the previous one, only the previous matches are re-checked.
+# Results are ranked: exact symbol, exact name/id, prefix, substring; then by market cap rank.
+# Matches are kept in precomputed market cap order and only stably sorted by tier, tiers are looked up
+# by binary search over sorted symbols and names/ids.
+class CoinIndex:
+    def __init__(self, coins=()):
+        self.coins = []
+        self.positions = {}
+        self.names = []
+        self.symbols = []
+        self.ids = []
+        self.haystacks = []
+        self.ranks = []
+        self.words = []
+        self.word_owners = EMPTY_POSITIONS
+        self.sorted_symbols = []
+        self.symbol_owners = EMPTY_POSITIONS
+        self.sorted_labels = []
+        self.label_owners = EMPTY_POSITIONS
+        self.order = EMPTY_POSITIONS
+        self.by_order = EMPTY_POSITIONS
+        self.trigram_index = defaultdict(set)
+        self.last_query = None
+        self.last_matches = None
+        self.short_results = {}
+        self.add(coins)
+
+    def __len__(self):
+        return len(self.coins)
+
+    # Adds coins or updates already indexed ones (matched by id)
+    def add(self, coins):
+        new_words = []
+        new_symbols = []
+        new_labels = []
+        # Positions whose place in the market cap order is new
+        moved = []
+        for coin in coins:
+            coin_id = coin.get('id')
+            if coin_id is None:
+                continue
+            position = self.positions.get(coin_id)
+            if position is not None:
+                if 'current_price' in coin:
+                    self.coins[position] = coin
+                else:
+                    # Bare /coins/list entry must not hide market data (price, rank) indexed earlier
+                    self.coins[position] = {**coin, **self.coins[position]}
+                rank = self._rank(self.coins[position])
+                if rank != self.ranks[position]:
+                    self.ranks[position] = rank
+                    moved.append(position)
+                continue
+            position = len(self.coins)
+            self.positions[coin_id] = position
+            self.coins.append(coin)
+            name = (coin.get('name') or '').lower()
+            symbol = (coin.get('symbol') or '').lower()
+            identifier = coin_id.lower()
+            self.names.append(name)
+            self.symbols.append(symbol)
+            self.ids.append(identifier)
+            haystack = f'{name}\0{symbol}\0{identifier}'
+            self.haystacks.append(haystack)
+            self.ranks.append(self._rank(coin))
+            moved.append(position)
+            for trigram in trigrams(haystack):
+                self.trigram_index[trigram].add(position)
+            for word in {symbol, identifier, *WORD_SPLIT.split(name)}:
+                if word:
+                    new_words.append((word, position))
+            new_symbols.append((symbol, position))
+            new_labels.extend([(name, position), (identifier, position)])
+
+        if new_words:
+            self.words, self.word_owners = self._merged(self.words, self.word_owners, new_words)
+        if new_symbols:
+            self.sorted_symbols, self.symbol_owners = self._merged(self.sorted_symbols, self.symbol_owners,
+                                                                   new_symbols)
+            self.sorted_labels, self.label_owners = self._merged(self.sorted_labels, self.label_owners, new_labels)
+        if moved:
+            self._reorder(moved)
+        self.last_query = None
+        self.last_matches = None
+        self.short_results = {}
+
+    # Updates positions ordered by market cap rank, then name (by_order) and the order of each position.
+    # A page of coins is merged into the existing order, only large batches are sorted from scratch.
+    def _reorder(self, moved):
+        if len(moved) * REORDER_MERGE_LIMIT > len(self.coins):
+            ranked = sorted(range(len(self.coins)), key=self._order_key)
+        else:
+            ranked = self.by_order[~np.isin(self.by_order, moved)].tolist()
+            for position in sorted(moved, key=self._order_key):
+                bisect.insort(ranked, position, key=self._order_key)
+        self.by_order = np.array(ranked, dtype=np.int64)
+        self.order = np.empty_like(self.by_order)
+        self.order[self.by_order] = np.arange(len(self.coins))
+
+    def _order_key(self, position):
+        return self.ranks[position], self.names[position]
+
+    # Coin dict by id
+    def get(self, coin_id):
+        position = self.positions.get(coin_id)
+        return self.coins[position] if position is not None else None
+
+    # Ranked coins matching query
+    def search(self, query, limit=None):
+        query = query.strip().lower()
+        if not query:
+            return []
+        if len(query) >= 3:
+            if self.last_matches is not None and query.startswith(self.last_query):
+                # Narrowing query: every match must already be among the previous matches
+                candidates = self.last_matches
+            else:
+                candidates = self._trigram_candidates(query)
+            matches = [position for position in candidates if query in self.haystacks[position]]
+            self.last_query, self.last_matches = query, matches
+            ranked = self._ranked(np.fromiter(matches, dtype=np.int64, count=len(matches)), query)
+        else:
+            # Short queries have few distinct values and many matches, ranked results are memoized
+            self.last_query, self.last_matches = None, None
+            if query not in self.short_results:
+                self.short_results[query] = self._ranked(self._prefix_matches(query), query)
+            ranked = self.short_results[query]
+
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [self.coins[position] for position in ranked.tolist()]
+
+    # Positions array of matches, ranked
+    def _ranked(self, matches, query):
+        exact_symbols, symbol_prefixes = self._starting_with(self.sorted_symbols, self.symbol_owners, query)
+        exact_labels, label_prefixes = self._starting_with(self.sorted_labels, self.label_owners, query)
+        tiers = np.full(len(self.coins), TIER_SUBSTRING, dtype=np.int8)
+        tiers[symbol_prefixes] = TIER_PREFIX
+        tiers[label_prefixes] = TIER_PREFIX
+        tiers[exact_labels] = TIER_EXACT_NAME
+        tiers[exact_symbols] = TIER_EXACT_SYMBOL
+        matched = np.zeros(len(self.coins), dtype=bool)
+        matched[self.order[matches]] = True
+        ranked = self.by_order[np.flatnonzero(matched)]
+        return ranked[np.argsort(tiers[ranked], kind='stable')]
+
+    # Owners of keys equal to query and of keys starting with it, keys sorted
+    @staticmethod
+    def _starting_with(keys, owners, query):
+        start = bisect.bisect_left(keys, query)
+        exact_end = bisect.bisect_right(keys, query, start)
+        end = bisect.bisect_left(keys, query + PREFIX_END, exact_end)
+        return owners[start:exact_end], owners[start:end]
+
+    # Sorted keys and their owners (positions array) with new (key, owner) pairs merged in. New owners are
+    # new positions, so they go after existing owners of the same key. A few pairs are inserted in place.
+    @staticmethod
+    def _merged(keys, owners, new_pairs):
+        new_pairs.sort()
+        if len(new_pairs) * REORDER_MERGE_LIMIT > len(keys):
+            pairs = sorted(list(zip(keys, owners.tolist())) + new_pairs)
+            return [key for key, _ in pairs], np.array([owner for _, owner in pairs], dtype=np.int64)
+        at = [bisect.bisect_right(keys, key) for key, _ in new_pairs]
+        for index, (key, _) in zip(reversed(at), reversed(new_pairs)):
+            keys.insert(index, key)
+        return keys, np.insert(owners, at, [owner for _, owner in new_pairs])
+
+    def _trigram_candidates(self, query):
+        postings = [self.trigram_index.get(trigram) for trigram in trigrams(query)]
+        if any(posting is None for posting in postings):
+            return []
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                break
+        return candidates
+
+    def _prefix_matches(self, query):
+        return self._starting_with(self.words, self.word_owners, query)[1]
+
+    @staticmethod
+    def _rank(coin):
+        rank = coin.get('market_cap_rank')
+        return rank if rank is not None else math.inf
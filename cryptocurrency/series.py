@@ -0,0 +1,110 @@
+import numpy as np
+
+from cryptocurrency.trace import traced
+
+EMPTY_TIMESTAMPS = np.empty(0, dtype=np.int64)
+EMPTY_VALUES = np.empty(0, dtype=np.float64)
+
+
+# Market chart series stored as contiguous columns:
+# timestamps (int64, ms since epoch), prices and volumes (float64, NaN where unknown)
+class MarketSeries:
+    __slots__ = ('timestamps', 'prices', 'volumes')
+
+    def __init__(self, timestamps, prices, volumes=None):
+        self.timestamps = np.ascontiguousarray(timestamps, dtype=np.int64)
+        self.prices = np.ascontiguousarray(prices, dtype=np.float64)
+        if volumes is None:
+            volumes = np.full(len(self.prices), np.nan)
+        self.volumes = np.ascontiguousarray(volumes, dtype=np.float64)
+
+    # Parses /market_chart response, market caps are skipped
+    @classmethod
+    @traced('parse.market_chart')
+    def from_response(cls, data):
+        if 'prices' not in data:
+            raise ValueError('Server is overloaded. Try again later.')
+        prices = cls._pairs(data['prices'])
+        prices = prices[~np.isnan(prices[:, 1])]
+        timestamps = prices[:, 0].astype(np.int64)
+
+        volumes = cls._pairs(data.get('total_volumes') or [])
+        if len(volumes) == len(prices) and np.array_equal(volumes[:, 0], prices[:, 0]):
+            volume_column = volumes[:, 1]
+        else:
+            volume_column = cls._align(timestamps, volumes)
+        return cls(timestamps, prices[:, 1], volume_column)
+
+    # Builds series from (ts, price, volume) rows
+    @classmethod
+    def from_rows(cls, rows):
+        if not rows:
+            return cls.empty()
+        table = np.array(rows, dtype=np.float64)
+        return cls(table[:, 0], table[:, 1], table[:, 2])
+
+    @classmethod
+    def empty(cls):
+        return cls(EMPTY_TIMESTAMPS, EMPTY_VALUES, EMPTY_VALUES)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def high(self):
+        return float(self.prices.max()) if len(self) else None
+
+    @property
+    def low(self):
+        return float(self.prices.min()) if len(self) else None
+
+    @property
+    def last_price(self):
+        return float(self.prices[-1]) if len(self) else None
+
+    # Last known volume (volumes may have gaps)
+    @property
+    def last_volume(self):
+        known = np.flatnonzero(~np.isnan(self.volumes))
+        return float(self.volumes[known[-1]]) if len(known) else None
+
+    # Percent change between first and last price
+    @property
+    def percent_change(self):
+        if len(self) < 2 or self.prices[0] == 0:
+            return None
+        return float((self.prices[-1] - self.prices[0]) / self.prices[0] * 100)
+
+    # Timestamps as numpy datetime64 (matplotlib converts these without per-point objects)
+    def datetimes(self):
+        return self.timestamps.astype('datetime64[ms]')
+
+    # Points with timestamp >= start (ms)
+    def since(self, start):
+        index = np.searchsorted(self.timestamps, start, side='left')
+        return MarketSeries(self.timestamps[index:], self.prices[index:], self.volumes[index:])
+
+    # Rows for persisting, volumes use None for unknown
+    def rows(self):
+        volumes = self.volumes.astype(object)
+        volumes[np.isnan(self.volumes)] = None
+        return list(zip(self.timestamps.tolist(), self.prices.tolist(), volumes.tolist()))
+
+    @staticmethod
+    def _pairs(points):
+        if not len(points):
+            return np.empty((0, 2), dtype=np.float64)
+        return np.array(points, dtype=np.float64).reshape(-1, 2)
+
+    # Matches volumes to price timestamps, NaN when missing
+    @staticmethod
+    def _align(timestamps, volumes):
+        aligned = np.full(len(timestamps), np.nan)
+        if not len(volumes):
+            return aligned
+        order = np.argsort(volumes[:, 0], kind='stable')
+        volume_ts = volumes[order, 0].astype(np.int64)
+        index = np.clip(np.searchsorted(volume_ts, timestamps), 0, len(volume_ts) - 1)
+        found = volume_ts[index] == timestamps
+        aligned[found] = volumes[order, 1][index[found]]
+        return aligned
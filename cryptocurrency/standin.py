@@ -0,0 +1,131 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from cryptocurrency.fixtures import FixtureStore
+
+API_PREFIX = '/api/v3'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        path = url.path
+        if path.startswith(API_PREFIX):
+            path = path[len(API_PREFIX):]
+        params = dict(parse_qsl(url.query, keep_blank_values=True))
+
+        delay, throttled = server.next_response()
+        if delay > 0:
+            time.sleep(delay)
+        if throttled:
+            self._send(429, {'status': {'error_code': 429, 'error_message': 'Rate limit exceeded (stand-in)'}},
+                       {'Retry-After': str(server.retry_after)})
+            return
+
+        record = server.fixtures.load(path, params)
+        if record is None:
+            server.count('missing')
+            self._send(404, {'error': f'no fixture for {path}?{url.query}'})
+            return
+        server.count('served')
+        self._send(record['status'], record['body'])
+
+    def _send(self, status, body, headers=None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+# Local CoinGecko stand-in replaying recorded fixtures (see fixtures.FixtureStore).
+# Every response is delayed by `latency` +- `jitter` seconds, and a `throttle_rate` share of
+# requests is answered with 429 and Retry-After. A fixed seed makes the delays and the injected
+# 429s repeat exactly between runs.
+class StandInServer(ThreadingHTTPServer):
+    def __init__(self, fixtures_dir, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, throttle_rate=0.0,
+                 retry_after=1, seed=None):
+        super().__init__((host, port), _Handler)
+        self.fixtures = FixtureStore(fixtures_dir)
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.counts = {'requests': 0, 'served': 0, 'missing': 0, 'throttled': 0}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    # Base URL to point CoinGeckoClient (or COINGECKO_BASE_URL) at
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}{API_PREFIX}'
+
+    # Delay and whether to answer 429 for the next request
+    def next_response(self):
+        with self._lock:
+            self.counts['requests'] += 1
+            delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+            throttled = self.throttle_rate > 0 and self.random.random() < self.throttle_rate
+            if throttled:
+                self.counts['throttled'] += 1
+        return delay, throttled
+
+    def count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    # Serves from a background thread, returns base_url
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name='coingecko-standin', daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join(5)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve recorded CoinGecko responses locally.')
+    parser.add_argument('fixtures', help='directory recorded with COINGECKO_RECORD_DIR')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0, help='response delay in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='random +- delay in seconds')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='share of requests answered with 429')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with 429')
+    parser.add_argument('--seed', type=int, default=None, help='seed for repeatable delays and 429s')
+    args = parser.parse_args(argv)
+
+    server = StandInServer(args.fixtures, args.host, args.port, args.latency, args.jitter, args.throttle_rate,
+                           args.retry_after, args.seed)
+    print(f'Serving {len(server.fixtures)} fixtures, run the app with COINGECKO_BASE_URL={server.base_url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f'Requests: {server.counts}')
+
+
+if __name__ == '__main__':
+    main()
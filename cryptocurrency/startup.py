@@ -0,0 +1,50 @@
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Append startup timings as JSON lines to this file to track regressions
+STARTUP_LOG_ENV = 'CRYPTOCURRENCY_STARTUP_LOG'
+
+
+# Records startup milestones relative to process start.
+# 'first_paint' is marked by the window, 'interactive' once every stage has reported done().
+class StartupTimer:
+    def __init__(self, started_at=None, stages=(), clock=time.perf_counter, log_path=None):
+        self.clock = clock
+        self.started_at = started_at if started_at is not None else clock()
+        self.stages = tuple(stages)
+        self.pending = set(self.stages)
+        self.marks = {}
+        self.log_path = log_path if log_path is not None else os.environ.get(STARTUP_LOG_ENV)
+
+    # Records seconds since start for a milestone (first mark wins)
+    def mark(self, name):
+        if name not in self.marks:
+            self.marks[name] = self.clock() - self.started_at
+        return self.marks[name]
+
+    # Marks a startup stage as loaded, marks 'interactive' after the last one
+    def done(self, stage):
+        if stage not in self.pending:
+            return
+        self.pending.discard(stage)
+        self.mark(stage)
+        if not self.pending:
+            self.mark('interactive')
+            self.report()
+
+    @property
+    def complete(self):
+        return not self.pending
+
+    # Logs timings and appends them to the startup log if configured
+    def report(self):
+        timings = {name: round(seconds * 1000, 1) for name, seconds in self.marks.items()}
+        logger.info('Startup timings (ms): %s', timings)
+        if self.log_path:
+            with open(self.log_path, 'a', encoding='utf-8') as log_file:
+                log_file.write(json.dumps({'time': time.time(), 'timings_ms': timings}) + '\n')
+        return timings
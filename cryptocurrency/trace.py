@@ -0,0 +1,178 @@
+import asyncio
+import functools
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict, deque
+
+# Set to a file path to record spans and write them there as a Chrome trace when the app closes,
+# or to 1 to only keep the in-app latency summary
+TRACE_ENV = 'CRYPTOCURRENCY_TRACE'
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+# Shared by every span() call while tracing is off, so a disabled span allocates nothing
+NO_SPAN = _NoSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'args', 'start')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = self.tracer.clock()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.finish(self.name, self.start, self.tracer.clock(), self.args)
+        return False
+
+
+# Nearest-rank percentile of already sorted values
+def percentile(values, q):
+    if not values:
+        return 0.0
+    rank = max(0, math.ceil(q / 100 * len(values)) - 1)
+    return values[rank]
+
+
+# Records timed spans (HTTP calls, parsing, plot phases, widget rebuilds).
+# While disabled, span() returns NO_SPAN and costs one attribute check. While enabled, each span
+# becomes a Chrome trace "complete" event (open the exported file in chrome://tracing or Perfetto)
+# and its duration goes into a rolling window of the last `window` runs per operation for summary().
+# Spans inside asyncio tasks get one track per task, since tasks overlap on the loop thread.
+class Tracer:
+    def __init__(self, max_events=100_000, window=500, clock=time.perf_counter_ns):
+        self.enabled = False
+        self.clock = clock
+        self.window = window
+        self.origin = clock()
+        self.events = deque(maxlen=max_events)
+        self.durations = defaultdict(lambda: deque(maxlen=self.window))
+        self.tracks = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        with self._lock:
+            self.events.clear()
+            self.durations.clear()
+            self.tracks.clear()
+
+    # Context manager timing the block as operation `name`, args are shown with the event
+    def span(self, name, **args):
+        if not self.enabled:
+            return NO_SPAN
+        return _Span(self, name, args)
+
+    # Decorator timing every call of a function as operation `name` (defaults to its qualified name)
+    def traced(self, name=None):
+        def decorate(func):
+            label = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Span(self, label, {}):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def finish(self, name, start, end, args):
+        track, track_name = self._track()
+        event = {'name': name, 'ph': 'X', 'ts': (start - self.origin) / 1000, 'dur': (end - start) / 1000,
+                 'pid': os.getpid(), 'tid': track}
+        if args:
+            event['args'] = args
+        with self._lock:
+            self.events.append(event)
+            self.durations[name].append((end - start) / 1e6)
+            self.tracks.setdefault(track, track_name)
+
+    # {operation: {'count', 'p50_ms', 'p95_ms', 'max_ms'}} over the rolling window
+    def summary(self):
+        with self._lock:
+            windows = {name: sorted(durations) for name, durations in self.durations.items()}
+        return {name: {'count': len(values), 'p50_ms': percentile(values, 50), 'p95_ms': percentile(values, 95),
+                       'max_ms': values[-1]}
+                for name, values in sorted(windows.items()) if values}
+
+    # summary() as a plain text table
+    def format_summary(self):
+        rows = self.summary()
+        if not rows:
+            return 'No spans recorded.'
+        width = max(len(name) for name in rows)
+        lines = [f'{"operation":<{width}}  {"count":>6}  {"p50 ms":>9}  {"p95 ms":>9}  {"max ms":>9}']
+        for name, row in rows.items():
+            lines.append(f'{name:<{width}}  {row["count"]:>6}  {row["p50_ms"]:>9.2f}  {row["p95_ms"]:>9.2f}  '
+                         f'{row["max_ms"]:>9.2f}')
+        return '\n'.join(lines)
+
+    # Recorded spans in the Chrome trace event format
+    def chrome_trace(self):
+        with self._lock:
+            events = list(self.events)
+            tracks = dict(self.tracks)
+        pid = os.getpid()
+        names = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': track, 'args': {'name': track_name}}
+                 for track, track_name in tracks.items()]
+        return {'traceEvents': names + events, 'displayTimeUnit': 'ms'}
+
+    def export_chrome_trace(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Written next to the target and renamed so a viewer never opens half a file
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f)
+        os.replace(path + '.tmp', path)
+
+    @staticmethod
+    def _track():
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        if task is not None:
+            return id(task), f'task {task.get_name()}'
+        thread = threading.current_thread()
+        return thread.ident, thread.name
+
+
+# Tracer used by the app and the cryptocurrency package
+tracer = Tracer()
+span = tracer.span
+traced = tracer.traced
+
+
+# Enables tracer when TRACE_ENV is set, returns the path to export the trace to (or None)
+def configure_from_env(environ=None):
+    value = (os.environ if environ is None else environ).get(TRACE_ENV, '').strip()
+    if not value or value == '0':
+        return None
+    tracer.enable()
+    return None if value == '1' else value
@@ -1,15 +1,42 @@
-import requests
+import time
+from functools import cached_property
+
+STARTED_AT = time.perf_counter()
+
 import customtkinter as ctk
 from customtkinter import CTkSegmentedButton, set_appearance_mode
-from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
-from matplotlib import dates as mdates
 import asyncio
-import mplcursors
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from PIL import Image
 import sys
+import os
+import queue
+import logging
+from cryptocurrency.client import CoinGeckoClient
+from cryptocurrency.ratelimit import CircuitOpenError
+from cryptocurrency.chart_store import MarketChartStore
+from cryptocurrency.startup import StartupTimer
+from cryptocurrency.scheduler import ViewScheduler
+from cryptocurrency.coin_list import VirtualCoinList
+from cryptocurrency.search import CoinIndex
+from cryptocurrency.markets import MarketListing, MarketPagesLoader
+from cryptocurrency.prices import PricePoller, apply_quote
+from cryptocurrency.prefetch import Prefetcher
+from cryptocurrency.trace import TRACE_ENV, configure_from_env, span, traced, tracer
+
+logger = logging.getLogger(__name__)
+
+# Names of cryptocurrency.indicators.INDICATORS, kept here so the chart-only modules load with the chart
+INDICATOR_NAMES = ('SMA', 'EMA', 'Bollinger', 'VWAP', 'RSI', 'Volatility')
+
+
+# Age note for labels showing a last known value, empty while the value is recent
+def age_note(age):
+    if age < 60:
+        return ''
+    if age < 60 * 60:
+        return f' ({int(age // 60)}m ago)'
+    if age < 24 * 60 * 60:
+        return f' ({int(age // 3600)}h ago)'
+    return f' ({int(age // 86400)}d ago)'
 
 # Avoid compatibility issues with asynchronous code on Windows
 if sys.platform == 'win32':
@@ -23,23 +50,141 @@ class MainWindow(ctk.CTk):
         self.title('Crypto Currency')
         self.geometry('1000x600')
         set_appearance_mode("dark")
+        self.startup = StartupTimer(STARTED_AT, stages=('global', 'coins', 'price', 'coin_info', 'chart'))
+        # CRYPTOCURRENCY_TRACE=<file> records spans and writes a Chrome trace there on close, F12 shows latencies
+        self.trace_path = configure_from_env()
+        self.ui_queue = queue.Queue()
         self.current_currency = 'bitcoin'
+        self.downsample_method = 'minmax'
+        self.chart_period = '24H'
+        self.chart_timespan = '1'
+        self.chart_age = 0
+        # Coins overlaid on the chart together with the selected one, normalized by compare_mode
+        self.pinned = []
+        self.comparison = None
+        self.compare_mode = 'percent'
+        # Indicators shown on the chart (INDICATOR_NAMES), computed incrementally as the chart series refreshes
+        self.indicators = []
+        # 'line' (close prices) or 'candles' (OHLC bars with a volume panel)
+        self.chart_type = 'line'
+        self.candles = None
+        self.markets = MarketListing()
+        self.coins_data = self.markets.coins
+        self.market_pages = 4
+        self.coin_index = CoinIndex()
+        self.search_job = None
+        self.search_debounce_ms = 150
+        self.search_all_coins = True
+        self.client = CoinGeckoClient()
+        self.scheduler = ViewScheduler(self.client, self.call_soon)
+        self.chart_store = MarketChartStore(self.client, executor=self.scheduler.executor)
+        self.price_poller = PricePoller(self.client)
+        self.price_poll_interval = 60  # seconds
+        self.price_poll_job = None
+        # Warms likely next views on spare request budget (prefetcher.stats() reports how much it helps)
+        self.prefetcher = Prefetcher(self.client, self.chart_store, budget_per_minute=6)
+        self.protocol('WM_DELETE_WINDOW', self.on_close)
+        self.bind('<F12>', self.show_trace_summary)
+        # Figure and canvas are created by ensure_chart(), icons are decoded on first use
+        self.chart = None
         self.init_main()
         self.update_high_low_frame_color()
 
-        self.x_icon = ctk.CTkImage(Image.open("src/img/x.png"), size=(30, 30))
-        self.facebook_icon = ctk.CTkImage(Image.open("src/img/facebook.png"), size=(30, 30))
-        self.reddit_icon = ctk.CTkImage(Image.open("src/img/reddit.png"), size=(30, 30))
-
-        # Update market info and plot data on startup
-        self.update_global_market_info()
-        self.update_coin_list()
-        self.update_price()
-        self.update_social_links()
-        self.update_brief_description()
-
-        # Use after method to ensure UI is fully initialized before plotting
-        self.after(100, lambda: self.get_data_and_plot('1'))
+        # Shell with placeholders is shown right away, panels fill in as their data arrives
+        self.process_ui_queue()
+        self.after_idle(self.on_first_paint)
+        self.load_initial_data()
+
+    # Fires all startup requests concurrently on the client loop
+    def load_initial_data(self):
+        coin = self.current_currency
+        self.load_panel('global', self.client.revalidate_global(), self.show_global_market_info)
+        self.load_market_pages()
+        self.load_panel('price', self.client.revalidate_price(coin), self.show_price)
+        self.load_panel('coin_info', self.client.revalidate_coin(coin), self.show_coin_info)
+        self.get_data_and_plot('1')
+        if self.search_all_coins:
+            self.load_search_universe()
+
+    # Fills one panel from a stale-while-revalidate stream of (value, age) pairs: the last known value
+    # is shown right away and replaced when the refetch lands. If refetching fails the last known
+    # value stays on screen; on_error is only called when there was nothing to show.
+    def load_panel(self, stage, stream, callback, on_error=None):
+        shown = False
+
+        def apply(item):
+            nonlocal shown
+            shown = True
+            try:
+                callback(*item)
+            finally:
+                self.startup.done(stage)
+
+        def failed(error):
+            if shown:
+                logger.warning('Refreshing %s failed, keeping last known value: %s', stage, error)
+            elif on_error is not None:
+                on_error(error)
+            else:
+                logger.warning('Loading %s failed: %s', stage, error)
+            self.startup.done(stage)
+
+        return self.scheduler.stream(stage, stream, apply, failed)
+
+    # Marks time to first paint once the shell has been drawn
+    def on_first_paint(self):
+        self.update_idletasks()
+        self.startup.mark('first_paint')
+        self.after_idle(self.load_deferred_assets)
+
+    # Chart and icons that are not needed for the first paint
+    def load_deferred_assets(self):
+        self.ensure_chart()
+        self.github_icon_label.configure(image=self.github_icon)
+
+    # Decodes image from src/img into a CTkImage
+    def load_icon(self, name, size):
+        from PIL import Image
+        return ctk.CTkImage(Image.open(f"src/img/{name}"), size=(size, size))
+
+    # Created with the first indicator shown
+    @cached_property
+    def indicator_engine(self):
+        from cryptocurrency.indicators import IndicatorEngine
+        return IndicatorEngine()
+
+    @cached_property
+    def github_icon(self):
+        return self.load_icon("github.png", 20)
+
+    @cached_property
+    def x_icon(self):
+        return self.load_icon("x.png", 30)
+
+    @cached_property
+    def facebook_icon(self):
+        return self.load_icon("facebook.png", 30)
+
+    @cached_property
+    def reddit_icon(self):
+        return self.load_icon("reddit.png", 30)
+
+    # Queues callback to run on the Tk thread, safe to call from any thread
+    def call_soon(self, callback, *args):
+        self.ui_queue.put((callback, args))
+
+    # Runs callbacks queued by background work on the Tk thread
+    def process_ui_queue(self):
+        while True:
+            try:
+                callback, args = self.ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except Exception:
+                logger.exception('UI update failed')
+        self.after(20, self.process_ui_queue)
 
     def init_main(self):
         main_frame = ctk.CTkFrame(self)
@@ -52,10 +197,10 @@ class MainWindow(ctk.CTk):
         font = ("Roboto", 16, "bold")
 
         # Top info labels
-        self.global_market_info_label = ctk.CTkLabel(main_frame, text='Total market volume: volume$', font=font)
+        self.global_market_info_label = ctk.CTkLabel(main_frame, text='Total market volume: ...', font=font)
         self.global_market_info_label.grid(row=0, column=0, columnspan=2, padx=10, pady=10, sticky='w')
 
-        self.global_market_cap_label = ctk.CTkLabel(main_frame, text='Global market cap: cap$', font=font)
+        self.global_market_cap_label = ctk.CTkLabel(main_frame, text='Global market cap: ...', font=font)
         self.global_market_cap_label.grid(row=0, column=1, padx=10, pady=10, sticky='e')
 
         # Coins list (1/5 of the screen)
@@ -78,9 +223,10 @@ class MainWindow(ctk.CTk):
         self.search_entry.grid(row=0, column=0, padx=5, pady=5, sticky='ew')
         self.search_entry.bind('<KeyRelease>', self.filter_coins)
 
-        self.coins_list_frame = ctk.CTkScrollableFrame(coins_list_container, width=180)
+        # Only visible rows get widgets, cards are recycled while scrolling
+        self.coins_list_frame = VirtualCoinList(coins_list_container, self.set_currency, self.prefetch_coin, width=180)
         self.coins_list_frame.grid(row=2, column=0, padx=10, sticky='nsew')
-        self.coins_list_frame.grid_columnconfigure((0, 1), weight=1, uniform="column")
+        self.coins_list_frame.show_message('Loading...')
 
         # Right side container (4/5 of the screen)
         right_container = ctk.CTkFrame(main_frame)
@@ -110,13 +256,17 @@ class MainWindow(ctk.CTk):
         name_rank_volume_frame.columnconfigure(0, weight=1)
         name_rank_volume_frame.columnconfigure(1, weight=0)
 
-        self.coin_name_label = ctk.CTkLabel(name_rank_volume_frame, text='ZXC', font=("Roboto", 24, "bold"))
+        self.coin_name_label = ctk.CTkLabel(name_rank_volume_frame, text=self.current_currency.capitalize(),
+                                            font=("Roboto", 24, "bold"))
         self.coin_name_label.grid(row=0, column=0, pady=(5, 5), padx=(10, 5), sticky='w')
 
         self.coin_rank_label = ctk.CTkLabel(name_rank_volume_frame, text='#1', font=("Roboto", 16),
                                             text_color="#808080")
         self.coin_rank_label.grid(row=0, column=1, pady=(7, 5), padx=(0, 10), sticky='e')
 
+        self.pin_button = ctk.CTkButton(name_rank_volume_frame, text='Pin', width=50, command=self.toggle_pin)
+        self.pin_button.grid(row=0, column=2, pady=(7, 5), padx=(0, 10), sticky='w')
+
         self.total_volume_label = ctk.CTkLabel(name_rank_volume_frame, text='Total volume: N/A', font=("Roboto", 14))
         self.total_volume_label.grid(row=1, column=0, columnspan=2, pady=(0, 5), padx=(10, 5), sticky='w')
 
@@ -137,7 +287,7 @@ class MainWindow(ctk.CTk):
         description_high_low_frame.columnconfigure(1, weight=0)
 
         # Description
-        self.brief_description_label = ctk.CTkLabel(description_high_low_frame, text='', font=("Roboto", 12),
+        self.brief_description_label = ctk.CTkLabel(description_high_low_frame, text='Loading...', font=("Roboto", 12),
                                                     wraplength=700, justify='left', anchor='w')
         self.brief_description_label.grid(row=0, column=0, sticky='w', padx=(10, 5), pady=5)
 
@@ -163,17 +313,10 @@ class MainWindow(ctk.CTk):
         self.social_frame.grid(row=2, column=0, pady=5, padx=(5, 0), sticky='w')
 
         # Graph plot area
-        graph_frame = ctk.CTkFrame(right_container)
-        graph_frame.grid(row=1, column=0, padx=10, pady=10, sticky='nsew')
-        graph_frame.columnconfigure(0, weight=1)
-        graph_frame.rowconfigure(0, weight=1)
-
-        self.figure = Figure(figsize=(5, 4), dpi=100)
-        self.canvas = FigureCanvasTkAgg(self.figure, master=graph_frame)
-        self.canvas.draw()
-        self.canvas.get_tk_widget().grid(row=0, column=0, sticky='nsew')
-
-        self.github_icon = ctk.CTkImage(Image.open("src/img/github.png"), size=(20, 20))
+        self.graph_frame = ctk.CTkFrame(right_container)
+        self.graph_frame.grid(row=1, column=0, padx=10, pady=10, sticky='nsew')
+        self.graph_frame.columnconfigure(0, weight=1)
+        self.graph_frame.rowconfigure(0, weight=1)
 
         # Time span frame
         time_span_frame = ctk.CTkFrame(right_container, fg_color="transparent")
@@ -184,14 +327,15 @@ class MainWindow(ctk.CTk):
         github_frame = ctk.CTkFrame(time_span_frame, fg_color="transparent")
         github_frame.grid(row=0, column=0, padx=(90, 0), sticky='w')
 
-        github_icon_label = ctk.CTkLabel(github_frame, image=self.github_icon, text="")
-        github_icon_label.pack(side='left', padx=(0, 5))
+        # Icon is set by load_deferred_assets() after the first paint
+        self.github_icon_label = ctk.CTkLabel(github_frame, text="", width=20, height=20)
+        self.github_icon_label.pack(side='left', padx=(0, 5))
 
         github_text_label = ctk.CTkLabel(github_frame, text="mykolamysak", font=("Roboto", 12), cursor="hand2")
         github_text_label.pack(side='left')
 
         # Clicable label
-        github_icon_label.bind("<Button-1>", self.open_github)
+        self.github_icon_label.bind("<Button-1>", self.open_github)
         github_text_label.bind("<Button-1>", self.open_github)
 
         # Time span buttons
@@ -204,8 +348,27 @@ class MainWindow(ctk.CTk):
             command=self.on_timespan_change
         )
         self.time_span_segmented_button.grid(row=0, column=0, sticky='e')
+
+        # Normalization of the comparison chart: change in percent or indexed to 100
+        self.compare_mode_button = CTkSegmentedButton(button_frame, values=["%", "100"],
+                                                      command=self.on_compare_mode_change)
+        self.compare_mode_button.set("%")
+        self.compare_mode_button.grid(row=0, column=1, padx=(10, 0), sticky='e')
+
+        self.chart_type_button = CTkSegmentedButton(button_frame, values=["Line", "Candles"],
+                                                    command=self.on_chart_type_change)
+        self.chart_type_button.set("Line")
+        self.chart_type_button.grid(row=0, column=2, padx=(10, 0), sticky='e')
         self.time_span_segmented_button.set("24H")
 
+        # Indicator toggles
+        indicator_frame = ctk.CTkFrame(right_container, fg_color="transparent")
+        indicator_frame.grid(row=3, column=0, padx=10, pady=(0, 10), sticky='e')
+        for column, name in enumerate(INDICATOR_NAMES):
+            ctk.CTkCheckBox(indicator_frame, text=name, width=60, checkbox_width=18, checkbox_height=18,
+                            font=("Roboto", 12), command=lambda n=name: self.toggle_indicator(n)
+                            ).grid(row=0, column=column, padx=(0, 10))
+
     # Theme switcher
     def create_theme_switcher(self, parent):
         theme_switcher = CTkSegmentedButton(
@@ -231,7 +394,8 @@ class MainWindow(ctk.CTk):
                 widget.configure(fg_color="transparent")
 
         self.update_high_low_frame_color()
-        self.plot()  # Update the graph with new colors
+        if self.chart is not None:
+            self.chart.apply_theme(self.get_theme_colors())  # Restyle the graph with new colors
 
     # Theme colors
     def get_theme_colors(self):
@@ -271,66 +435,45 @@ class MainWindow(ctk.CTk):
         self.update_colors()
         self.update_high_low_frame_color()
 
-    # Fiter coins based on input
-    async def filter_coins(self, event):
-        search_term = self.search_entry.get().lower()
-        for widget in self.coins_list_frame.winfo_children():
-            widget.destroy()
-
-        filtered_coins = [coin for coin in self.coins_data if
-                          search_term in coin.get('name', '').lower() or search_term in coin.get('symbol', '').lower()]
-
-        for index, coin in enumerate(filtered_coins):
-            self.create_coin_widget(coin, index)
-
-    # Creates coins list widget
-    def create_coin_widget(self, coin, index):
-        column = index % 2
-        row = index // 2
-
-        frame = ctk.CTkFrame(self.coins_list_frame, width=170)
-        frame.grid(row=row, column=column, pady=5, padx=5, sticky='nsew')
-        frame.grid_columnconfigure(0, weight=1)
-
-        name_frame = ctk.CTkFrame(frame)
-        name_frame.grid(row=0, column=0, pady=(5, 0), sticky='ew')
-        name_frame.grid_columnconfigure(0, weight=1)
-
-        coin_label = ctk.CTkLabel(name_frame, text=coin.get('name', 'N/A'), font=("Roboto", 14, "bold"))
-        coin_label.grid(row=0, column=0, padx=5, pady=(0, 5), sticky='ew')
-        coin_label.bind('<Button-1>', lambda e, c=coin.get('id'): self.set_currency(c))
-        coin_label.bind('<Enter>', lambda e: e.widget.config(cursor='hand2'))
-        coin_label.bind('<Leave>', lambda e: e.widget.config(cursor=''))
-
-        rank_label = ctk.CTkLabel(name_frame, text=f'#{coin.get("market_cap_rank", "N/A")}', font=("Roboto", 10),
-                                  text_color="#808080")
-        rank_label.grid(row=0, column=1, padx=5, pady=(0, 5), sticky='e')
-
-        info_frame = ctk.CTkFrame(frame)
-        info_frame.grid(row=1, column=0, sticky='ew')
-        info_frame.grid_columnconfigure((0, 1), weight=1)
-
-        price_label = ctk.CTkLabel(info_frame, text=f"${coin.get('current_price', 0):,}", font=("Roboto", 12))
-        price_label.grid(row=0, column=0, padx=5, sticky='w')
-        price_label.bind('<Button-1>', lambda e, c=coin.get('id'): self.set_currency(c))
-        price_label.bind('<Enter>', lambda e: e.widget.config(cursor='hand2'))
-        price_label.bind('<Leave>', lambda e: e.widget.config(cursor=''))
-
-        change_percentage = coin.get('price_change_percentage_24h', 0)
-        change_label = ctk.CTkLabel(info_frame, text=f"{change_percentage:.2f}%", font=("Roboto", 12))
-        change_label.grid(row=0, column=1, padx=5, sticky='e')
-        change_label.bind('<Button-1>', lambda e, c=coin.get('id'): self.set_currency(c))
-        change_label.bind('<Enter>', lambda e: e.widget.config(cursor='hand2'))
-        change_label.bind('<Leave>', lambda e: e.widget.config(cursor=''))
-
-        if change_percentage >= 0:
-            change_label.configure(text_color="green")
+    # Filters coins based on input, debounced so only the last keystroke of a burst searches
+    def filter_coins(self, event):
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(self.search_debounce_ms, self.run_search)
+
+    @traced('widgets.search')
+    def run_search(self):
+        self.search_job = None
+        search_term = self.search_entry.get()
+        if not search_term.strip():
+            self.coins_list_frame.set_coins(self.coins_data, reset_scroll=True)
+            return
+        results = self.coin_index.search(search_term)
+        if results:
+            self.coins_list_frame.set_coins(results, reset_scroll=True)
         else:
-            change_label.configure(text_color="red")
+            self.coins_list_frame.show_message('No coins found')
+
+    # Indexes every coin CoinGecko lists (tens of thousands) so search is not limited to the markets page
+    def load_search_universe(self):
+        async def build_index():
+            coins = await self.client.acoins_list()
+            if not isinstance(coins, list):
+                raise ValueError('Unexpected /coins/list response')
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.scheduler.executor, CoinIndex, coins)
+
+        self.scheduler.request('search_index', build_index(), self.show_search_universe)
+
+    def show_search_universe(self, index):
+        index.add(self.coins_data)
+        self.coin_index = index
 
     # Updates coin info
     def update_coin_info(self, time_period):
-        self.coin_name_label.configure(text=f'{self.current_currency.capitalize()} ({time_period})')
+        self.chart_period = time_period
+        self.coin_name_label.configure(
+            text=f'{self.current_currency.capitalize()} ({time_period}){age_note(self.chart_age)}')
 
     # Updates time period
     def update_time_period(self, time_period):
@@ -341,15 +484,18 @@ class MainWindow(ctk.CTk):
     def set_currency(self, currency):
         self.current_currency = currency
         self.update_coin_info('24H')  # Default to 24H when changing currency
-        self.update_price()
         self.update_coin_rank()
-        self.update_social_links()
-        self.update_brief_description()
+        self.prefetcher.record_use(('coin', currency))
+        # Supersedes requests still running for the previously selected coin
+        self.load_panel('price', self.client.revalidate_price(currency), self.show_price)
+        self.load_panel('coin_info', self.client.revalidate_coin(currency), self.show_coin_info)
+        self.update_pin_button()
         self.get_data_and_plot('1')  # Update graph with default timespan
 
     # Updates brief description
-    def update_brief_description(self):
-        coin_info = self.get_coin_info()
+    def update_brief_description(self, coin_info=None):
+        if coin_info is None:
+            coin_info = self.get_coin_info()
         description = coin_info['description']
         if description and description.strip() != '':
             # Split the description into paragraphs
@@ -365,16 +511,16 @@ class MainWindow(ctk.CTk):
 
     # Gets the price from API response
     def get_price(self):
-        url = 'https://api.coingecko.com/api/v3/simple/price'
-        params = {'ids': self.current_currency, 'vs_currencies': 'usd'}
-        response = requests.get(url, params=params)
-        stats = response.json()
-        print(f"API Response: {stats}")  # Debugging line to print API response
+        return self.parse_price(self.client.simple_price(self.current_currency))
+
+    # Gets the price of current coin from /simple/price response
+    def parse_price(self, stats):
+        logger.debug('price response coin=%s body=%s', self.current_currency, stats)
         if self.current_currency in stats:
             price = str(stats[self.current_currency]['usd'])
         else:
             price = "N/A"
-            print(f"Error: '{self.current_currency}' not found in API response")
+            logger.warning('price missing coin=%s keys=%s', self.current_currency, sorted(stats))
         return price
 
     # Updates price label text
@@ -382,52 +528,57 @@ class MainWindow(ctk.CTk):
         price_today = self.get_price()
         self.current_price_label.configure(text='$' + price_today)
 
+    # Shows price from already fetched /simple/price response, age notes a last known price
+    def show_price(self, stats, age=0):
+        self.current_price_label.configure(text='$' + self.parse_price(stats) + age_note(age))
+
     # Updates coin rank text
     def update_coin_rank(self):
-        for coin in self.coins_data:
-            if coin['id'] == self.current_currency:
-                rank = coin.get('market_cap_rank', 'N/A')
-                self.coin_rank_label.configure(text=f'#{rank}')
-                break
+        coin = self.markets.get(self.current_currency, {})
+        self.coin_rank_label.configure(text=f'#{coin.get("market_cap_rank", "N/A")}')
 
     # Gets data from API and puts it on the plot
     def get_data_plot(self, timespan):
-        url = f'https://api.coingecko.com/api/v3/coins/{self.current_currency}/market_chart'
-        params = {'vs_currency': 'usd', 'days': timespan}
-        response = requests.get(url, params=params)
-        self.data = response.json()
-        if 'prices' not in self.data:
+        self.set_data_plot(self.chart_store.market_chart(self.current_currency, timespan))
+
+    # Stores market chart series for plotting
+    def set_data_plot(self, series):
+        if not len(series):
             raise ValueError('Server is overloaded. Try again later.')
+        self.series = series
 
-        if 'total_volumes' in self.data:
-            volumes = self.data['total_volumes']
-            if volumes:
-                self.total_volume = volumes[-1][1]
-            else:
-                self.total_volume = 'N/A'
-        else:
-            self.total_volume = 'N/A'
+        last_volume = series.last_volume
+        self.total_volume = last_volume if last_volume is not None else 'N/A'
 
         # High/Low calculation
-        prices = [price[1] for price in self.data['prices']]
-        self.highest_price = max(prices)
-        self.lowest_price = min(prices)
+        self.highest_price = series.high
+        self.lowest_price = series.low
 
     # Gets info about chosen coin
     def get_coin_info(self):
-        url = f'https://api.coingecko.com/api/v3/coins/{self.current_currency}'
-        response = requests.get(url)
-        coin_data = response.json()
+        return self.parse_coin_info(self.client.coin(self.current_currency))
+
+    # Picks description and social links from a CoinDetail record
+    def parse_coin_info(self, coin_detail):
         return {
-            'description': coin_data.get('description', {}).get('en', 'No description available'),
-            'twitter': coin_data.get('links', {}).get('twitter_screen_name'),
-            'facebook': coin_data.get('links', {}).get('facebook_username'),
-            'reddit': coin_data.get('links', {}).get('subreddit_url'),
+            'description': coin_detail.description,
+            'twitter': coin_detail.twitter,
+            'facebook': coin_detail.facebook,
+            'reddit': coin_detail.reddit,
         }
 
+    # Shows description and social links from an already fetched CoinDetail
+    # (description and links rarely change, so their age is not shown)
+    def show_coin_info(self, coin_detail, age=0):
+        coin_info = self.parse_coin_info(coin_detail)
+        self.update_social_links(coin_info)
+        self.update_brief_description(coin_info)
+
     # Formulates social links
-    def update_social_links(self):
-        social_info = self.get_coin_info()
+    @traced('widgets.social_links')
+    def update_social_links(self, social_info=None):
+        if social_info is None:
+            social_info = self.get_coin_info()
 
         # Clear previous widgets
         for widget in self.social_frame.winfo_children():
@@ -470,55 +621,56 @@ class MainWindow(ctk.CTk):
         import webbrowser
         webbrowser.open("https://github.com/mykolamysak/CryptoCurrency")
 
-    # Plots the data based on arrays got from API
+    # Plots the data based on arrays got from API (matplotlib datenums and prices)
     def data_plot(self):
-        x_list = []
-        y_list = []
-        if "prices" in self.data:
-            for item in self.data["prices"]:
-                x_list.append(datetime.utcfromtimestamp(item[0] / 1000))
-                y_list.append(item[1])
-        return x_list, y_list
+        if not hasattr(self, 'series'):
+            return [], []
+        from matplotlib import dates as mdates
+        return mdates.date2num(self.series.datetimes()), self.series.prices
+
+    # Creates figure and Tk canvas on first use (first plot or the idle after first paint),
+    # matplotlib is imported only then
+    def ensure_chart(self):
+        if self.chart is not None:
+            return
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        self.figure = Figure(figsize=(5, 4), dpi=100)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self.graph_frame)
+        self.canvas.get_tk_widget().grid(row=0, column=0, sticky='nsew')
+        self.canvas.mpl_connect('resize_event', self.on_chart_resize)
+        self.init_chart()
+
+    # Creates the chart artists once, later updates only swap data or restyle them
+    def init_chart(self):
+        from cryptocurrency.chart import PriceChart
+        self.chart = PriceChart(self.figure)
+        self.chart.apply_theme(self.get_theme_colors())
 
     # Illustrates the graphic
+    @traced('plot')
     def plot(self):
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        x, y = self.data_plot()
-
-        colors = self.get_theme_colors()
-
-        ax.plot(x, y, label=self.current_currency.capitalize(), color=colors['line'])
-        ax.fill_between(x, y, color=colors['fill'], alpha=0.1)
-
-        # Set the figure and axes background color
-        self.figure.patch.set_facecolor(colors['background'])
-        ax.set_facecolor(colors['background'])
-        ax.spines['bottom'].set_color(colors['text'])
-        ax.spines['left'].set_color(colors['text'])
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.tick_params(axis='x', colors=colors['text'])
-        ax.tick_params(axis='y', colors=colors['text'])
-
-        cursor = mplcursors.cursor(ax, hover=True)
-        cursor.connect("add", lambda sel: self.configure_annotation(sel))
-
-        ax.yaxis.set_major_formatter('${x:1.2f}')
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-        ax.figure.canvas.mpl_connect('axes_leave_event', lambda event: self.remove_annotation() if hasattr(self,
-                                                                                                           'current_annotation') else None)
-
-        ax.legend(facecolor=colors['background'], edgecolor=colors['text'], labelcolor=colors['text'])
-
-        self.canvas.draw()
-
-        if hasattr(self, 'highest_price') and hasattr(self, 'lowest_price'):
-            self.high_label.configure(text=f'${self.highest_price:,.2f}', text_color="#4CAF50")
-            self.low_label.configure(text=f'${self.lowest_price:,.2f}', text_color="#F44336")
-
-        if len(y) > 1:
-            percentage_diff = ((y[-1] - y[0]) / y[0]) * 100
+        self.ensure_chart()
+        full_x, full_y = self.data_plot()
+        # Only as many points as the canvas can show, High/Low and hover still use the full series
+        self.plotted_width = self.figure.bbox.width
+        # While coins are pinned the comparison overlay takes the place of the price line
+        if not self.pinned:
+            if self.chart_type == 'line':
+                from cryptocurrency.downsample import downsample
+                with span('plot.downsample', points=len(full_x)):
+                    x, y = downsample(full_x, full_y, self.plotted_width, self.downsample_method)
+                with span('plot.set_data', points=len(x)):
+                    self.chart.set_data(x, y, label=self.current_currency.capitalize(), hover_x=full_x,
+                                        hover_y=full_y)
+            elif self.candles is not None:
+                self.plot_candles()
+            self.plot_indicators(full_x=full_x)
+
+        self.update_high_low()
+
+        percentage_diff = self.series.percent_change if hasattr(self, 'series') else None
+        if percentage_diff is not None:
             if percentage_diff > 0:
                 self.price_percentage_label.configure(
                     text=f'↑ {percentage_diff:.2f}%', text_color="green")
@@ -531,26 +683,59 @@ class MainWindow(ctk.CTk):
         if hasattr(self, 'total_volume'):
             self.total_volume_label.configure(text=f'Total volume: ${self.total_volume:,.2f}')
 
-    # Annotation settings
-    def configure_annotation(self, sel):
-        colors = self.get_theme_colors()
-        self.current_annotation = sel.annotation
-        self.current_annotation.set_text(
-            f'Date: {mdates.num2date(sel.target[0]).strftime("%Y-%m-%d %H:%M:%S")}\nPrice: ${sel.target[1]:,.2f}')
-        self.current_annotation.set_backgroundcolor(colors['background'])
-        self.current_annotation.set_color(colors['text'])
-        sel.annotation.draggable(True)
-        sel.annotation.set_visible(True)
-
-    # Removes annotation while mouse leaves
-    def remove_annotation(self):
-        if hasattr(self, 'current_annotation'):
-            self.current_annotation.set_visible(False)
+    # Shows or hides an indicator using the series already loaded: no request, the price line is left as it is
+    def toggle_indicator(self, name):
+        if name in self.indicators:
+            from cryptocurrency.indicators import INDICATORS
+            self.indicators.remove(name)
+            if self.chart is not None:
+                self.chart.hide_indicator(INDICATORS[name].label)
+        else:
+            self.indicators.append(name)
+            self.plot_indicators([name])
+
+    # Draws indicators (all shown ones by default) over the chart series, thinned to the canvas width
+    @traced('plot.indicators')
+    def plot_indicators(self, names=None, full_x=None):
+        names = self.indicators if names is None else names
+        if not names or self.pinned or not hasattr(self, 'series'):
+            return
+        self.ensure_chart()
+        from cryptocurrency.downsample import stride_indices
+        from cryptocurrency.indicators import INDICATORS
+        if full_x is None:
+            full_x, _ = self.data_plot()
+        index = stride_indices(len(full_x), self.figure.bbox.width)
+        x = full_x[index]
+        for name in names:
+            indicator = INDICATORS[name]
+            lines = self.indicator_engine.compute(self.current_currency, self.chart_timespan, indicator, self.series)
+            self.chart.set_indicator(indicator.label, x, {label: y[index] for label, y in lines.items()},
+                                     indicator.overlay)
+
+    # Re-plots after window resize so the point count matches the new canvas width
+    def on_chart_resize(self, event):
+        if getattr(self, 'resize_job', None):
+            self.after_cancel(self.resize_job)
+        self.resize_job = self.after(200, self.replot_for_width)
+
+    def replot_for_width(self):
+        self.resize_job = None
+        plotted_width = getattr(self, 'plotted_width', None)
+        if hasattr(self, 'series') and plotted_width and abs(self.figure.bbox.width - plotted_width) > plotted_width * 0.1:
+            self.plot()
 
     # Plots the data depended on specified time period
     def get_data_and_plot(self, timespan):
-        loop = asyncio.get_event_loop()
-        loop.run_in_executor(None, self.fetch_and_plot, timespan)
+        self.chart_age = 0
+        self.chart_timespan = str(timespan)
+        self.prefetcher.record_use(('chart', self.current_currency, self.chart_timespan))
+        self.load_panel('chart', self.stream_chart(self.current_currency, timespan),
+                        self.show_chart, self.show_chart_error)
+        if self.pinned:
+            self.load_comparison()
+        if self.chart_type == 'candles':
+            self.load_candles()
 
         # Update the time period in the coin info
         time_period_map = {
@@ -563,29 +748,163 @@ class MainWindow(ctk.CTk):
         }
         self.update_coin_info(time_period_map.get(timespan, timespan))
 
-        # Update High/Low values
-        self.after(0, self.update_high_low)
-
     # Updates highest/lowest prices
     def update_high_low(self):
         if hasattr(self, 'highest_price') and hasattr(self, 'lowest_price'):
             self.high_label.configure(text=f'${self.highest_price:,.2f}', text_color="#4CAF50")
             self.low_label.configure(text=f'${self.lowest_price:,.2f}', text_color="#F44336")
 
-    # Executes async def in order to get data for graph plotting
-    def fetch_and_plot(self, timespan):
-        asyncio.run(self._fetch_and_plot(timespan))
-
-    # Gets the data and plots the graph
-    async def _fetch_and_plot(self, timespan):
-        loop = asyncio.get_running_loop()
-        with ThreadPoolExecutor() as pool:
-            try:
-                await loop.run_in_executor(pool, self.get_data_plot, timespan)
-                self.after(0, self.plot)
-                self.after(0, self.update_volume_info)
-            except Exception as e:
-                self.after(0, lambda: self.show_error_message(str(e)))
+    # Streams the stored chart series, then the refreshed one, on the client loop
+    async def stream_chart(self, coin, timespan):
+        async for series, age in self.chart_store.arevalidate(coin, timespan):
+            if not len(series):
+                raise ValueError('Server is overloaded. Try again later.')
+            yield series, age
+
+    # Plots the latest chart series (runs on the Tk thread), age notes a stored series still being refreshed
+    def show_chart(self, series, age=0):
+        self.set_data_plot(series)
+        self.plot()
+        self.update_volume_info()
+        self.chart_age = age
+        self.update_coin_info(self.chart_period)
+        self.startup.done('chart')
+        self.prefetcher.adjacent_charts(self.current_currency, self.chart_timespan)
+
+    def on_chart_type_change(self, value):
+        self.chart_type = 'candles' if value == 'Candles' else 'line'
+        if self.chart_type == 'candles':
+            self.load_candles()
+        else:
+            self.scheduler.cancel('candles')
+            self.candles = None
+            if self.chart is not None:
+                self.chart.clear_candles()
+            if self.pinned and self.chart is not None:
+                # clear_candles() brought the price line back under the comparison overlay
+                self.plot_comparison()
+            elif hasattr(self, 'series'):
+                self.plot()
+
+    def load_candles(self):
+        self.candles = None
+        bars = int(self.figure.bbox.width) if self.chart is not None else 1000
+        self.scheduler.request('candles', self.fetch_candles(self.current_currency, self.chart_timespan, bars),
+                               self.show_candles, self.show_chart_error)
+
+    # OHLC bars from /ohlc, or aggregated from the market chart ticks when that fails, with volumes from the
+    # market chart; merged down to at most `bars` candles (one per pixel of the canvas)
+    async def fetch_candles(self, coin, timespan, bars):
+        from cryptocurrency.candles import Candles, candle_interval
+        series, candles = await asyncio.gather(self.chart_store.amarket_chart(coin, timespan),
+                                               self.client.aohlc(coin, timespan), return_exceptions=True)
+        if isinstance(series, BaseException):
+            raise series
+        if isinstance(candles, BaseException):
+            logger.warning('OHLC of %s failed, aggregating chart ticks: %s', coin, candles)
+            candles = Candles.empty()
+        if not len(candles):
+            candles = Candles.from_series(series, candle_interval(timespan))
+        if not len(candles):
+            raise ValueError('Server is overloaded. Try again later.')
+        return candles.with_volumes(series).resample(bars)
+
+    def show_candles(self, candles):
+        self.candles = candles
+        if not self.pinned:
+            self.plot_candles()
+
+    # Candles are drawn centred on their bar, /ohlc timestamps mark the bar's end
+    @traced('plot.candles')
+    def plot_candles(self):
+        self.ensure_chart()
+        import numpy as np
+        from matplotlib import dates as mdates
+        from cryptocurrency.candles import candle_interval
+        candles = self.candles
+        ends = mdates.date2num(candles.datetimes())
+        if len(ends) > 1:
+            width = float(np.median(np.diff(ends)))
+        else:
+            width = candle_interval(self.chart_timespan) / 86_400_000
+        self.chart.set_candles(ends - width / 2, candles.open, candles.high, candles.low, candles.close,
+                               candles.volumes, width)
+
+    # Pins the selected coin to the comparison chart, or unpins it
+    def toggle_pin(self):
+        coin = self.current_currency
+        if coin in self.pinned:
+            self.pinned.remove(coin)
+        else:
+            self.pinned.append(coin)
+        self.update_pin_button()
+        if self.pinned:
+            self.load_comparison()
+        else:
+            self.scheduler.cancel('compare')
+            self.comparison = None
+            self.ensure_chart()
+            self.chart.clear_comparison()
+            self.plot()
+
+    def update_pin_button(self):
+        self.pin_button.configure(text='Unpin' if self.current_currency in self.pinned else 'Pin')
+
+    # Pinned coins followed by the selected one
+    def comparison_coins(self):
+        coins = list(self.pinned)
+        if self.current_currency not in coins:
+            coins.append(self.current_currency)
+        return coins
+
+    def load_comparison(self):
+        points = int(self.figure.bbox.width) if self.chart is not None else 1000
+        self.scheduler.request('compare', self.fetch_comparison(self.comparison_coins(), self.chart_timespan, points),
+                               self.show_comparison, self.show_chart_error)
+
+    # Fetches the charts of all compared coins at once (the rate limiter spaces the requests out)
+    # and aligns them onto a common time grid, coins that fail are left out
+    async def fetch_comparison(self, coins, timespan, points):
+        from cryptocurrency.compare import Comparison
+        results = await asyncio.gather(*(self.chart_store.amarket_chart(coin, timespan) for coin in coins),
+                                       return_exceptions=True)
+        series_by_coin = {}
+        for coin, result in zip(coins, results):
+            if isinstance(result, Exception):
+                logger.warning('Comparison chart of %s failed: %s', coin, result)
+            else:
+                series_by_coin[coin] = result
+        return Comparison.from_series(series_by_coin, points)
+
+    def show_comparison(self, comparison):
+        self.comparison = comparison
+        self.plot_comparison()
+
+    @traced('plot.comparison')
+    def plot_comparison(self):
+        self.ensure_chart()
+        from matplotlib import dates as mdates
+        self.chart.set_comparison(mdates.date2num(self.comparison.datetimes()),
+                                  self.comparison.normalized(self.compare_mode),
+                                  [coin.capitalize() for coin in self.comparison.coins], self.compare_mode)
+
+    def on_compare_mode_change(self, value):
+        self.compare_mode = 'index' if value == '100' else 'percent'
+        if self.comparison is not None and self.pinned:
+            self.plot_comparison()
+
+    # Pointer rested on a coin card: warm its details and 24H chart
+    def prefetch_coin(self, coin_id):
+        if coin_id != self.current_currency:
+            self.prefetcher.coin(coin_id)
+            self.prefetcher.chart(coin_id, '1')
+
+    def show_chart_error(self, error):
+        if isinstance(error, CircuitOpenError) or getattr(error, 'throttled', False):
+            self.show_error_message()
+        else:
+            self.show_error_message(str(error))
+        self.startup.done('chart')
 
     # Updates volume info
     def update_volume_info(self):
@@ -594,29 +913,87 @@ class MainWindow(ctk.CTk):
 
     # Gets global market info from API
     def update_global_market_info(self):
-        url = 'https://api.coingecko.com/api/v3/global'
-        response = requests.get(url)
-        global_data = response.json().get('data')
+        self.show_global_market_info(self.client.global_data())
+
+    # Shows already fetched /global response
+    def show_global_market_info(self, response, age=0):
+        global_data = response.get('data')
         if global_data:
             total_volume = global_data['total_volume']['usd']
             market_cap = global_data['total_market_cap']['usd']
-            self.global_market_info_label.configure(text=f'Total market volume: ${total_volume:,.2f}')
-            self.global_market_cap_label.configure(text=f'Global market cap: ${market_cap:,.2f}')
+            note = age_note(age)
+            self.global_market_info_label.configure(text=f'Total market volume: ${total_volume:,.2f}{note}')
+            self.global_market_cap_label.configure(text=f'Global market cap: ${market_cap:,.2f}{note}')
 
     # Gets info about coins data to make a list
     def update_coin_list(self):
-        url = 'https://api.coingecko.com/api/v3/coins/markets'
-        params = {'vs_currency': 'usd', 'order': 'market_cap_desc', 'per_page': 100, 'page': 1}
-        response = requests.get(url, params=params)
-        self.coins_data = response.json()
-
-        for widget in self.coins_list_frame.winfo_children():
-            widget.destroy()
-
-        for index, coin in enumerate(self.coins_data):
-            self.create_coin_widget(coin, index)
-
-        self.coins_list_frame.update_idletasks()  # Force update of the frame
+        self.show_coin_list(self.client.markets(page=1, per_page=100))
+
+    # Streams /coins/markets pages concurrently, each page is shown as soon as it arrives
+    def load_market_pages(self):
+        loader = MarketPagesLoader(self.client)
+
+        def on_page(page, coins):
+            self.call_soon(self.show_market_page, page, coins)
+
+        def loaded(count):
+            logger.info('Loaded %s coins from %s market pages', count, self.market_pages)
+            self.startup.done('coins')
+            self.schedule_price_poll()
+
+        def failed(error):
+            logger.warning('Loading market pages failed: %s', error)
+            self.startup.done('coins')
+
+        self.scheduler.request('markets', loader.load(self.market_pages, on_page), loaded, failed)
+
+    # Starts next live price refresh after price_poll_interval
+    def schedule_price_poll(self):
+        if self.price_poll_job is not None:
+            self.after_cancel(self.price_poll_job)
+        self.price_poll_job = self.after(int(self.price_poll_interval * 1000), self.poll_prices)
+
+    # Refreshes prices of all listed coins with batched /simple/price requests
+    def poll_prices(self):
+        self.price_poll_job = None
+        ids = list(self.markets.by_id)
+        if self.current_currency not in self.markets:
+            ids.append(self.current_currency)
+        self.scheduler.request('live_prices', self.price_poller.fetch(ids), self.show_live_prices,
+                               lambda error: logger.warning('Price refresh failed: %s', error))
+        self.schedule_price_poll()
+
+    # Applies polled prices, only labels of coins whose quote changed are touched
+    @traced('widgets.live_prices')
+    def show_live_prices(self, quotes):
+        changed = self.price_poller.diff(quotes)
+        for coin_id, quote in changed.items():
+            coin = self.markets.get(coin_id)
+            if coin is not None:
+                apply_quote(coin, quote)
+        if changed:
+            self.coins_list_frame.update_coins(changed)
+        if self.current_currency in changed:
+            self.current_price_label.configure(text='$' + str(changed[self.current_currency][0]))
+
+    # Builds coins list from already fetched /coins/markets response
+    def show_coin_list(self, coins_data):
+        self.show_market_page(1, coins_data)
+
+    # Adds one /coins/markets page to the list
+    @traced('widgets.market_page')
+    def show_market_page(self, page, coins):
+        self.markets.add_page(page, coins)
+        self.coins_data = self.markets.coins
+        self.price_poller.seed(coins)
+        self.coin_index.add(coins)
+        self.startup.done('coins')
+        if self.current_currency in self.markets:
+            self.update_coin_rank()
+        if self.search_entry.get().strip():
+            self.run_search()
+        else:
+            self.coins_list_frame.set_coins(self.coins_data)
 
     # Shows error message, while API is overloaded
     def show_error_message(self, message="Server is overloaded. Try again later."):
@@ -638,6 +1015,34 @@ class MainWindow(ctk.CTk):
         y = (error_window.winfo_screenheight() // 2) - (height // 2)
         error_window.geometry('{}x{}+{}+{}'.format(width, height, x, y))
 
+    # Rolling p50/p95 latency per traced operation
+    def show_trace_summary(self, event=None):
+        if not tracer.enabled:
+            self.show_error_message(f'Tracing is off. Start the app with {TRACE_ENV}=1 to collect latencies.')
+            return
+        summary_window = ctk.CTkToplevel(self)
+        summary_window.title("Latency summary")
+        summary_window.geometry("640x400")
+        textbox = ctk.CTkTextbox(summary_window, font=('Courier', 12), wrap='none')
+        textbox.pack(fill='both', expand=True, padx=10, pady=10)
+        textbox.insert('end', tracer.format_summary())
+        textbox.configure(state='disabled')
+
+    # Releases network resources before closing the window
+    def on_close(self):
+        if self.price_poll_job is not None:
+            self.after_cancel(self.price_poll_job)
+        self.prefetcher.report()
+        if tracer.enabled:
+            logger.info('Latency summary:\n%s', tracer.format_summary())
+            if self.trace_path:
+                tracer.export_chrome_trace(self.trace_path)
+                logger.info('Trace written to %s', self.trace_path)
+        self.scheduler.shutdown()
+        self.client.close()
+        self.chart_store.close()
+        self.destroy()
+
     # Centralizes the main window
     def center_window(self, window, width, height):
         screen_width = window.winfo_screenwidth()
@@ -648,5 +1053,8 @@ class MainWindow(ctk.CTk):
 
 
 if __name__ == "__main__":
+    # key=value messages, level from CRYPTOCURRENCY_LOG_LEVEL (e.g. DEBUG for raw API responses)
+    logging.basicConfig(level=os.environ.get('CRYPTOCURRENCY_LOG_LEVEL', 'INFO').upper(),
+                        format='%(asctime)s level=%(levelname)s logger=%(name)s %(message)s')
     app = MainWindow()
     app.mainloop()
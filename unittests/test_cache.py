@@ -0,0 +1,174 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from cryptocurrency.cache import ResponseCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ResponseCache(max_entries=3, max_bytes=100, clock=self.clock)
+
+    def test_ttl_per_endpoint(self):
+        self.assertEqual(self.cache.ttl_for('simple/price'), 30)
+        self.assertEqual(self.cache.ttl_for('/coins/bitcoin/market_chart'), 60)
+        self.assertEqual(self.cache.ttl_for('coins/bitcoin'), 6 * 60 * 60)
+        self.assertEqual(self.cache.ttl_for('unknown'), self.cache.default_ttl)
+
+    def test_key_ignores_param_order(self):
+        self.assertEqual(ResponseCache.key('coins/markets', {'page': 1, 'per_page': 100}),
+                         ResponseCache.key('/coins/markets/', {'per_page': 100, 'page': 1}))
+
+    def test_entry_expires_after_ttl(self):
+        key = self.cache.key('simple/price', {'ids': 'bitcoin'})
+        self.cache.put(key, {'bitcoin': {'usd': 1}}, size=10)
+        self.clock.now = 29
+        self.assertEqual(self.cache.get(key), {'bitcoin': {'usd': 1}})
+        self.clock.now = 31
+        self.assertIsNone(self.cache.get(key))
+
+    def test_peek_returns_expired_value_with_age(self):
+        key = self.cache.key('simple/price', {'ids': 'bitcoin'})
+        self.assertIsNone(self.cache.peek(key))
+        self.cache.put(key, {'bitcoin': {'usd': 1}}, size=10)
+        self.clock.now = 10
+        self.assertEqual(self.cache.peek(key), ({'bitcoin': {'usd': 1}}, 10, False))
+        self.clock.now = 45
+        self.assertEqual(self.cache.peek(key), ({'bitcoin': {'usd': 1}}, 45, True))
+        self.assertEqual(self.cache.stats()['hits'] + self.cache.stats()['misses'], 0)
+
+    def test_lru_eviction_by_entry_count(self):
+        for name in ('a', 'b', 'c'):
+            self.cache.put(self.cache.key(name), name, size=1)
+        self.cache.get(self.cache.key('a'))
+        self.cache.put(self.cache.key('d'), 'd', size=1)
+        self.assertIsNone(self.cache.get(self.cache.key('b')))
+        self.assertEqual(self.cache.get(self.cache.key('a')), 'a')
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+
+    def test_lru_eviction_by_bytes(self):
+        self.cache.put(self.cache.key('a'), 'a', size=60)
+        self.cache.put(self.cache.key('b'), 'b', size=60)
+        self.assertIsNone(self.cache.get(self.cache.key('a')))
+        self.assertEqual(self.cache.stats()['bytes'], 60)
+
+    def test_hit_and_miss_counters(self):
+        key = self.cache.key('global')
+        loader_calls = []
+
+        def loader():
+            loader_calls.append(1)
+            return {'data': {}}, 5
+
+        self.cache.get_or_load(key, loader)
+        self.cache.get_or_load(key, loader)
+        stats = self.cache.stats()
+        self.assertEqual(len(loader_calls), 1)
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_loader_error_is_not_cached(self):
+        key = self.cache.key('global')
+
+        def failing():
+            raise ValueError('boom')
+
+        with self.assertRaises(ValueError):
+            self.cache.get_or_load(key, failing)
+        self.assertEqual(self.cache.get_or_load(key, lambda: ('ok', 1)), 'ok')
+
+    def test_concurrent_loads_share_one_request(self):
+        cache = ResponseCache()
+        key = cache.key('coins/bitcoin')
+        calls = []
+        results = []
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.05)
+            return {'id': 'bitcoin'}, 10
+
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_load(key, loader)))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'id': 'bitcoin'}] * 5)
+        self.assertEqual(cache.stats()['shared'], 4)
+
+    def test_async_concurrent_loads_share_one_request(self):
+        cache = ResponseCache()
+        key = cache.key('coins/bitcoin')
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 'bitcoin', 10
+
+        async def main():
+            return await asyncio.gather(*(cache.aget_or_load(key, loader) for _ in range(3)))
+
+        self.assertEqual(asyncio.run(main()), ['bitcoin'] * 3)
+        self.assertEqual(len(calls), 1)
+
+    def test_cancelled_loader_does_not_cancel_waiters(self):
+        cache = ResponseCache()
+        key = cache.key('coins/bitcoin/market_chart')
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 'chart', 10
+
+        async def main():
+            first = asyncio.ensure_future(cache.aget_or_load(key, loader))
+            await asyncio.sleep(0)
+            second = asyncio.ensure_future(cache.aget_or_load(key, loader))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await first
+            return await second
+
+        self.assertEqual(asyncio.run(main()), 'chart')
+        # The waiter loaded it again itself
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(cache.stats()['inflight'], 0)
+
+    def test_cancelled_waiter_does_not_cancel_the_load(self):
+        cache = ResponseCache()
+        key = cache.key('coins/bitcoin/market_chart')
+
+        async def loader():
+            await asyncio.sleep(0.05)
+            return 'chart', 10
+
+        async def main():
+            first = asyncio.ensure_future(cache.aget_or_load(key, loader))
+            await asyncio.sleep(0)
+            second = asyncio.ensure_future(cache.aget_or_load(key, loader))
+            await asyncio.sleep(0.01)
+            second.cancel()
+            return await first
+
+        self.assertEqual(asyncio.run(main()), 'chart')
+        self.assertEqual(cache.get(key), 'chart')
+
+
+if __name__ == '__main__':
+    unittest.main()
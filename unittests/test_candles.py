@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+
+from cryptocurrency.candles import Candles, candle_interval
+from cryptocurrency.series import MarketSeries
+
+MINUTE = 60_000
+
+
+class TestCandles(unittest.TestCase):
+
+    def test_interval_follows_coingecko(self):
+        self.assertEqual([candle_interval(days) // MINUTE for days in ('1', '7', '30', '90', '365', 'max')],
+                         [30, 240, 240, 5760, 5760, 5760])
+
+    def test_from_response(self):
+        candles = Candles.from_response([[2000, 2.0, 3.0, 1.5, 2.5], [1000, 1.0, 2.0, 0.5, 2.0],
+                                         [3000, None, 1.0, 1.0, 1.0]])
+        self.assertEqual(candles.timestamps.tolist(), [1000, 2000])
+        self.assertEqual(candles.high.tolist(), [2.0, 3.0])
+        self.assertTrue(np.isnan(candles.volumes).all())
+        self.assertEqual(len(Candles.from_response([])), 0)
+        with self.assertRaises(ValueError):
+            Candles.from_response({'error': 'coin not found'})
+
+    def test_ticks_are_aggregated_into_bars(self):
+        rng = np.random.default_rng(0)
+        timestamps = np.sort(rng.choice(np.arange(1, 24 * 60), 200, replace=False)) * MINUTE
+        series = MarketSeries(timestamps, rng.random(200) * 100, np.arange(200.0))
+        candles = Candles.from_series(series, 30 * MINUTE)
+
+        ends = -(-timestamps // (30 * MINUTE)) * 30 * MINUTE
+        self.assertEqual(candles.timestamps.tolist(), np.unique(ends).tolist())
+        for i, end in enumerate(candles.timestamps):
+            prices = series.prices[ends == end]
+            self.assertEqual((candles.open[i], candles.high[i], candles.low[i], candles.close[i]),
+                             (prices[0], prices.max(), prices.min(), prices[-1]))
+            self.assertEqual(candles.volumes[i], series.volumes[ends == end][-1])
+
+    def test_with_volumes_takes_last_known_volume(self):
+        candles = Candles([1000, 2000, 3000], [1, 1, 1], [1, 1, 1], [1, 1, 1], [1, 1, 1])
+        series = MarketSeries([1500, 2000, 2500], [1.0, 1.0, 1.0], [10.0, 20.0, 30.0])
+        self.assertEqual(np.nan_to_num(candles.with_volumes(series).volumes, nan=-1).tolist(), [-1, 20.0, 30.0])
+
+    def test_resample_merges_consecutive_bars(self):
+        candles = Candles(np.arange(1, 8) * 1000, [1, 2, 3, 4, 5, 6, 7], [5, 9, 5, 5, 5, 8, 5],
+                          [0, 1, -3, 1, 1, 1, 1], [2, 3, 4, 5, 6, 7, 8], np.arange(7.0))
+        merged = candles.resample(3)
+        self.assertEqual(merged.timestamps.tolist(), [3000, 6000, 7000])
+        self.assertEqual(merged.open.tolist(), [1, 4, 7])
+        self.assertEqual(merged.high.tolist(), [9, 8, 5])
+        self.assertEqual(merged.low.tolist(), [-3, 1, 1])
+        self.assertEqual(merged.close.tolist(), [4, 7, 8])
+        self.assertEqual(merged.volumes.tolist(), [2, 5, 6])
+        self.assertIs(candles.resample(10), candles)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+import unittest
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from cryptocurrency.chart import VOLUME_PANEL, PriceChart
+from cryptocurrency.trace import tracer
+
+COLORS = {'background': '#333333', 'text': '#FFFFFF', 'line': '#1E69A4', 'fill': '#00BFFF'}
+
+
+class TestPriceChart(unittest.TestCase):
+
+    def setUp(self):
+        self.figure = Figure()
+        self.chart = PriceChart(self.figure)
+        self.chart.apply_theme(COLORS)
+
+    def test_artists_are_reused_between_updates(self):
+        line, fill, legend = self.chart.line, self.chart.fill, self.chart.legend
+        self.chart.set_data(np.arange(10.0), np.arange(10.0) + 5, label='Bitcoin')
+        self.chart.set_data(np.arange(20.0), np.arange(20.0) + 5, label='Ethereum')
+        self.assertIs(self.chart.line, line)
+        self.assertIs(self.chart.fill, fill)
+        self.assertIs(self.chart.legend, legend)
+        self.assertEqual(len(self.figure.axes), 1)
+        self.assertEqual(len(self.chart.ax.lines), 1)
+        self.assertEqual(len(self.chart.ax.collections), 1)
+        self.assertEqual(legend.get_texts()[0].get_text(), 'Ethereum')
+
+    def test_draw_is_traced_from_request_to_frame(self):
+        figure = Figure()
+        FigureCanvasAgg(figure)
+        chart = PriceChart(figure)
+        tracer.enable()
+        self.addCleanup(tracer.disable)
+        self.addCleanup(tracer.clear)
+        # The Agg canvas draws right away on draw_idle, each request is a frame
+        chart.request_draw()
+        chart.request_draw()
+        self.assertIsNone(chart.draw_requested)
+        self.assertEqual(tracer.summary()['plot.draw']['count'], 2)
+        # Draws nobody requested through the chart (e.g. a window resize) are not counted
+        figure.canvas.draw()
+        self.assertEqual(tracer.summary()['plot.draw']['count'], 2)
+
+    def test_data_swap_updates_line_fill_and_limits(self):
+        self.chart.set_data([1.0, 2.0, 3.0], [10.0, 30.0, 20.0])
+        self.assertEqual(self.chart.line.get_ydata().tolist(), [10.0, 30.0, 20.0])
+        verts = self.chart.fill.get_paths()[0].vertices
+        self.assertEqual(verts[0].tolist(), [1.0, 0.0])
+        self.assertEqual(verts[2].tolist(), [2.0, 30.0])
+        low, high = self.chart.ax.get_ylim()
+        self.assertLessEqual(low, 0)
+        self.assertGreaterEqual(high, 30)
+
+    def test_theme_restyles_existing_artists(self):
+        self.chart.apply_theme(dict(COLORS, background='#CFCFCF', text='#000000'))
+        self.assertEqual(matplotlib.colors.to_hex(self.chart.ax.get_facecolor()), '#cfcfcf')
+        self.assertEqual(matplotlib.colors.to_hex(self.chart.legend.get_texts()[0].get_color()), '#000000')
+        self.assertEqual(len(self.figure.axes), 1)
+
+    def test_comparison_is_one_collection_for_any_number_of_coins(self):
+        x = np.arange(50.0)
+        self.chart.set_comparison(x, np.vstack([x * i for i in range(5)]), [f'Coin {i}' for i in range(5)])
+        overlay = self.chart.overlay
+        self.chart.set_comparison(x, np.vstack([x * i for i in range(20)]), [f'Coin {i}' for i in range(20)], 'index')
+
+        self.assertIs(self.chart.overlay, overlay)
+        self.assertEqual(len(overlay.get_segments()), 20)
+        self.assertEqual(len(self.chart.ax.collections), 2)
+        self.assertEqual(len(self.chart.ax.lines), 1)
+        self.assertFalse(self.chart.line.get_visible())
+        self.assertEqual([t.get_text() for t in self.chart.overlay_legend.get_texts()][-1], 'Coin 19')
+        self.assertGreaterEqual(self.chart.ax.get_ylim()[1], 49 * 19)
+        self.assertEqual(matplotlib.colors.to_hex(self.chart.overlay_legend.get_texts()[0].get_color()), '#ffffff')
+
+    def test_clear_comparison_restores_price_line(self):
+        self.chart.set_comparison(np.arange(3.0), [[0.0, 5.0, -5.0]], ['Bitcoin'])
+        self.chart.clear_comparison()
+        self.chart.set_data([1.0, 2.0, 3.0], [10.0, 30.0, 20.0])
+
+        self.assertFalse(self.chart.overlay.get_visible())
+        self.assertFalse(self.chart.overlay_legend.get_visible())
+        self.assertTrue(self.chart.line.get_visible())
+        self.assertEqual(self.chart.ax.yaxis.get_major_formatter()(5.0), '$5.00')
+
+    def test_indicator_toggle_keeps_price_line(self):
+        x = np.arange(100.0)
+        self.chart.set_data(x, x + 5, label='Bitcoin')
+        line_data = self.chart.line.get_ydata()
+        self.chart.set_indicator('SMA 20', x, {'SMA 20': x + 4})
+        self.chart.set_indicator('Bollinger 20 2', x, {'middle': x + 5, 'upper': x + 500, 'lower': x})
+
+        self.assertIs(self.chart.line.get_ydata(), line_data)
+        self.assertEqual([t.get_text() for t in self.chart.legend.get_texts()], ['Bitcoin', 'SMA 20', 'Bollinger 20 2'])
+        self.assertGreaterEqual(self.chart.ax.get_ylim()[1], 599)
+        sma = self.chart.indicator_lines['SMA 20'][0]
+
+        self.chart.hide_indicator('Bollinger 20 2')
+        self.chart.set_indicator('SMA 20', x, {'SMA 20': x + 3})
+        self.assertIs(self.chart.indicator_lines['SMA 20'][0], sma)
+        self.assertEqual(len(self.chart.ax.lines), 5)
+        self.assertEqual([t.get_text() for t in self.chart.legend.get_texts()], ['Bitcoin', 'SMA 20'])
+        # Hidden bands no longer stretch the axes
+        self.assertLess(self.chart.ax.get_ylim()[1], 200)
+
+    def test_indicator_panels_stack_under_price_axes(self):
+        x = np.arange(100.0)
+        self.chart.set_data(x, x + 5)
+        frame = self.chart.ax.get_position().bounds
+        self.chart.set_indicator('RSI 14', x, {'RSI 14': np.full(100, 50.0)}, overlay=False)
+        self.chart.set_indicator('Volatility 20', x, {'Volatility 20': np.ones(100)}, overlay=False)
+        rsi, volatility = self.chart.panels['RSI 14'], self.chart.panels['Volatility 20']
+
+        self.assertLess(self.chart.ax.get_position().height, frame[3])
+        self.assertGreater(rsi.get_position().y0, volatility.get_position().y0)
+        self.assertIs(rsi.get_shared_x_axes().joined(rsi, self.chart.ax), True)
+        self.assertEqual(matplotlib.colors.to_hex(rsi.get_facecolor()), '#333333')
+
+        self.chart.hide_indicator('RSI 14')
+        self.chart.hide_indicator('Volatility 20')
+        self.assertFalse(rsi.get_visible())
+        self.assertEqual(self.chart.ax.get_position().bounds, frame)
+
+    def test_thousands_of_candles_are_one_collection_each(self):
+        self.chart.set_data(np.arange(10.0), np.arange(10.0))
+        frame = self.chart.ax.get_position().bounds
+        x = np.arange(5_000.0)
+        close = 100 + np.sin(x / 50) * 10
+        open = close + np.where(x % 3, -1, 1)
+        self.chart.set_candles(x, open, close + 3, close - 4, close, np.abs(close), 1.0)
+        self.chart.figure.canvas.draw()
+
+        # One compound path per color
+        self.assertEqual(len(self.chart.bodies.get_paths()), 2)
+        self.assertEqual([len(path.vertices) for path in self.chart.bodies.get_paths()], [5 * 3_333, 5 * 1_667])
+        self.assertEqual(len(self.chart.ax.collections), 3)
+        self.assertEqual(len(self.chart.panels[VOLUME_PANEL].collections), 1)
+        # More candles than pixels: volumes are one outline per color instead of a rectangle per candle
+        self.assertEqual([len(path.vertices) for path in self.chart.volume_bars.get_paths()], [2 * 5_000 + 3] * 2)
+        self.assertFalse(self.chart.line.get_visible())
+        self.assertTrue(self.chart.panels[VOLUME_PANEL].get_visible())
+        self.assertLess(self.chart.ax.get_position().height, frame[3])
+        low, high = self.chart.ax.get_ylim()
+        self.assertLessEqual(low, close.min() - 4)
+        self.assertGreaterEqual(high, close.max() + 3)
+        # Rising candles and their volume bars share a color
+        self.assertEqual(matplotlib.colors.to_hex(self.chart.bodies.get_facecolor()[0]), '#26a69a')
+        self.assertEqual(matplotlib.colors.to_hex(self.chart.volume_bars.get_facecolor()[0]), '#26a69a')
+
+        self.chart.clear_candles()
+        self.assertFalse(self.chart.bodies.get_visible())
+        self.assertFalse(self.chart.panels[VOLUME_PANEL].get_visible())
+        self.assertTrue(self.chart.line.get_visible())
+        self.assertEqual(self.chart.ax.get_position().bounds, frame)
+
+    def test_few_candles_get_a_volume_bar_each(self):
+        x = np.arange(10.0)
+        close = 100 + x
+        self.chart.set_candles(x, close - 1, close + 1, close - 2, close, np.full(10, 5.0), 1.0)
+
+        self.assertEqual([len(path.vertices) for path in self.chart.volume_bars.get_paths()], [5 * 10, 0])
+        self.assertEqual(self.chart.panels[VOLUME_PANEL].get_ylabel(), '24h volume')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+
+from cryptocurrency.chart_store import MarketChartStore, granularity_for, HOUR, DAY
+
+NOW = 1_700_000_000_000
+
+
+def chart(points):
+    return {
+        'prices': [[ts, price] for ts, price in points],
+        'market_caps': [[ts, 0] for ts, _ in points],
+        'total_volumes': [[ts, price * 10] for ts, price in points],
+    }
+
+
+class TestMarketChartStore(unittest.TestCase):
+
+    def setUp(self):
+        self.now = NOW
+        self.client = MagicMock()
+        self.store = MarketChartStore(self.client, path=':memory:', clock=lambda: self.now / 1000)
+        self.addCleanup(self.store.close)
+
+    def test_granularity_for(self):
+        self.assertEqual(granularity_for('1'), 'minutely')
+        self.assertEqual(granularity_for('30'), 'hourly')
+        self.assertEqual(granularity_for('365'), 'daily')
+        self.assertEqual(granularity_for('max'), 'daily')
+
+    def test_first_request_fetches_full_series(self):
+        self.client.market_chart.return_value = chart([(NOW - 2 * HOUR, 1.0), (NOW - HOUR, 2.0)])
+        data = self.store.market_chart('bitcoin', '7')
+        self.client.market_chart.assert_called_once_with('bitcoin', '7', 'usd')
+        self.assertEqual(data.timestamps.tolist(), [NOW - 2 * HOUR, NOW - HOUR])
+        self.assertEqual(data.prices.tolist(), [1.0, 2.0])
+
+    def test_recent_request_is_served_from_store(self):
+        self.client.market_chart.return_value = chart([(NOW - 2 * HOUR, 1.0), (NOW - HOUR, 2.0)])
+        self.store.market_chart('bitcoin', '7')
+        self.now += 10 * 1000
+        data = self.store.market_chart('bitcoin', '7')
+        self.assertEqual(self.client.market_chart.call_count, 1)
+        self.client.market_chart_range.assert_not_called()
+        self.assertEqual(data.timestamps.tolist(), [NOW - 2 * HOUR, NOW - HOUR])
+        self.assertEqual(data.volumes.tolist(), [10.0, 20.0])
+
+    def test_stale_series_fetches_only_the_tail(self):
+        self.client.market_chart.return_value = chart([(NOW - 2 * HOUR, 1.0), (NOW - HOUR, 2.0), (NOW, 3.0)])
+        self.store.market_chart('bitcoin', '7')
+
+        self.now = NOW + 2 * HOUR
+        # Range endpoint answers with finer points than the stored hourly series
+        self.client.market_chart_range.return_value = chart(
+            [(NOW, 3.0), (NOW + 30 * 60 * 1000, 3.5), (NOW + HOUR, 4.0), (NOW + 2 * HOUR, 5.0)])
+        data = self.store.market_chart('bitcoin', '7')
+
+        self.client.market_chart_range.assert_called_once_with('bitcoin', NOW // 1000, self.now // 1000, 'usd')
+        self.assertEqual(self.client.market_chart.call_count, 1)
+        prices = data.prices.tolist()
+        self.assertEqual(prices[:2], [1.0, 2.0])
+        self.assertEqual(prices[-1], 5.0)
+        self.assertEqual(len(set((data.timestamps // HOUR).tolist())), len(prices))
+
+    def test_tail_too_old_for_store_granularity_fetches_full_series(self):
+        self.client.market_chart.return_value = chart([(NOW - 10 * 60 * 1000, 1.0), (NOW - 5 * 60 * 1000, 2.0)])
+        self.store.market_chart('bitcoin', '1')
+
+        # Reopened two days later: a range from the last point would come back hourly
+        self.now = NOW + 2 * DAY
+        self.client.market_chart.return_value = chart([(self.now - 5 * 60 * 1000, 3.0), (self.now, 4.0)])
+        data = self.store.market_chart('bitcoin', '1')
+
+        self.client.market_chart_range.assert_not_called()
+        self.assertEqual(self.client.market_chart.call_count, 2)
+        self.assertEqual(data.prices.tolist(), [3.0, 4.0])
+
+    def test_wider_range_than_stored_fetches_full_series(self):
+        self.client.market_chart.return_value = chart([(NOW - HOUR, 1.0)])
+        self.store.market_chart('bitcoin', '7')
+        self.now += DAY
+        self.store.market_chart('bitcoin', '30')
+        self.assertEqual(self.client.market_chart.call_count, 2)
+
+    def test_error_payload_is_not_stored(self):
+        self.client.market_chart.return_value = {'status': {'error_code': 429}}
+        with self.assertRaises(ValueError):
+            self.store.market_chart('bitcoin', '1')
+        self.assertIsNone(self.store.last_timestamp('bitcoin', '1'))
+
+    def test_async_market_chart(self):
+        async def amarket_chart(*args):
+            return chart([(NOW - DAY, 1.0)])
+
+        self.client.amarket_chart = amarket_chart
+        data = asyncio.run(self.store.amarket_chart('ethereum', 'max'))
+        self.assertEqual(data.prices.tolist(), [1.0])
+        self.assertEqual(self.store.last_timestamp('ethereum', 'max'), NOW - DAY)
+
+    def test_revalidate_yields_stored_series_then_tail(self):
+        self.client.market_chart.return_value = chart([(NOW - 2 * HOUR, 1.0), (NOW - HOUR, 2.0)])
+        self.store.market_chart('bitcoin', '7')
+
+        async def amarket_chart_range(*args):
+            return chart([(NOW + HOUR, 3.0)])
+
+        async def collect():
+            return [(series.prices.tolist(), age) async for series, age in self.store.arevalidate('bitcoin', '7')]
+
+        self.client.amarket_chart_range = amarket_chart_range
+        self.now = NOW + HOUR
+        self.assertEqual(asyncio.run(collect()), [([1.0, 2.0], 3600), ([1.0, 2.0, 3.0], 0)])
+        # Fresh enough now, only the stored series is yielded
+        self.now += 10 * 1000
+        self.assertEqual(asyncio.run(collect()), [([1.0, 2.0, 3.0], 10)])
+
+
+if __name__ == '__main__':
+    unittest.main()
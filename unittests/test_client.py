@@ -0,0 +1,188 @@
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from cryptocurrency.client import APIError, CoinGeckoClient
+from cryptocurrency.coin_detail import COIN_DETAIL_PARAMS, CoinDetail
+from cryptocurrency.ratelimit import CircuitBreaker, CircuitOpenError
+from cryptocurrency.trace import tracer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.paths.append(self.path)
+        time.sleep(self.server.delay)
+        status, headers = self.server.statuses.pop(0) if self.server.statuses else (200, {})
+        body = json.dumps({'path': self.path}).encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestCoinGeckoClient(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.paths = []
+        # (status, headers) for the next responses, 200 afterwards
+        self.server.statuses = []
+        self.server.delay = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.client = CoinGeckoClient(base_url=f'http://127.0.0.1:{self.server.server_port}/api/v3/')
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_base_url_from_environment(self):
+        with patch.dict('os.environ', {'COINGECKO_BASE_URL': 'http://localhost:8000/'}):
+            client = CoinGeckoClient()
+        self.assertEqual(client.url('global'), 'http://localhost:8000/global')
+
+    def test_sync_get_uses_base_url_and_params(self):
+        data = self.client.simple_price(['bitcoin', 'ethereum'])
+        self.assertEqual(data['path'], '/api/v3/simple/price?ids=bitcoin%2Cethereum&vs_currencies=usd')
+
+    def test_simple_price_with_24h_change(self):
+        data = self.client.simple_price('bitcoin', include_24hr_change=True)
+        self.assertEqual(data['path'], '/api/v3/simple/price?ids=bitcoin&vs_currencies=usd&include_24hr_change=true')
+
+    def test_timeout_is_passed_to_session(self):
+        with patch.object(self.client.session, 'get') as mock_get:
+            self.client.global_data()
+        self.assertEqual(mock_get.call_args.kwargs['timeout'], (self.client.connect_timeout,
+                                                                self.client.read_timeout))
+
+    def test_repeated_coin_lookup_is_served_from_cache(self):
+        detail = self.client.coin('bitcoin')
+        self.assertIs(self.client.coin('bitcoin'), detail)
+        self.assertIsInstance(detail, CoinDetail)
+        self.assertEqual(self.server.paths, ['/api/v3/coins/bitcoin?localization=false&tickers=false&market_data=false'
+                                             '&community_data=false&developer_data=false&sparkline=false'])
+        self.assertEqual(self.client.cache_stats()['hits'], 1)
+
+    def test_requests_are_traced_when_enabled(self):
+        tracer.enable()
+        self.addCleanup(tracer.clear)
+        self.addCleanup(tracer.disable)
+        self.client.global_data()
+        self.client.run(self.client.acoin('bitcoin'), timeout=5)
+
+        spans = [(event['name'], event['args']['path']) for event in tracer.events]
+        self.assertEqual(spans, [('http', 'global'), ('parse.json', 'global'),
+                                 ('http', 'coins/bitcoin'), ('parse.json', 'coins/bitcoin'),
+                                 ('parse.record', 'coins/bitcoin')])
+
+    def test_async_requests_run_concurrently_on_client_loop(self):
+        import asyncio
+
+        async def fetch_all():
+            return await asyncio.gather(self.client.aget('coins/bitcoin'), self.client.aglobal_data())
+
+        results = self.client.run(fetch_all(), timeout=5)
+        self.assertEqual([r['path'] for r in results], ['/api/v3/coins/bitcoin', '/api/v3/global'])
+
+
+    def test_429_pauses_for_retry_after_and_retries(self):
+        self.server.statuses = [(429, {'Retry-After': '0.2'})]
+        data = self.client.global_data()
+        self.assertEqual(data['path'], '/api/v3/global')
+        self.assertEqual(len(self.server.paths), 2)
+        stats = self.client.throttle_stats()
+        self.assertEqual((stats['throttled'], stats['retries']), (1, 1))
+        self.assertGreaterEqual(stats['max_wait']['detail'], 0.15)
+
+    @patch('cryptocurrency.client.backoff_delay', return_value=0)
+    def test_async_server_errors_are_retried(self, _):
+        self.server.statuses = [(503, {}), (502, {})]
+        data = self.client.run(self.client.aglobal_data(), timeout=5)
+        self.assertEqual(data['path'], '/api/v3/global')
+        self.assertEqual(self.client.retries, 2)
+
+    def test_client_errors_are_raised_without_retry(self):
+        self.server.statuses = [(404, {})]
+        with self.assertRaises(APIError) as raised:
+            self.client.coin('missing')
+        self.assertEqual(raised.exception.status, 404)
+        self.assertEqual(len(self.server.paths), 1)
+        self.assertIsNone(self.client.cache.get(self.client.cache.key('coins/missing', COIN_DETAIL_PARAMS)))
+
+    @patch('cryptocurrency.client.backoff_delay', return_value=0)
+    def test_circuit_opens_after_repeated_failures(self, _):
+        self.client.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        self.client.max_retries = 1
+        self.server.statuses = [(500, {})] * 2
+        with self.assertRaises(APIError):
+            self.client.global_data()
+        with self.assertRaises(CircuitOpenError):
+            self.client.coin('bitcoin')
+        self.assertEqual(len(self.server.paths), 2)
+        self.assertEqual(self.client.throttle_stats()['circuit'], 'open')
+
+    def test_open_circuit_does_not_spend_rate_limit_tokens(self):
+        self.client.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        self.client.breaker.record_failure()
+        granted = self.client.throttle_stats()['granted']
+        for _ in range(3):
+            with self.assertRaises(CircuitOpenError):
+                self.client.coin('bitcoin')
+            with self.assertRaises(CircuitOpenError):
+                self.client.run(self.client.aglobal_data(), timeout=5)
+        self.assertEqual(self.client.throttle_stats()['granted'], granted)
+        self.assertEqual(self.server.paths, [])
+
+    def test_cancelled_half_open_trial_does_not_block_the_circuit(self):
+        import asyncio
+
+        clock = [0.0]
+        self.client.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=lambda: clock[0])
+        self.client.breaker.record_failure()
+        clock[0] = 31
+        self.server.delay = 0.5
+
+        async def cancel_trial():
+            task = asyncio.ensure_future(self.client.aglobal_data())
+            while not self.server.paths:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        self.client.run(cancel_trial(), timeout=5)
+        self.assertEqual(self.client.breaker.state, 'half_open')
+        self.server.delay = 0
+        data = self.client.run(self.client.acoin('bitcoin'), timeout=5)
+        self.assertEqual(data.id, '')
+        self.assertEqual(self.client.breaker.state, 'closed')
+
+    def test_revalidate_yields_last_known_value_then_refetch(self):
+        async def collect():
+            return [item async for item in self.client.revalidate_global()]
+
+        self.assertEqual(self.client.run(collect(), timeout=5), [({'path': '/api/v3/global'}, 0)])
+        # Still fresh: served once from cache, nothing refetched
+        self.assertEqual(len(self.client.run(collect(), timeout=5)), 1)
+        self.assertEqual(len(self.server.paths), 1)
+
+        self.client.cache.clock = lambda: float('inf')
+        (stale, age), (fresh, fresh_age) = self.client.run(collect(), timeout=5)
+        self.assertEqual(age, float('inf'))
+        self.assertEqual((fresh, fresh_age), ({'path': '/api/v3/global'}, 0))
+        self.assertEqual(len(self.server.paths), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
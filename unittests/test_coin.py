@@ -1,6 +1,8 @@
 import unittest
 from unittest.mock import patch, MagicMock
 from main import MainWindow
+from cryptocurrency.client import CoinGeckoClient
+from cryptocurrency.coin_detail import CoinDetail
 import customtkinter as ctk
 
 
@@ -19,6 +21,7 @@ class TestCryptoCurrencyAppAdditional(unittest.TestCase):
 
         # Mock necessary attributes
         self.app.current_currency = 'bitcoin'
+        self.app.client = CoinGeckoClient(base_url='https://api.test')
         self.app.global_market_info_label = MagicMock()
         self.app.global_market_cap_label = MagicMock()
         self.app.current_price_label = MagicMock()
@@ -38,7 +41,7 @@ class TestCryptoCurrencyAppAdditional(unittest.TestCase):
         # Mock cget method
         self.app.cget = MagicMock(return_value="#000000")
 
-    @patch('main.requests.get')
+    @patch('cryptocurrency.client.requests.Session.get')
     def test_get_price(self, mock_get):
         mock_response = MagicMock()
         mock_response.json.return_value = {'bitcoin': {'usd': 50000}}
@@ -47,7 +50,7 @@ class TestCryptoCurrencyAppAdditional(unittest.TestCase):
         price = self.app.get_price()
         self.assertEqual(price, '50000')
 
-    @patch('main.requests.get')
+    @patch('cryptocurrency.client.requests.Session.get')
     def test_update_global_market_info(self, mock_get):
         mock_response = MagicMock()
         mock_response.json.return_value = {
@@ -62,7 +65,7 @@ class TestCryptoCurrencyAppAdditional(unittest.TestCase):
         self.app.global_market_info_label.configure.assert_called_with(text='Total market volume: $1,000,000,000.00')
         self.app.global_market_cap_label.configure.assert_called_with(text='Global market cap: $2,000,000,000,000.00')
 
-    @patch('main.requests.get')
+    @patch('cryptocurrency.client.requests.Session.get')
     @patch('customtkinter.CTkButton')
     def test_update_social_links(self, mock_button, mock_get):
         mock_response = MagicMock()
@@ -81,6 +84,149 @@ class TestCryptoCurrencyAppAdditional(unittest.TestCase):
         # Check if CTkButton was called 3 times (for Twitter, Facebook, and Reddit)
         self.assertEqual(mock_button.call_count, 3)
 
+    @patch('customtkinter.CTkButton')
+    def test_show_coin_info_uses_prefetched_data(self, mock_button):
+        self.app.brief_description_label = MagicMock()
+        with patch('cryptocurrency.client.requests.Session.get') as mock_get:
+            self.app.show_coin_info(CoinDetail.from_response({
+                'description': {'en': 'First paragraph.\n\nSecond paragraph.'},
+                'links': {'twitter_screen_name': 'test_twitter'}
+            }))
+        mock_get.assert_not_called()
+        self.assertEqual(mock_button.call_count, 1)
+        self.app.brief_description_label.configure.assert_called_with(text='First paragraph.')
+
+    def test_background_results_are_applied_from_ui_queue(self):
+        import queue
+        self.app.ui_queue = queue.Queue()
+        self.app.after = MagicMock()
+        applied = []
+        self.app.call_soon(applied.append, 'global')
+        self.app.call_soon(applied.append, 'coins')
+        self.app.process_ui_queue()
+        self.assertEqual(applied, ['global', 'coins'])
+        self.app.after.assert_called_once_with(20, self.app.process_ui_queue)
+
+    def test_live_prices_touch_only_changed_coins(self):
+        from cryptocurrency.markets import MarketListing
+        from cryptocurrency.prices import PricePoller
+        self.app.markets = MarketListing()
+        self.app.markets.add_page(1, [{'id': 'bitcoin', 'current_price': 100, 'price_change_percentage_24h': 1.0},
+                                      {'id': 'ethereum', 'current_price': 10, 'price_change_percentage_24h': 2.0}])
+        self.app.price_poller = PricePoller(self.app.client)
+        self.app.price_poller.seed(self.app.markets.coins)
+        self.app.coins_list_frame = MagicMock()
+
+        self.app.show_live_prices({'bitcoin': (100, 1.0), 'ethereum': (12, 3.0)})
+        self.app.coins_list_frame.update_coins.assert_called_once_with({'ethereum': (12, 3.0)})
+        self.assertEqual(self.app.markets.get('ethereum')['current_price'], 12)
+        self.app.current_price_label.configure.assert_not_called()
+
+        self.app.show_live_prices({'bitcoin': (105, 1.2), 'ethereum': (12, 3.0)})
+        self.app.current_price_label.configure.assert_called_once_with(text='$105')
+
+    def test_panel_keeps_last_known_value_when_refresh_fails(self):
+        from cryptocurrency.startup import StartupTimer
+        self.app.startup = StartupTimer(0, stages=('price',))
+        self.app.scheduler = MagicMock()
+        on_error = MagicMock()
+        self.app.load_panel('price', None, self.app.show_price, on_error)
+        _, _, apply, failed = self.app.scheduler.stream.call_args.args
+
+        apply(({'bitcoin': {'usd': 50000}}, 150))
+        self.app.current_price_label.configure.assert_called_with(text='$50000 (2m ago)')
+        failed(TimeoutError())
+        on_error.assert_not_called()
+        self.assertTrue(self.app.startup.complete)
+
+    def test_pinned_coins_are_compared_with_selected_one(self):
+        self.app.pinned = []
+        self.app.chart = None
+        self.app.chart_timespan = '7'
+        self.app.pin_button = MagicMock()
+        self.app.scheduler = MagicMock()
+
+        self.app.toggle_pin()
+        self.app.current_currency = 'ethereum'
+        self.assertEqual(self.app.pinned, ['bitcoin'])
+        self.assertEqual(self.app.comparison_coins(), ['bitcoin', 'ethereum'])
+        self.app.pin_button.configure.assert_called_with(text='Unpin')
+        channel, coro, on_result, on_error = self.app.scheduler.request.call_args.args
+        coro.close()
+        self.assertEqual(channel, 'compare')
+
+    def test_fetch_comparison_leaves_out_failed_coins(self):
+        import asyncio
+        import numpy as np
+        from cryptocurrency.series import MarketSeries
+
+        async def amarket_chart(coin, days):
+            if coin == 'missing':
+                raise ValueError('Server is overloaded. Try again later.')
+            return MarketSeries(np.array([0, 1000]), np.array([1.0, 2.0]))
+
+        self.app.chart_store = MagicMock(amarket_chart=amarket_chart)
+        comparison = asyncio.run(self.app.fetch_comparison(['bitcoin', 'missing', 'ethereum'], '1', 100))
+        self.assertEqual(comparison.coins, ['bitcoin', 'ethereum'])
+        self.assertEqual(comparison.normalized('percent')[:, -1].tolist(), [100.0, 100.0])
+
+    def test_indicator_toggle_uses_loaded_series(self):
+        import numpy as np
+        from cryptocurrency.indicators import IndicatorEngine
+        from cryptocurrency.series import MarketSeries
+
+        self.app.series = MarketSeries(np.arange(1000, dtype=np.int64) * 3_600_000, np.linspace(1.0, 2.0, 1000))
+        self.app.chart = MagicMock()
+        self.app.figure = MagicMock()
+        self.app.figure.bbox.width = 100
+        self.app.chart_store = MagicMock()
+        self.app.chart_timespan = '30'
+        self.app.pinned = []
+        self.app.indicators = []
+        self.app.indicator_engine = IndicatorEngine()
+
+        self.app.toggle_indicator('RSI')
+        name, x, lines, overlay = self.app.chart.set_indicator.call_args.args
+        self.assertEqual((name, len(x), list(lines), overlay), ('RSI 14', 200, ['RSI 14'], False))
+        self.app.toggle_indicator('RSI')
+        self.app.chart.hide_indicator.assert_called_once_with('RSI 14')
+        self.assertEqual(self.app.indicators, [])
+        self.assertFalse(self.app.chart_store.mock_calls)
+        self.assertFalse(self.app.chart.set_data.called)
+
+    def test_candles_fall_back_to_aggregated_chart_ticks(self):
+        import asyncio
+        import numpy as np
+        from cryptocurrency.candles import Candles
+        from cryptocurrency.client import APIError
+        from cryptocurrency.series import MarketSeries
+
+        series = MarketSeries(np.arange(1, 49, dtype=np.int64) * 300_000, np.arange(48.0), np.arange(48.0))
+
+        async def amarket_chart(coin, days):
+            return series
+
+        async def aohlc(coin, days):
+            if coin == 'missing':
+                raise APIError(f'coins/{coin}/ohlc', 404)
+            return Candles([1_800_000, 3_600_000], [1, 2], [3, 4], [0, 1], [2, 3])
+
+        self.app.chart_store = MagicMock(amarket_chart=amarket_chart)
+        self.app.client = MagicMock(aohlc=aohlc)
+        candles = asyncio.run(self.app.fetch_candles('bitcoin', '1', 1000))
+        self.assertEqual(candles.close.tolist(), [2.0, 3.0])
+        self.assertEqual(candles.volumes.tolist(), [5.0, 11.0])
+
+        candles = asyncio.run(self.app.fetch_candles('missing', '1', 1000))
+        self.assertEqual(len(candles), 8)
+        self.assertEqual((candles.open[0], candles.close[0]), (0.0, 5.0))
+        self.assertEqual(len(asyncio.run(self.app.fetch_candles('missing', '1', 3))), 3)
+
+    def test_age_note(self):
+        from main import age_note
+        self.assertEqual([age_note(age) for age in (0, 59, 150, 7300, 3 * 86400)],
+                         ['', '', ' (2m ago)', ' (2h ago)', ' (3d ago)'])
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,159 @@
+import json
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from cryptocurrency.client import CoinGeckoClient
+from cryptocurrency.coin_detail import COIN_DETAIL_PARAMS, NO_DESCRIPTION, CoinDetail
+from cryptocurrency.ratelimit import RateLimiter
+
+LANGUAGES = ['en', 'de', 'es', 'fr', 'it', 'pl', 'ro', 'hu', 'nl', 'pt', 'sv', 'vi', 'tr', 'ru', 'ja', 'zh',
+             'zh-tw', 'ko', 'ar', 'th', 'id', 'cs', 'da', 'el', 'hi', 'no', 'sk', 'uk', 'he', 'fi', 'bg', 'hr',
+             'lt', 'sl']
+CURRENCIES = ['usd', 'eur', 'gbp', 'jpy', 'cny', 'krw', 'inr', 'rub', 'aud', 'cad', 'chf', 'brl', 'btc', 'eth',
+              'ltc', 'bch', 'bnb', 'eos', 'xrp', 'xlm', 'link', 'dot', 'yfi', 'aed', 'ars', 'bdt', 'bhd', 'bmd',
+              'clp', 'czk', 'dkk', 'hkd', 'huf', 'idr', 'ils', 'kwd', 'lkr', 'mmk', 'mxn', 'myr', 'ngn', 'nok',
+              'nzd', 'php', 'pkr', 'pln', 'sar', 'sek', 'sgd', 'thb', 'try', 'twd', 'uah', 'vef', 'vnd', 'zar',
+              'xdr', 'xag', 'xau', 'bits', 'sats']
+DESCRIPTION = ('Bitcoin is the first successful internet money based on peer-to-peer technology. ' * 30 +
+               '\n\nSecond paragraph. ' * 20)
+
+
+# Shaped like a full /coins/{id} response: localizations, per-currency market data, tickers, stats
+def full_coin(coin_id='bitcoin'):
+    per_currency = {currency: 12345.678 for currency in CURRENCIES}
+    return {
+        'id': coin_id, 'symbol': 'btc', 'name': 'Bitcoin',
+        'localization': {language: 'Bitcoin' for language in LANGUAGES},
+        'description': {language: DESCRIPTION for language in LANGUAGES},
+        'links': {'homepage': ['http://www.bitcoin.org'], 'twitter_screen_name': 'bitcoin',
+                  'facebook_username': 'bitcoins', 'subreddit_url': 'https://www.reddit.com/r/Bitcoin/'},
+        'market_data': {field: dict(per_currency) for field in (
+            'current_price', 'ath', 'ath_change_percentage', 'atl', 'atl_change_percentage', 'market_cap',
+            'fully_diluted_valuation', 'total_volume', 'high_24h', 'low_24h', 'price_change_24h_in_currency',
+            'price_change_percentage_1h_in_currency', 'price_change_percentage_24h_in_currency',
+            'price_change_percentage_7d_in_currency', 'price_change_percentage_30d_in_currency',
+            'market_cap_change_24h_in_currency')},
+        'community_data': {'twitter_followers': 6000000, 'reddit_subscribers': 5000000},
+        'developer_data': {'forks': 36000, 'stars': 73000, 'commit_count_4_weeks': 100,
+                           'code_additions_deletions_4_weeks': {'additions': 1000, 'deletions': -900}},
+        'tickers': [{'base': 'BTC', 'target': f'T{i}', 'market': {'name': f'Exchange {i}', 'identifier': f'ex{i}'},
+                     'last': 12345.6, 'volume': 1000.5, 'converted_last': dict(list(per_currency.items())[:3]),
+                     'trust_score': 'green', 'trade_url': f'https://exchange{i}.example/trade/BTC_T{i}'}
+                    for i in range(100)],
+    }
+
+
+# What CoinGecko leaves out for the flags in COIN_DETAIL_PARAMS
+def project(payload, params):
+    payload = dict(payload)
+    for flag in ('tickers', 'market_data', 'community_data', 'developer_data'):
+        if params.get(flag) == 'false':
+            payload.pop(flag, None)
+    if params.get('localization') == 'false':
+        payload.pop('localization', None)
+        payload['description'] = {'en': payload['description']['en']}
+    return payload
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        body = json.dumps(project(full_coin(url.path.rsplit('/', 1)[-1]), dict(parse_qsl(url.query)))).encode()
+        self.server.sizes.append(len(body))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+# Memory held by decoded JSON, nested containers included
+def deep_size(value):
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_size(k) + deep_size(v) for k, v in value.items())
+    elif isinstance(value, list):
+        size += sum(deep_size(item) for item in value)
+    return size
+
+
+def best_time(func, repeat=20):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+class TestCoinDetail(unittest.TestCase):
+
+    def test_from_response(self):
+        detail = CoinDetail.from_response(full_coin())
+        self.assertEqual((detail.id, detail.symbol, detail.name), ('bitcoin', 'btc', 'Bitcoin'))
+        self.assertEqual(detail.description, DESCRIPTION)
+        self.assertEqual((detail.twitter, detail.facebook, detail.reddit),
+                         ('bitcoin', 'bitcoins', 'https://www.reddit.com/r/Bitcoin/'))
+        self.assertFalse(hasattr(detail, '__dict__'))
+
+    def test_missing_fields(self):
+        detail = CoinDetail.from_response({'id': 'new-coin', 'description': None, 'links': None})
+        self.assertEqual(detail.description, NO_DESCRIPTION)
+        self.assertIsNone(detail.twitter)
+
+
+class TestSlimCoinPayload(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.sizes = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.client = CoinGeckoClient(base_url=f'http://127.0.0.1:{self.server.server_port}/api/v3',
+                                      limiter=RateLimiter(rate_per_minute=None))
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_coin_switch_payload_and_parse_drop_by_order_of_magnitude(self):
+        full = self.client.get('coins/bitcoin')
+        detail = self.client.coin('bitcoin')
+        full_bytes, slim_bytes = self.server.sizes
+
+        self.assertEqual(detail, CoinDetail.from_response(full))
+        self.assertGreaterEqual(full_bytes / slim_bytes, 10)
+        # Cached record against the decoded full response the view used to keep
+        cached = self.client.cache.get(self.client.cache.key('coins/bitcoin', COIN_DETAIL_PARAMS))
+        self.assertIs(cached, detail)
+        self.assertGreaterEqual(deep_size(full) / detail.nbytes, 10)
+
+        full_body = json.dumps(full)
+        slim_body = json.dumps(project(full, COIN_DETAIL_PARAMS))
+        full_parse = best_time(lambda: CoinDetail.from_response(json.loads(full_body)))
+        slim_parse = best_time(lambda: CoinDetail.from_response(json.loads(slim_body)))
+        self.assertGreaterEqual(full_parse / slim_parse, 10)
+
+    def test_detail_views_share_one_cached_request(self):
+        self.client.coin('bitcoin')
+        self.client.run(self.client.acoin('bitcoin'), timeout=5)
+
+        async def revalidate():
+            return [item async for item in self.client.revalidate_coin('bitcoin')]
+
+        (detail, _), = self.client.run(revalidate(), timeout=5)
+        self.assertIsInstance(detail, CoinDetail)
+        self.assertEqual(len(self.server.sizes), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
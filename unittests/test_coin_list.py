@@ -0,0 +1,96 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from cryptocurrency.coin_list import VirtualCoinList, coin_texts
+
+
+class FakeCard:
+    def __init__(self, master, on_select, on_hover, height):
+        self.coin = None
+        self.coin_id = None
+        self.placed_at = None
+        self.bind_count = 0
+
+    def bind_coin(self, coin):
+        self.coin = coin
+        self.coin_id = coin['id']
+        self.bind_count += 1
+
+    def place(self, **kwargs):
+        pass
+
+    def place_forget(self):
+        pass
+
+
+def coins(count):
+    return [{'id': f'coin-{i}', 'name': f'Coin {i}', 'market_cap_rank': i + 1} for i in range(count)]
+
+
+class TestVirtualCoinList(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('cryptocurrency.coin_list.CoinCard', FakeCard)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        # Geometry logic only, Tk widgets are replaced with mocks
+        with patch.object(VirtualCoinList, '__init__', return_value=None):
+            self.coin_list = VirtualCoinList()
+        self.coin_list.on_select = MagicMock()
+        self.coin_list.on_hover = None
+        self.coin_list.columns = 2
+        self.coin_list.row_height = 76
+        self.coin_list.coins = []
+        self.coin_list.offset = 0
+        self.coin_list.pool = []
+        self.coin_list.body = MagicMock()
+        self.coin_list.body.winfo_height.return_value = 380
+        self.coin_list.scrollbar = MagicMock()
+        self.coin_list.message_label = MagicMock()
+
+    def shown(self):
+        return [card.coin['id'] for card in self.coin_list.visible_cards()]
+
+    def test_only_visible_rows_are_materialized(self):
+        self.coin_list.set_coins(coins(15000))
+        # 380 px viewport -> 5 rows plus 2 spare rows, 2 columns
+        self.assertEqual(len(self.coin_list.pool), 14)
+        self.assertEqual(self.shown()[:4], ['coin-0', 'coin-1', 'coin-2', 'coin-3'])
+
+    def test_scrolling_rebinds_pooled_cards(self):
+        self.coin_list.set_coins(coins(1000))
+        pool = list(self.coin_list.pool)
+        self.coin_list.scroll_to(76 * 100)
+        self.assertEqual(self.coin_list.pool, pool)
+        self.assertEqual(self.shown()[0], 'coin-200')
+        self.coin_list.scrollbar.set.assert_called_with(7600 / 38000, (7600 + 380) / 38000)
+
+    def test_scroll_is_clamped_to_content(self):
+        self.coin_list.set_coins(coins(20))
+        self.coin_list.scroll_to(10 ** 6)
+        self.assertEqual(self.coin_list.offset, 10 * 76 - 380)
+        self.assertEqual(self.shown()[-1], 'coin-19')
+
+    def test_filtering_hides_unused_cards(self):
+        self.coin_list.set_coins(coins(100))
+        self.coin_list.set_coins(coins(3), reset_scroll=True)
+        self.assertEqual(self.shown(), ['coin-0', 'coin-1', 'coin-2'])
+        self.assertEqual(len(self.coin_list.pool), 14)
+
+    def test_update_coins_rebinds_only_changed_visible_cards(self):
+        self.coin_list.set_coins(coins(100))
+        counts = [card.bind_count for card in self.coin_list.pool]
+        self.assertEqual(self.coin_list.update_coins({'coin-1', 'coin-90'}), 1)
+        changed = [card.coin['id'] for card, count in zip(self.coin_list.pool, counts) if card.bind_count != count]
+        self.assertEqual(changed, ['coin-1'])
+
+    def test_coin_texts(self):
+        texts = coin_texts({'name': 'Bitcoin', 'market_cap_rank': 1, 'current_price': 50000,
+                            'price_change_percentage_24h': -1.234})
+        self.assertEqual(texts, {'name': 'Bitcoin', 'rank': '#1', 'price': '$50,000', 'change': '-1.23%',
+                                 'change_color': 'red'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+
+from cryptocurrency.compare import Comparison, align, common_grid, normalize
+from cryptocurrency.series import MarketSeries
+
+
+def series(timestamps, prices):
+    return MarketSeries(np.asarray(timestamps, dtype=np.int64), prices)
+
+
+class TestCompare(unittest.TestCase):
+
+    def test_grid_covers_overlap_only(self):
+        grid = common_grid([series([0, 100, 200], [1, 2, 3]), series([50, 150, 300], [1, 2, 3])], 5)
+        self.assertEqual(grid.tolist(), [50, 87, 125, 162, 200])
+
+    def test_disjoint_series_raise(self):
+        with self.assertRaises(ValueError):
+            common_grid([series([0, 10], [1, 2]), series([20, 30], [1, 2])], 10)
+
+    def test_align_interpolates_each_series(self):
+        grid = np.array([0, 50, 100])
+        values = align([series([0, 100], [10.0, 20.0]), series([0, 25, 100], [1.0, 2.0, 5.0])], grid)
+        self.assertEqual(values.tolist(), [[10.0, 15.0, 20.0], [1.0, 3.0, 5.0]])
+
+    def test_normalize(self):
+        values = np.array([[10.0, 15.0, 5.0], [200.0, 200.0, 300.0]])
+        self.assertEqual(normalize(values, 'percent').tolist(), [[0.0, 50.0, -50.0], [0.0, 0.0, 50.0]])
+        self.assertEqual(normalize(values, 'index').tolist(), [[100.0, 150.0, 50.0], [100.0, 100.0, 150.0]])
+        self.assertTrue(np.isnan(normalize(np.array([[0.0, 1.0]]))).all())
+        with self.assertRaises(ValueError):
+            normalize(values, 'log')
+
+    def test_comparison_from_series(self):
+        comparison = Comparison.from_series({
+            'bitcoin': series([0, 100, 200], [10.0, 20.0, 30.0]),
+            'delisted': MarketSeries.empty(),
+            'ethereum': series([0, 200], [1.0, 3.0]),
+        }, points=1000)
+
+        self.assertEqual(comparison.coins, ['bitcoin', 'ethereum'])
+        # Not denser than the longest series
+        self.assertEqual(comparison.timestamps.tolist(), [0, 100, 200])
+        self.assertEqual(comparison.normalized('index').tolist(), [[100.0, 200.0, 300.0], [100.0, 200.0, 300.0]])
+        self.assertEqual(comparison.datetimes().dtype, np.dtype('datetime64[ms]'))
+
+    def test_nothing_to_compare(self):
+        with self.assertRaises(ValueError):
+            Comparison.from_series({'bitcoin': MarketSeries.empty()})
+
+
+if __name__ == '__main__':
+    unittest.main()
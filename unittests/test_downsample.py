@@ -0,0 +1,50 @@
+import unittest
+
+import numpy as np
+
+from cryptocurrency.downsample import downsample, lttb_indices, minmax_indices
+
+
+class TestDownsample(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.x = np.arange(100_000, dtype=np.float64)
+        self.y = np.cumsum(rng.standard_normal(100_000))
+
+    def test_short_series_is_untouched(self):
+        x, y = downsample(self.x[:100], self.y[:100], 800)
+        self.assertEqual(len(x), 100)
+
+    def test_output_size_follows_canvas_width(self):
+        for method in ('lttb', 'minmax'):
+            x, y = downsample(self.x, self.y, 400, method)
+            self.assertLessEqual(len(x), 400 * 2 + 4)
+            self.assertGreater(len(x), 400)
+            self.assertTrue(np.all(np.diff(x) > 0))
+
+    def test_extrema_are_kept(self):
+        for method in ('lttb', 'minmax'):
+            _, y = downsample(self.x, self.y, 300, method)
+            self.assertEqual(y.max(), self.y.max())
+            self.assertEqual(y.min(), self.y.min())
+
+    def test_endpoints_are_kept(self):
+        index = lttb_indices(self.x, self.y, 500)
+        self.assertEqual((index[0], index[-1]), (0, len(self.y) - 1))
+        index = minmax_indices(self.y, 250)
+        self.assertEqual((index[0], index[-1]), (0, len(self.y) - 1))
+
+    def test_lttb_keeps_spike(self):
+        y = np.zeros(1000)
+        y[437] = 10
+        index = lttb_indices(np.arange(1000.0), y, 20)
+        self.assertIn(437, index)
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            downsample(self.x, self.y, 100, 'average')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import asyncio
+import csv
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from cryptocurrency.client import CoinGeckoClient
+from cryptocurrency.export import MIN_CIRCUIT_WAIT, PartWriter, export, main, parse_range, read_ids
+from cryptocurrency.fixtures import FixtureStore
+from cryptocurrency.ratelimit import CircuitOpenError, RateLimiter
+from cryptocurrency.standin import StandInServer
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+
+def chart(first_price, points=3):
+    return {
+        'prices': [[i * DAY_MS, first_price + i] for i in range(points)],
+        'market_caps': [],
+        'total_volumes': [[i * DAY_MS, 10.0 * i] for i in range(points)],
+    }
+
+
+class TestExportHelpers(unittest.TestCase):
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range('30'), ('30', None, None))
+        self.assertEqual(parse_range('max'), ('max', None, None))
+        self.assertEqual(parse_range('2024-01-01:2024-01-02'), ('2024-01-01:2024-01-02', 1704067200, 1704153600))
+        for bad in ('week', '2024-01-02:2024-01-01'):
+            with self.assertRaises(ValueError):
+                parse_range(bad)
+
+    def test_read_ids_merges_file_and_drops_duplicates(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+            f.write('ethereum\n# stablecoins\ntether  # usd\n\nbitcoin\n')
+        self.addCleanup(os.remove, f.name)
+        self.assertEqual(read_ids(['bitcoin'], f.name), ['bitcoin', 'ethereum', 'tether'])
+
+    def test_does_not_import_tk_or_matplotlib(self):
+        code = ('import sys, cryptocurrency.export; '
+                'print(sorted(m for m in ("tkinter", "customtkinter", "matplotlib") if m in sys.modules))')
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(result.stdout.strip(), '[]')
+
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        fixtures = FixtureStore(os.path.join(self.directory.name, 'fixtures'))
+        for first_price, coin in enumerate(('bitcoin', 'ethereum', 'tether')):
+            fixtures.save(f'coins/{coin}/market_chart', {'vs_currency': 'usd', 'days': '30'}, chart(first_price * 100))
+        fixtures.save('coins/bitcoin/market_chart/range', {'vs_currency': 'usd', 'from': 0, 'to': 86400},
+                      chart(5, points=2))
+        self.server = StandInServer(fixtures.directory)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.output = os.path.join(self.directory.name, 'export')
+
+    def run_export(self, coins, ranges=('30',), chunk_rows=100_000, client=None):
+        client = client or CoinGeckoClient(base_url=self.server.base_url, limiter=RateLimiter(rate_per_minute=None))
+        try:
+            writer = PartWriter(self.output)
+            return client.run(export(client, writer, coins, [parse_range(r) for r in ranges],
+                                     chunk_rows=chunk_rows), timeout=10)
+        finally:
+            client.close()
+
+    def rows(self):
+        rows = []
+        for name in sorted(os.listdir(self.output)):
+            with open(os.path.join(self.output, name), newline='') as f:
+                rows.extend(csv.DictReader(f))
+        return rows
+
+    def test_exports_series_to_csv(self):
+        stats = self.run_export(['bitcoin', 'ethereum'], ranges=('30', '1970-01-01:1970-01-02'))
+
+        # ethereum has no recorded range fixture, the stand-in answers 404
+        self.assertEqual((stats['exported'], stats['failed'], stats['rows']), (3, 1, 8))
+        rows = self.rows()
+        bitcoin = [row for row in rows if row['coin'] == 'bitcoin' and row['range'] == '30']
+        self.assertEqual([(row['timestamp'], row['price'], row['volume']) for row in bitcoin],
+                         [('0', '0.0', '0.0'), (str(DAY_MS), '1.0', '10.0'), (str(2 * DAY_MS), '2.0', '20.0')])
+        self.assertEqual({row['range'] for row in rows}, {'30', '1970-01-01:1970-01-02'})
+
+    def test_writes_parts_in_chunks(self):
+        stats = self.run_export(['bitcoin', 'ethereum', 'tether'], chunk_rows=3)
+        self.assertEqual(stats['parts'], 3)
+        self.assertEqual(sorted(os.listdir(self.output)), ['part-00000.csv', 'part-00001.csv', 'part-00002.csv'])
+
+    def test_resumes_from_partial_output(self):
+        self.run_export(['bitcoin'])
+        # Leftover of an interrupted write
+        with open(os.path.join(self.output, 'part-00001.csv.tmp'), 'w') as f:
+            f.write('coin,vs_')
+        requests_before = self.server.counts['requests']
+
+        stats = self.run_export(['bitcoin', 'ethereum', 'tether'])
+
+        self.assertEqual((stats['skipped'], stats['exported']), (1, 2))
+        self.assertEqual(self.server.counts['requests'] - requests_before, 2)
+        self.assertEqual(sorted(os.listdir(self.output)), ['part-00000.csv', 'part-00001.csv'])
+        self.assertEqual(len(self.rows()), 9)
+
+    def test_open_circuit_without_retry_in_does_not_spin(self):
+        client = CoinGeckoClient(base_url=self.server.base_url, limiter=RateLimiter(rate_per_minute=None))
+        original = client.amarket_chart
+        failures = [CircuitOpenError(0)]
+
+        async def amarket_chart(*args):
+            if failures:
+                raise failures.pop()
+            return await original(*args)
+
+        sleep = asyncio.sleep
+        waits = []
+
+        async def record_sleep(delay):
+            waits.append(delay)
+            await sleep(0)
+
+        client.amarket_chart = amarket_chart
+        with patch('cryptocurrency.export.asyncio.sleep', record_sleep):
+            stats = self.run_export(['bitcoin'], client=client)
+        self.assertEqual(stats['exported'], 1)
+        self.assertEqual(waits, [MIN_CIRCUIT_WAIT])
+
+    def test_main(self):
+        with patch.dict('os.environ', {'COINGECKO_BASE_URL': self.server.base_url}), \
+                patch('sys.stdout'):
+            code = main(['bitcoin', 'tether', '--range', '30', '--output', self.output, '--rate-per-minute', '0'])
+        self.assertEqual(code, 0)
+        self.assertEqual(len(self.rows()), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import time
+import unittest
+from unittest.mock import patch
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import numpy as np
+from matplotlib.backend_bases import MouseEvent
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from cryptocurrency.chart import PriceChart
+
+COLORS = {'background': '#333333', 'text': '#FFFFFF', 'line': '#1E69A4', 'fill': '#00BFFF'}
+
+
+class TestHoverTool(unittest.TestCase):
+
+    def setUp(self):
+        self.figure = Figure(figsize=(8, 4), dpi=100)
+        FigureCanvasAgg(self.figure)
+        self.chart = PriceChart(self.figure)
+        self.chart.apply_theme(COLORS)
+        self.hover = self.chart.hover
+
+    def show(self, count):
+        x = 18000 + np.arange(count) / 24
+        self.chart.set_data(x, 100 + np.sin(np.arange(count) / 10))
+        self.figure.canvas.draw()
+        return x
+
+    def move_to(self, xdata, ydata=100.0):
+        x, y = self.chart.ax.transData.transform((xdata, ydata))
+        event = MouseEvent('motion_notify_event', self.figure.canvas, x, y)
+        self.hover.on_motion(event)
+
+    def test_nearest_point(self):
+        self.hover.set_data([1.0, 2.0, 4.0], [10.0, 20.0, 40.0])
+        self.assertEqual(self.hover.nearest(0.0), 0)
+        self.assertEqual(self.hover.nearest(1.4), 0)
+        self.assertEqual(self.hover.nearest(1.6), 1)
+        self.assertEqual(self.hover.nearest(3.5), 2)
+        self.assertEqual(self.hover.nearest(9.0), 2)
+
+    def test_motion_shows_crosshair_and_tooltip(self):
+        x = self.show(100)
+        self.move_to(x[40])
+        self.assertEqual(self.hover.index, 40)
+        self.assertTrue(self.hover.annotation.get_visible())
+        self.assertIn('Price: $', self.hover.annotation.get_text())
+        self.assertEqual(self.hover.vline.get_xdata()[0], x[40])
+        self.assertIsNotNone(self.hover.background)
+
+    def test_blits_axes_and_tooltip_only(self):
+        x = self.show(100)
+        with patch.object(self.figure.canvas, 'blit') as blit:
+            self.move_to(x[95])
+            self.move_to(x[5])
+        first, second = (call.args[0] for call in blit.call_args_list)
+        figure = self.figure.bbox
+        self.assertLess(first.width * first.height, figure.width * figure.height)
+        self.assertTrue(first.contains(*self.chart.ax.bbox.min) and first.contains(*self.chart.ax.bbox.max))
+        # The tooltip moved to the other side: its previous area is blitted again to clear it
+        self.assertTrue(second.contains(*self.hover.tooltip_extent.max))
+
+    def test_leave_hides_overlay(self):
+        x = self.show(100)
+        self.move_to(x[10])
+        self.hover.on_leave(None)
+        self.assertIsNone(self.hover.index)
+        self.assertFalse(self.hover.annotation.get_visible())
+
+    def test_overlay_does_not_change_autoscale(self):
+        x = self.show(100)
+        xlim = self.chart.ax.get_xlim()
+        self.move_to(x[50])
+        self.chart.ax.relim()
+        self.chart.ax.autoscale_view()
+        self.assertEqual(self.chart.ax.get_xlim(), xlim)
+
+    def test_motion_cost_does_not_grow_with_series_length(self):
+        def cost(count):
+            x = self.show(count)
+            positions = np.linspace(x[0], x[-1], 50)
+            start = time.perf_counter()
+            for position in positions:
+                self.move_to(position)
+            return time.perf_counter() - start
+
+        small, large = cost(1_000), cost(1_000_000)
+        self.assertLess(large, small * 3 + 0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
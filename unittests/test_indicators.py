@@ -0,0 +1,178 @@
+import unittest
+
+import numpy as np
+
+from cryptocurrency.indicators import (EMA, INDICATORS, RSI, SMA, VWAP, Bollinger, Indicator, IndicatorEngine,
+                                       Volatility, ema, rolling)
+from cryptocurrency.series import MarketSeries
+
+HOUR = 3_600_000
+
+
+def random_series(count, start=0, seed=0):
+    rng = np.random.default_rng(seed)
+    timestamps = 1_600_000_000_000 + np.arange(start, start + count, dtype=np.int64) * HOUR
+    volumes = np.abs(rng.standard_normal(count))
+    volumes[::7] = np.nan
+    return MarketSeries(timestamps, 100 + np.cumsum(rng.standard_normal(count)), volumes)
+
+
+def naive_ema(values, alpha):
+    out = [values[0]]
+    for value in values[1:]:
+        out.append(alpha * value + (1 - alpha) * out[-1])
+    return np.array(out)
+
+
+def naive_rsi(prices, period):
+    gain = loss = 0.0
+    out = []
+    for i in range(len(prices)):
+        change = prices[i] - prices[i - 1] if i else 0.0
+        gain += (max(change, 0) - gain) / period
+        loss += (max(-change, 0) - loss) / period
+        out.append(np.nan if i < period else 100 - 100 / (1 + gain / loss) if loss else 100.0)
+    return np.array(out)
+
+
+def computed(indicator, series):
+    indicator = indicator.spawn()
+    indicator.append(series.prices, series.volumes)
+    return indicator.lines()
+
+
+class TestKernels(unittest.TestCase):
+
+    def test_ema_matches_recursion(self):
+        values = np.random.default_rng(1).standard_normal(5_000).cumsum() + 1000
+        for alpha in (0.9, 2 / 21, 2 / 201, 1 / 14):
+            np.testing.assert_allclose(ema(values, alpha), naive_ema(values, alpha), rtol=1e-10)
+
+    def test_ema_continues_from_seed(self):
+        values = np.arange(10.0)
+        whole = ema(values, 0.3)
+        np.testing.assert_allclose(ema(values[4:], 0.3, whole[3]), whole[4:])
+
+    def test_rolling_uses_history(self):
+        self.assertEqual(rolling(np.empty(0), np.arange(5.0), 3, np.mean)[2:].tolist(), [1.0, 2.0, 3.0])
+        self.assertTrue(np.isnan(rolling(np.empty(0), np.arange(5.0), 3, np.mean)[:2]).all())
+        self.assertEqual(rolling(np.array([0.0, 1.0]), np.array([2.0]), 3, np.mean).tolist(), [1.0])
+
+
+class TestIndicators(unittest.TestCase):
+
+    def setUp(self):
+        self.series = random_series(500)
+        self.prices = self.series.prices
+
+    def test_sma_and_bollinger(self):
+        sma = computed(SMA(20), self.series)['SMA 20']
+        self.assertTrue(np.isnan(sma[:19]).all())
+        self.assertAlmostEqual(sma[100], self.prices[81:101].mean())
+
+        bands = computed(Bollinger(20, 2), self.series)
+        self.assertEqual(list(bands), ['Bollinger 20 2 middle', 'Bollinger 20 2 upper', 'Bollinger 20 2 lower'])
+        self.assertAlmostEqual(bands['Bollinger 20 2 upper'][100], sma[100] + 2 * self.prices[81:101].std())
+
+    def test_ema(self):
+        np.testing.assert_allclose(computed(EMA(50), self.series)['EMA 50'], naive_ema(self.prices, 2 / 51))
+
+    def test_rsi(self):
+        rsi = computed(RSI(14), self.series)['RSI 14']
+        np.testing.assert_allclose(rsi, naive_rsi(self.prices, 14), rtol=1e-9)
+        self.assertTrue(((rsi[14:] >= 0) & (rsi[14:] <= 100)).all())
+
+    def test_vwap_skips_unknown_volumes(self):
+        vwap = computed(VWAP(), self.series)['VWAP']
+        volumes = np.nan_to_num(self.series.volumes)
+        self.assertAlmostEqual(vwap[-1], (self.prices * volumes).sum() / volumes.sum())
+
+    def test_volatility(self):
+        volatility = computed(Volatility(20), self.series)['Volatility 20']
+        returns = np.diff(np.log(self.prices))
+        self.assertTrue(np.isnan(volatility[:20]).all())
+        self.assertAlmostEqual(volatility[100], returns[80:100].std() * 100)
+
+
+class TestIncrementalUpdates(unittest.TestCase):
+
+    def test_appending_matches_full_computation(self):
+        series = random_series(1_000)
+        for indicator in INDICATORS.values():
+            incremental = indicator.spawn()
+            for start in range(0, 1_000, 97):
+                incremental.append(series.prices[start:start + 97], series.volumes[start:start + 97])
+            full = computed(indicator, series)
+            for label, values in incremental.lines().items():
+                np.testing.assert_allclose(values, full[label], rtol=1e-9, err_msg=label)
+
+    def test_engine_appends_incrementally(self):
+        engine = IndicatorEngine()
+        history = random_series(1_001)
+        first = MarketSeries(history.timestamps[:1_000], history.prices[:1_000], history.volumes[:1_000])
+        for indicator in INDICATORS.values():
+            engine.compute('bitcoin', 'max', indicator, first)
+            lines = engine.compute('bitcoin', 'max', indicator, history)
+            full = computed(indicator, history)
+            for label, values in lines.items():
+                np.testing.assert_allclose(values, full[label], rtol=1e-9, err_msg=label)
+        self.assertEqual(engine.stats(), {'entries': len(INDICATORS), 'hits': 0, 'incremental': len(INDICATORS),
+                                          'full': len(INDICATORS)})
+
+    def test_engine_matches_full_computation_after_front_drop(self):
+        engine = IndicatorEngine()
+        history = random_series(1_001)
+        # 24H window refreshed one hour later: one point dropped at the front, one appended
+        first = MarketSeries(history.timestamps[:1_000], history.prices[:1_000], history.volumes[:1_000])
+        refreshed = MarketSeries(history.timestamps[1:], history.prices[1:], history.volumes[1:])
+        for indicator in INDICATORS.values():
+            engine.compute('bitcoin', '1', indicator, first)
+            lines = engine.compute('bitcoin', '1', indicator, refreshed)
+            full = computed(indicator, refreshed)
+            for label, values in lines.items():
+                np.testing.assert_array_equal(values, full[label], err_msg=label)
+        self.assertEqual(engine.stats(), {'entries': len(INDICATORS), 'hits': 0, 'incremental': 0,
+                                          'full': 2 * len(INDICATORS)})
+
+    def test_indicator_without_compute_cannot_be_created(self):
+        class Incomplete(Indicator):
+            pass
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_rewritten_tail_is_recomputed(self):
+        engine = IndicatorEngine()
+        series = random_series(300)
+        engine.compute('bitcoin', '1', EMA(10), series)
+        prices = series.prices.copy()
+        prices[-1] += 50
+        updated = MarketSeries(series.timestamps, prices, series.volumes)
+        lines = engine.compute('bitcoin', '1', EMA(10), updated)
+        np.testing.assert_allclose(lines['EMA 10'], naive_ema(prices, 2 / 11))
+        self.assertEqual(engine.incremental, 1)
+
+    def test_cache_is_per_coin_span_and_params(self):
+        engine = IndicatorEngine(max_entries=3)
+        series = random_series(100)
+        engine.compute('bitcoin', '1', SMA(20), series)
+        engine.compute('bitcoin', '1', SMA(20), series)
+        self.assertEqual(engine.hits, 1)
+        engine.compute('bitcoin', '1', SMA(50), series)
+        engine.compute('bitcoin', '7', SMA(20), series)
+        engine.compute('ethereum', '1', SMA(20), series)
+        self.assertEqual(engine.full, 4)
+        self.assertEqual(list(engine.entries), [('bitcoin', '1', 'SMA', 50), ('bitcoin', '7', 'SMA', 20),
+                                                ('ethereum', '1', 'SMA', 20)])
+
+    def test_unrelated_series_is_computed_from_scratch(self):
+        engine = IndicatorEngine()
+        engine.compute('bitcoin', '1', SMA(5), random_series(100))
+        later = random_series(100, start=500, seed=3)
+        lines = engine.compute('bitcoin', '1', SMA(5), later)
+        np.testing.assert_allclose(lines['SMA 5'], computed(SMA(5), later)['SMA 5'])
+        self.assertEqual(engine.full, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import asyncio
+import unittest
+
+from cryptocurrency.markets import MarketListing, MarketPagesLoader
+from cryptocurrency.ratelimit import PRIORITY_BACKGROUND, PRIORITY_DETAIL, priority_for
+
+
+def page_of(page, per_page=2):
+    start = (page - 1) * per_page
+    return [{'id': f'coin-{i}', 'market_cap_rank': i + 1} for i in range(start, start + per_page)]
+
+
+class FakeClient:
+    def __init__(self, delays=None, failing_pages=()):
+        self.delays = delays or {}
+        self.failing_pages = failing_pages
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = []
+        self.priorities = {}
+
+    async def amarkets(self, page=1, per_page=100, vs_currency='usd'):
+        self.calls.append(page)
+        self.priorities[page] = priority_for('coins/markets')
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delays.get(page, 0.01))
+        self.in_flight -= 1
+        if page in self.failing_pages:
+            return {'status': {'error_code': 429}}
+        return page_of(page, per_page)
+
+
+class TestMarketListing(unittest.TestCase):
+
+    def test_pages_are_ordered_and_indexed(self):
+        listing = MarketListing()
+        listing.add_page(2, page_of(2))
+        listing.add_page(1, page_of(1))
+        self.assertEqual([coin['id'] for coin in listing], ['coin-0', 'coin-1', 'coin-2', 'coin-3'])
+        self.assertEqual(listing.get('coin-3')['market_cap_rank'], 4)
+        self.assertIn('coin-2', listing)
+        self.assertIsNone(listing.get('missing'))
+
+    def test_replacing_a_page(self):
+        listing = MarketListing()
+        listing.add_page(1, page_of(1))
+        listing.add_page(1, [{'id': 'coin-0', 'market_cap_rank': 1, 'current_price': 5}])
+        self.assertEqual(len(listing), 1)
+        self.assertEqual(listing.get('coin-0')['current_price'], 5)
+
+
+class TestMarketPagesLoader(unittest.TestCase):
+
+    def test_pages_stream_as_they_arrive(self):
+        client = FakeClient(delays={1: 0.1, 2: 0.01, 3: 0.01})
+        arrived = []
+        loader = MarketPagesLoader(client, per_page=2, concurrency=3)
+        count = asyncio.run(loader.load(3, lambda page, coins: arrived.append(page)))
+        self.assertEqual(count, 6)
+        self.assertEqual(arrived[-1], 1)
+        self.assertEqual(client.max_in_flight, 3)
+
+    def test_concurrency_and_priorities(self):
+        client = FakeClient()
+        loader = MarketPagesLoader(client, per_page=2, concurrency=2)
+        asyncio.run(loader.load(5, lambda page, coins: None))
+        self.assertLessEqual(client.max_in_flight, 2)
+        # Pacing is left to the client's rate limiter, which orders the pages by these priorities
+        self.assertEqual(client.priorities, {1: PRIORITY_DETAIL, 2: PRIORITY_BACKGROUND, 3: PRIORITY_BACKGROUND,
+                                             4: PRIORITY_BACKGROUND, 5: PRIORITY_BACKGROUND})
+
+    def test_failed_page_is_skipped(self):
+        client = FakeClient(failing_pages=(2,))
+        pages = []
+        loader = MarketPagesLoader(client, per_page=2)
+        count = asyncio.run(loader.load(3, lambda page, coins: pages.append(page)))
+        self.assertEqual(count, 4)
+        self.assertEqual(sorted(pages), [1, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
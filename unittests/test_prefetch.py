@@ -0,0 +1,106 @@
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from cryptocurrency.client import CoinGeckoClient
+from cryptocurrency.prefetch import Prefetcher
+from cryptocurrency.ratelimit import PRIORITY_BACKGROUND, RateLimiter, priority_for
+
+
+class TestPrefetcher(unittest.TestCase):
+
+    def setUp(self):
+        self.client = CoinGeckoClient(base_url='http://127.0.0.1:9', limiter=RateLimiter(rate_per_minute=None))
+        self.addCleanup(self.client.close)
+        self.calls = []
+
+        async def amarket_chart(coin, days):
+            self.calls.append(('chart', coin, days, priority_for('coins/x/market_chart')))
+            return []
+
+        async def acoin(coin_id):
+            self.calls.append(('coin', coin_id, priority_for('coins/x')))
+            return {}
+
+        self.chart_store = MagicMock()
+        self.chart_store.amarket_chart = amarket_chart
+        self.client.acoin = acoin
+
+    def wait_finished(self, prefetcher, count):
+        deadline = time.monotonic() + 5
+        while prefetcher.completed + prefetcher.failed < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_adjacent_timespans_run_one_at_a_time_in_background(self):
+        prefetcher = Prefetcher(self.client, self.chart_store, max_in_flight=1)
+        prefetcher.adjacent_charts('bitcoin', '1')
+        self.wait_finished(prefetcher, 2)
+        self.assertEqual(self.calls, [('chart', 'bitcoin', '7', PRIORITY_BACKGROUND),
+                                      ('chart', 'bitcoin', '30', PRIORITY_BACKGROUND)])
+        self.assertEqual(prefetcher.stats()['completed'], 2)
+
+    def test_budget_per_minute(self):
+        prefetcher = Prefetcher(self.client, self.chart_store, budget_per_minute=2, max_in_flight=5)
+        for coin in ('bitcoin', 'ethereum', 'solana'):
+            prefetcher.coin(coin)
+        self.wait_finished(prefetcher, 2)
+        self.assertEqual([call[1] for call in self.calls], ['bitcoin', 'ethereum'])
+        self.assertEqual(len(prefetcher.pending), 1)
+
+    def test_zero_budget_turns_prefetching_off(self):
+        prefetcher = Prefetcher(self.client, self.chart_store, budget_per_minute=0)
+        prefetcher.adjacent_charts('bitcoin', '1')
+        prefetcher.coin('bitcoin')
+        self.assertEqual((prefetcher.issued, len(prefetcher.pending)), (0, 0))
+
+    def test_waits_while_foreground_has_no_spare_tokens(self):
+        self.client.limiter = RateLimiter(rate_per_minute=60, burst=2)
+        prefetcher = Prefetcher(self.client, self.chart_store, reserve=2)
+        prefetcher.coin('bitcoin')
+        self.assertEqual(prefetcher.issued, 0)
+        self.assertEqual(len(prefetcher.pending), 1)
+
+    def test_queued_prefetch_runs_once_tokens_refill(self):
+        self.client.limiter = RateLimiter(rate_per_minute=600, burst=3)
+        for _ in range(3):
+            self.client.limiter.acquire()
+        prefetcher = Prefetcher(self.client, self.chart_store, reserve=1)
+        prefetcher.coin('ethereum')
+        self.assertEqual(prefetcher.issued, 0)
+        self.wait_finished(prefetcher, 1)
+        self.assertEqual(prefetcher.issued, 1)
+        self.assertEqual(len(prefetcher.pending), 0)
+        self.assertIn('ethereum', [call[1] for call in self.calls])
+
+    def test_duplicates_are_not_queued_and_use_is_counted(self):
+        prefetcher = Prefetcher(self.client, self.chart_store)
+        prefetcher.coin('bitcoin')
+        self.wait_finished(prefetcher, 1)
+        prefetcher.coin('bitcoin')
+        self.assertEqual(prefetcher.issued, 1)
+        self.assertEqual(len(self.calls), 1)
+
+        prefetcher.record_use(('coin', 'ethereum'))
+        prefetcher.record_use(('coin', 'bitcoin'))
+        stats = prefetcher.stats()
+        self.assertEqual((stats['used'], stats['useful_ratio']), (1, 1.0))
+        self.assertIn('cache_hit_ratio', stats)
+
+
+    def test_warmed_key_is_prefetched_again_after_warm_ttl(self):
+        now = [1000.0]
+        prefetcher = Prefetcher(self.client, self.chart_store, warm_ttl=60, clock=lambda: now[0])
+        prefetcher.coin('bitcoin')
+        self.wait_finished(prefetcher, 1)
+        now[0] += 30
+        prefetcher.coin('bitcoin')
+        self.assertEqual(prefetcher.issued, 1)
+        now[0] += 31
+        prefetcher.coin('bitcoin')
+        self.wait_finished(prefetcher, 2)
+        self.assertEqual(prefetcher.issued, 2)
+        self.assertEqual(len(self.calls), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
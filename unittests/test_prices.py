@@ -0,0 +1,55 @@
+import asyncio
+import unittest
+
+from cryptocurrency.prices import PricePoller, apply_quote, batched
+
+
+class FakeClient:
+    def __init__(self, prices, failing_batches=()):
+        self.prices = prices
+        self.failing_batches = failing_batches
+        self.batches = []
+
+    async def asimple_price(self, ids, vs_currencies='usd', include_24hr_change=False):
+        self.batches.append(list(ids))
+        if len(self.batches) in self.failing_batches:
+            return {'status': {'error_code': 429}}
+        return {coin_id: {'usd': self.prices[coin_id], 'usd_24h_change': 1.5}
+                for coin_id in ids if coin_id in self.prices}
+
+
+class TestPricePoller(unittest.TestCase):
+
+    def test_batched(self):
+        self.assertEqual(list(batched(range(5), 2)), [[0, 1], [2, 3], [4]])
+
+    def test_ids_are_fetched_in_batches(self):
+        client = FakeClient({f'coin-{i}': i for i in range(1000)})
+        poller = PricePoller(client, batch_size=250)
+        quotes = asyncio.run(poller.fetch([f'coin-{i}' for i in range(1000)]))
+        self.assertEqual([len(batch) for batch in client.batches], [250, 250, 250, 250])
+        self.assertEqual(poller.requests, 4)
+        self.assertEqual(quotes['coin-7'], (7, 1.5))
+
+    def test_failed_batch_is_skipped(self):
+        client = FakeClient({'a': 1, 'b': 2, 'c': 3}, failing_batches=(2,))
+        poller = PricePoller(client, batch_size=1)
+        quotes = asyncio.run(poller.fetch(['a', 'b', 'c']))
+        self.assertEqual(sorted(quotes), ['a', 'c'])
+
+    def test_diff_returns_only_changed_quotes(self):
+        poller = PricePoller(FakeClient({}))
+        poller.seed([{'id': 'bitcoin', 'current_price': 100, 'price_change_percentage_24h': 1.0},
+                     {'id': 'ethereum', 'current_price': 10, 'price_change_percentage_24h': 2.0}])
+        changed = poller.diff({'bitcoin': (100, 1.0), 'ethereum': (11, 2.5)})
+        self.assertEqual(changed, {'ethereum': (11, 2.5)})
+        self.assertEqual(poller.diff({'bitcoin': (100, 1.0), 'ethereum': (11, 2.5)}), {})
+
+    def test_apply_quote(self):
+        coin = {'id': 'bitcoin', 'current_price': 100, 'price_change_percentage_24h': 1.0}
+        apply_quote(coin, (101, None))
+        self.assertEqual(coin, {'id': 'bitcoin', 'current_price': 101, 'price_change_percentage_24h': 1.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
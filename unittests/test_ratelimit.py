@@ -0,0 +1,141 @@
+import asyncio
+import time
+import unittest
+
+from cryptocurrency.ratelimit import (PRIORITY_BACKGROUND, PRIORITY_CHART, PRIORITY_DETAIL, CircuitBreaker,
+                                      CircuitOpenError, RateLimiter, backoff_delay, parse_retry_after,
+                                      priority_for, request_priority)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_burst_then_rate(self):
+        limiter = RateLimiter(rate_per_minute=600, burst=2)
+        waits = [limiter.acquire() for _ in range(3)]
+        self.assertLess(max(waits[:2]), 0.05)
+        self.assertGreaterEqual(waits[2], 0.08)
+
+    def test_higher_priority_is_served_first(self):
+        limiter = RateLimiter(rate_per_minute=600, burst=1)
+        limiter.acquire()
+        order = []
+
+        async def request(name, priority, start_after):
+            await asyncio.sleep(start_after)
+            await limiter.aacquire(priority)
+            order.append(name)
+
+        async def run():
+            await asyncio.gather(request('prefetch-1', PRIORITY_BACKGROUND, 0),
+                                 request('prefetch-2', PRIORITY_BACKGROUND, 0),
+                                 request('chart', PRIORITY_CHART, 0.02),
+                                 request('detail', PRIORITY_DETAIL, 0.01))
+
+        asyncio.run(run())
+        self.assertEqual(order, ['chart', 'detail', 'prefetch-1', 'prefetch-2'])
+
+    def test_throttle_pauses_requests(self):
+        limiter = RateLimiter(rate_per_minute=None)
+        limiter.throttle(0.1)
+        started = time.monotonic()
+        limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+        self.assertEqual(limiter.stats()['throttled'], 1)
+
+    def test_has_spare(self):
+        limiter = RateLimiter(rate_per_minute=60, burst=4)
+        self.assertTrue(limiter.has_spare(reserve=2))
+        limiter.acquire()
+        self.assertFalse(limiter.has_spare(reserve=3))
+        self.assertAlmostEqual(limiter.spare_in(reserve=3), 1.0, places=1)
+        self.assertIsNone(limiter.spare_in(reserve=4))
+        limiter.throttle(10)
+        self.assertFalse(limiter.has_spare(reserve=0))
+        self.assertAlmostEqual(limiter.spare_in(reserve=0), 10.0, places=1)
+
+    def test_queue_depth_and_cancelled_waiters(self):
+        limiter = RateLimiter(rate_per_minute=60, burst=1)
+        limiter.acquire()
+
+        async def run():
+            task = asyncio.create_task(limiter.aacquire(PRIORITY_BACKGROUND))
+            await asyncio.sleep(0.01)
+            depth = limiter.stats()['queue_depth']
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            return depth
+
+        self.assertEqual(asyncio.run(run()), {'chart': 0, 'detail': 0, 'background': 1})
+        self.assertEqual(limiter.stats()['queue_depth']['background'], 0)
+
+
+class TestPolicies(unittest.TestCase):
+
+    def test_priority_for_path_and_override(self):
+        self.assertEqual(priority_for('coins/bitcoin/market_chart'), PRIORITY_CHART)
+        self.assertEqual(priority_for('coins/bitcoin'), PRIORITY_DETAIL)
+        self.assertEqual(priority_for('coins/list'), PRIORITY_BACKGROUND)
+        with request_priority(PRIORITY_BACKGROUND):
+            self.assertEqual(priority_for('coins/bitcoin/market_chart'), PRIORITY_BACKGROUND)
+        self.assertEqual(priority_for('simple/price'), PRIORITY_DETAIL)
+
+    def test_backoff_delay_is_jittered_and_capped(self):
+        self.assertEqual(backoff_delay(3, base=0.5, rng=lambda: 1.0), 4.0)
+        self.assertEqual(backoff_delay(10, base=0.5, cap=30, rng=lambda: 1.0), 30)
+        self.assertEqual(backoff_delay(2, rng=lambda: 0.0), 0.0)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after('12'), 12.0)
+        self.assertEqual(parse_retry_after('Wed, 21 Oct 2015 07:28:10 GMT', now=lambda: 1445412480), 10.0)
+        self.assertIsNone(parse_retry_after('soon'))
+        self.assertIsNone(parse_retry_after(None))
+
+    def test_circuit_breaker(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        breaker.before_request()
+        breaker.record_failure()
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_request()
+
+        clock.now = 31
+        breaker.before_request()  # half-open trial
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_request()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, 'open')
+
+        clock.now = 62
+        breaker.before_request()
+        breaker.record_success()
+        self.assertEqual((breaker.state, breaker.trips), ('closed', 2))
+
+    def test_released_trial_lets_next_request_through(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        clock.now = 31
+        self.assertTrue(breaker.before_request())
+        # Others wait a positive interval while the trial is in flight, not a 0s spin
+        with self.assertRaises(CircuitOpenError) as raised:
+            breaker.before_request()
+        self.assertGreater(raised.exception.retry_in, 0)
+
+        # Trial cancelled before reporting an outcome
+        breaker.release_trial()
+        self.assertTrue(breaker.before_request())
+        breaker.record_success()
+        self.assertFalse(breaker.before_request())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,80 +1,79 @@
+import os
+import tempfile
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock, patch
+
 from main import MainWindow
+from cryptocurrency.chart_store import MarketChartStore
+from cryptocurrency.client import CoinGeckoClient
+from cryptocurrency.coin_detail import COIN_DETAIL_PARAMS
+from cryptocurrency.fixtures import FixtureStore
+from cryptocurrency.ratelimit import RateLimiter
+from cryptocurrency.standin import StandInServer
 
-class TestCryptoCurrencyApp(unittest.TestCase):
 
-    @patch('main.requests.get')
-    @patch('main.MainWindow.update_coin_list', return_value=None)  # mock
-    def test_get_price(self, mock_update_coin_list, mock_get):
-        mock_response = MagicMock()
-        mock_response.json.return_value = {'bitcoin': {'usd': 50000}}
-        mock_get.return_value = mock_response
+# Requests of the window go to a stand-in server answering from recorded fixtures; the window is built
+# without Tk so the tests don't need a display
+class TestCryptoCurrencyApp(unittest.TestCase):
 
-        app = MainWindow()
-        app.current_currency = 'bitcoin'
-        price = app.get_price()
-        self.assertEqual(price, '50000')
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.fixtures = FixtureStore(os.path.join(self.directory.name, 'fixtures'))
+        self.server = StandInServer(self.fixtures.directory)
+        self.server.start()
+        self.addCleanup(self.server.stop)
 
-    @patch('main.requests.get')
-    def test_get_price_not_found(self, mock_get):
-        mock_response = MagicMock()
-        mock_response.json.return_value = {}
-        mock_get.return_value = mock_response
+        with patch.object(MainWindow, '__init__', return_value=None):
+            self.app = MainWindow()
+        self.app.client = CoinGeckoClient(base_url=self.server.base_url, limiter=RateLimiter(rate_per_minute=None))
+        self.addCleanup(self.app.client.close)
+        self.app.chart_store = MarketChartStore(self.app.client,
+                                                path=os.path.join(self.directory.name, 'chart.sqlite3'))
+        self.addCleanup(self.app.chart_store.close)
+        self.app.current_price_label = MagicMock()
+        self.app.current_currency = 'bitcoin'
 
-        app = MainWindow()
-        app.current_currency = 'non_existent_coin'
-        price = app.get_price()
-        self.assertEqual(price, 'N/A')
+    def test_get_price(self):
+        self.fixtures.save('simple/price', {'ids': 'bitcoin', 'vs_currencies': 'usd'}, {'bitcoin': {'usd': 50000}})
+        self.assertEqual(self.app.get_price(), '50000')
 
-    @patch('main.requests.get')
-    def test_update_price(self, mock_get):
-        mock_response = MagicMock()
-        mock_response.json.return_value = {'bitcoin': {'usd': 50000}}
-        mock_get.return_value = mock_response
+    def test_get_price_not_found(self):
+        self.fixtures.save('simple/price', {'ids': 'non_existent_coin', 'vs_currencies': 'usd'}, {})
+        self.app.current_currency = 'non_existent_coin'
+        self.assertEqual(self.app.get_price(), 'N/A')
 
-        app = MainWindow()
-        app.current_currency = 'bitcoin'
-        app.update_price()
-        self.assertEqual(app.current_price_label.cget('text'), '$50000')
+    def test_update_price(self):
+        self.fixtures.save('simple/price', {'ids': 'bitcoin', 'vs_currencies': 'usd'}, {'bitcoin': {'usd': 50000}})
+        self.app.update_price()
+        self.app.current_price_label.configure.assert_called_once_with(text='$50000')
 
-    @patch('main.requests.get')
-    def test_get_data_plot(self, mock_get):
-        mock_response = MagicMock()
-        mock_response.json.return_value = {
+    def test_get_data_plot(self):
+        self.fixtures.save('coins/bitcoin/market_chart', {'vs_currency': 'usd', 'days': '1'}, {
             'prices': [[1622486400000, 40000], [1622572800000, 41000]],
             'total_volumes': [[1622486400000, 1000], [1622572800000, 1100]]
-        }
-        mock_get.return_value = mock_response
+        })
+        self.app.get_data_plot('1')
 
-        app = MainWindow()
-        app.current_currency = 'bitcoin'
-        app.get_data_plot('1')
+        self.assertEqual(self.app.highest_price, 41000)
+        self.assertEqual(self.app.lowest_price, 40000)
+        self.assertEqual(self.app.total_volume, 1100)
 
-        self.assertEqual(app.highest_price, 41000)
-        self.assertEqual(app.lowest_price, 40000)
-        self.assertEqual(app.total_volume, 1100)
-
-    @patch('main.requests.get')
-    def test_get_coin_info(self, mock_get):
-        mock_response = MagicMock()
-        mock_response.json.return_value = {
+    def test_get_coin_info(self):
+        self.fixtures.save('coins/bitcoin', COIN_DETAIL_PARAMS, {
             'description': {'en': 'Bitcoin is a cryptocurrency.'},
             'links': {
                 'twitter_screen_name': 'bitcoin',
                 'facebook_username': 'bitcoin',
                 'subreddit_url': 'https://reddit.com/r/bitcoin'
             }
-        }
-        mock_get.return_value = mock_response
-
-        app = MainWindow()
-        app.current_currency = 'bitcoin'
-        coin_info = app.get_coin_info()
+        })
+        coin_info = self.app.get_coin_info()
         self.assertEqual(coin_info['description'], 'Bitcoin is a cryptocurrency.')
         self.assertEqual(coin_info['twitter'], 'bitcoin')
         self.assertEqual(coin_info['facebook'], 'bitcoin')
         self.assertEqual(coin_info['reddit'], 'https://reddit.com/r/bitcoin')
 
+
 if __name__ == '__main__':
     unittest.main()
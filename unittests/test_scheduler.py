@@ -0,0 +1,112 @@
+import asyncio
+import queue
+import unittest
+
+from cryptocurrency.client import CoinGeckoClient
+from cryptocurrency.scheduler import ViewScheduler
+
+
+class TestViewScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.client = CoinGeckoClient(base_url='http://127.0.0.1:9')
+        self.ui_queue = queue.Queue()
+        self.scheduler = ViewScheduler(self.client, lambda callback, *args: self.ui_queue.put((callback, args)))
+        self.addCleanup(self.client.close)
+        self.addCleanup(self.scheduler.shutdown)
+
+    # Runs queued UI callbacks like MainWindow.process_ui_queue does
+    def drain(self, expected):
+        for _ in range(expected):
+            callback, args = self.ui_queue.get(timeout=5)
+            callback(*args)
+
+    def test_only_latest_result_is_applied(self):
+        applied = []
+
+        async def slow():
+            await asyncio.sleep(0.2)
+            return 'bitcoin 24H'
+
+        async def fast():
+            return 'bitcoin 7D'
+
+        first = self.scheduler.request('chart', slow(), applied.append)
+        second = self.scheduler.request('chart', fast(), applied.append)
+        self.drain(2)
+
+        self.assertEqual(applied, ['bitcoin 7D'])
+        self.assertFalse(self.scheduler.is_current('chart', first))
+        self.assertTrue(self.scheduler.is_current('chart', second))
+        self.assertEqual(self.scheduler.dropped, 1)
+
+    def test_superseded_request_is_cancelled(self):
+        cancelled = []
+
+        async def slow():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def started_then_slow():
+            return await slow()
+
+        self.scheduler.request('chart', started_then_slow(), lambda result: None)
+        self.client.run(asyncio.sleep(0.05))
+        self.scheduler.request('chart', asyncio.sleep(0, 'done'), lambda result: None)
+        self.drain(2)
+        self.client.run(asyncio.sleep(0.05))
+        self.assertEqual(cancelled, [True])
+
+    def test_channels_are_independent(self):
+        applied = []
+
+        async def value(result):
+            return result
+
+        self.scheduler.request('price', value('price'), applied.append)
+        self.scheduler.request('coin_info', value('info'), applied.append)
+        self.drain(2)
+        self.assertEqual(sorted(applied), ['info', 'price'])
+
+    def test_error_goes_to_error_callback(self):
+        errors = []
+
+        async def failing():
+            raise ValueError('Server is overloaded. Try again later.')
+
+        self.scheduler.request('chart', failing(), lambda result: None, errors.append)
+        self.drain(1)
+        self.assertEqual([str(error) for error in errors], ['Server is overloaded. Try again later.'])
+
+    def test_stream_delivers_every_item_of_current_request(self):
+        applied = []
+
+        async def revalidate(name):
+            yield name, 120
+            await asyncio.sleep(0.05)
+            yield name, 0
+
+        self.scheduler.stream('price', revalidate('bitcoin'), applied.append)
+        self.drain(3)
+        self.assertEqual(applied, [('bitcoin', 120), ('bitcoin', 0)])
+
+    def test_superseded_stream_items_are_dropped(self):
+        applied = []
+
+        async def revalidate(name):
+            yield name, 120
+            await asyncio.sleep(0.2)
+            yield name, 0
+
+        self.scheduler.stream('price', revalidate('bitcoin'), applied.append)
+        self.drain(1)
+        self.scheduler.stream('price', revalidate('ethereum'), applied.append)
+        self.drain(4)
+        self.assertEqual(applied, [('bitcoin', 120), ('ethereum', 120), ('ethereum', 0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+
+from cryptocurrency.search import CoinIndex
+
+COINS = [
+    {'id': 'bitcoin', 'symbol': 'btc', 'name': 'Bitcoin', 'market_cap_rank': 1, 'current_price': 50000},
+    {'id': 'ethereum', 'symbol': 'eth', 'name': 'Ethereum', 'market_cap_rank': 2, 'current_price': 3000},
+    {'id': 'wrapped-bitcoin', 'symbol': 'wbtc', 'name': 'Wrapped Bitcoin', 'market_cap_rank': 15,
+     'current_price': 50000},
+    {'id': 'bitcoin-cash', 'symbol': 'bch', 'name': 'Bitcoin Cash', 'market_cap_rank': 20, 'current_price': 400},
+    {'id': 'btc-bridged', 'symbol': 'btcb', 'name': 'Bridged BTC', 'market_cap_rank': 90, 'current_price': 50000},
+]
+
+
+class TestCoinIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = CoinIndex(COINS)
+
+    def ids(self, query, **kwargs):
+        return [coin['id'] for coin in self.index.search(query, **kwargs)]
+
+    def test_exact_symbol_ranks_first(self):
+        self.assertEqual(self.ids('btc'), ['bitcoin', 'btc-bridged', 'wrapped-bitcoin'])
+
+    def test_prefix_then_substring_by_market_cap(self):
+        self.assertEqual(self.ids('bitcoin'), ['bitcoin', 'bitcoin-cash', 'wrapped-bitcoin'])
+
+    def test_short_query_matches_word_prefixes(self):
+        self.assertEqual(self.ids('e'), ['ethereum'])
+        self.assertEqual(self.ids('w'), ['wrapped-bitcoin'])
+        self.assertEqual(self.ids('ca'), ['bitcoin-cash'])
+
+    def test_narrowing_query_reuses_previous_matches(self):
+        self.ids('bitc')
+        previous = self.index.last_matches
+        self.assertEqual(self.ids('bitcoin c'), ['bitcoin-cash'])
+        self.assertTrue(set(self.index.last_matches) <= set(previous))
+
+    def test_no_match_and_limit(self):
+        self.assertEqual(self.ids('dogecoin'), [])
+        self.assertEqual(self.ids(''), [])
+        self.assertEqual(self.ids('bitcoin', limit=1), ['bitcoin'])
+
+    def test_coins_list_entries_do_not_hide_market_data(self):
+        self.index.add([{'id': 'bitcoin', 'symbol': 'btc', 'name': 'Bitcoin'},
+                        {'id': 'dogecoin', 'symbol': 'doge', 'name': 'Dogecoin'}])
+        self.assertEqual(self.index.get('bitcoin')['current_price'], 50000)
+        self.assertEqual(self.ids('doge'), ['dogecoin'])
+        self.assertEqual(self.ids('coin')[-1], 'dogecoin')
+
+    def test_large_universe(self):
+        coins = [{'id': f'token-{i}', 'symbol': f't{i}', 'name': f'Token {i}'} for i in range(15000)]
+        index = CoinIndex(coins + COINS)
+        self.assertEqual(len(index), 15005)
+        self.assertEqual([coin['id'] for coin in index.search('token-1499')][:1], ['token-1499'])
+        self.assertEqual(index.search('btc')[0]['id'], 'bitcoin')
+
+    def test_pages_merged_into_universe_rank_like_a_full_build(self):
+        universe = [{'id': f'token-{i}', 'symbol': f't{i}', 'name': f'Token {i}'} for i in range(2000)]
+        pages = [[{'id': f'token-{i}', 'symbol': f't{i}', 'name': f'Token {i}', 'market_cap_rank': 2000 - i,
+                   'current_price': 1.0} for i in range(start, start + 100)] + [
+                  {'id': f'new-{start}', 'symbol': 'tn', 'name': 'Token New', 'market_cap_rank': start + 1,
+                   'current_price': 1.0}] for start in (0, 100, 200)]
+        merged = CoinIndex(universe)
+        for page in pages:
+            merged.add(page)
+        built = CoinIndex(universe + [coin for page in pages for coin in page])
+        for query in ('t', 'to', 'tn', 'token', 'token 1', 'new'):
+            self.assertEqual([coin['id'] for coin in merged.search(query)],
+                             [coin['id'] for coin in built.search(query)], query)
+        self.assertEqual(merged.words, sorted(merged.words))
+
+
+if __name__ == '__main__':
+    unittest.main()
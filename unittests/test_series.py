@@ -0,0 +1,56 @@
+import unittest
+
+import numpy as np
+
+from cryptocurrency.series import MarketSeries
+
+
+class TestMarketSeries(unittest.TestCase):
+
+    def setUp(self):
+        self.series = MarketSeries.from_response({
+            'prices': [[1622486400000, 40000], [1622530000000, 39000], [1622572800000, 41000]],
+            'market_caps': [[1622486400000, 1], [1622530000000, 1], [1622572800000, 1]],
+            'total_volumes': [[1622486400000, 1000], [1622530000000, 1050], [1622572800000, 1100]],
+        })
+
+    def test_columns_are_typed_arrays(self):
+        self.assertEqual(self.series.timestamps.dtype, np.int64)
+        self.assertEqual(self.series.prices.dtype, np.float64)
+        self.assertEqual(self.series.volumes.dtype, np.float64)
+        self.assertTrue(self.series.prices.flags['C_CONTIGUOUS'])
+
+    def test_reductions(self):
+        self.assertEqual(self.series.high, 41000)
+        self.assertEqual(self.series.low, 39000)
+        self.assertEqual(self.series.last_volume, 1100)
+        self.assertAlmostEqual(self.series.percent_change, 2.5)
+
+    def test_missing_prices_raise(self):
+        with self.assertRaises(ValueError):
+            MarketSeries.from_response({'status': {'error_code': 429}})
+
+    def test_unaligned_volumes(self):
+        series = MarketSeries.from_response({
+            'prices': [[1000, 1.0], [2000, 2.0], [3000, 3.0]],
+            'total_volumes': [[3000, 30.0], [1000, 10.0]],
+        })
+        self.assertTrue(np.isnan(series.volumes[1]))
+        self.assertEqual(series.volumes[[0, 2]].tolist(), [10.0, 30.0])
+        self.assertEqual(series.last_volume, 30.0)
+
+    def test_datetimes_and_rows(self):
+        self.assertEqual(str(self.series.datetimes()[0]), '2021-05-31T18:40:00.000')
+        series = MarketSeries([1, 2], [1.0, 2.0], [np.nan, 5.0])
+        self.assertEqual(series.rows(), [(1, 1.0, None), (2, 2.0, 5.0)])
+        self.assertEqual(MarketSeries.from_rows(series.rows()).volumes[1], 5.0)
+
+    def test_empty_series(self):
+        series = MarketSeries.from_response({'prices': []})
+        self.assertEqual(len(series), 0)
+        self.assertIsNone(series.high)
+        self.assertIsNone(series.percent_change)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import gzip
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from cryptocurrency.client import APIError, CoinGeckoClient
+from cryptocurrency.fixtures import FixtureStore, canonical_query, fixture_name
+from cryptocurrency.ratelimit import RateLimiter
+from cryptocurrency.standin import StandInServer
+
+
+class TestFixtures(unittest.TestCase):
+
+    def test_fixture_name_ignores_param_order_and_types(self):
+        self.assertEqual(fixture_name('/coins/markets', {'page': 1, 'vs_currency': 'usd'}),
+                         fixture_name('coins/markets', {'vs_currency': 'usd', 'page': '1'}))
+        self.assertTrue(fixture_name('coins/bitcoin/market_chart').startswith('coins__bitcoin__market_chart-'))
+        self.assertEqual(canonical_query({'b': 2, 'a': 'x y'}), 'a=x+y&b=2')
+
+    def test_save_and_load_compressed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = FixtureStore(directory)
+            store.save('global', None, {'data': {'total_volume': {'usd': 1}}})
+            with gzip.open(store.path_for('global'), 'rt') as f:
+                self.assertEqual(json.load(f)['body'], {'data': {'total_volume': {'usd': 1}}})
+            self.assertEqual(store.load('global')['status'], 200)
+            self.assertIsNone(store.load('coins/list'))
+            self.assertEqual(len(store), 1)
+
+
+class TestStandInServer(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.fixtures = FixtureStore(self.directory.name)
+        self.fixtures.save('simple/price', {'ids': 'bitcoin', 'vs_currencies': 'usd'}, {'bitcoin': {'usd': 50000}})
+
+    def serve(self, **kwargs):
+        server = StandInServer(self.directory.name, **kwargs)
+        server.start()
+        self.addCleanup(server.stop)
+        client = CoinGeckoClient(base_url=server.base_url, limiter=RateLimiter(rate_per_minute=None))
+        self.addCleanup(client.close)
+        return server, client
+
+    def test_replays_recorded_response(self):
+        server, client = self.serve()
+        self.assertEqual(client.simple_price('bitcoin'), {'bitcoin': {'usd': 50000}})
+        with self.assertRaises(APIError) as raised:
+            client.global_data()
+        self.assertEqual(raised.exception.status, 404)
+        self.assertEqual((server.counts['served'], server.counts['missing']), (1, 1))
+
+    def test_latency(self):
+        server, client = self.serve(latency=0.1)
+        started = time.monotonic()
+        client.simple_price('bitcoin')
+        self.assertGreaterEqual(time.monotonic() - started, 0.1)
+
+    def test_seeded_429_injection_repeats(self):
+        runs = []
+        for _ in range(2):
+            server = StandInServer(self.directory.name, throttle_rate=0.5, seed=3)
+            self.addCleanup(server.server_close)
+            runs.append([server.next_response()[1] for _ in range(20)])
+        self.assertEqual(runs[0], runs[1])
+        self.assertEqual(set(runs[0]), {True, False})
+
+    def test_injected_429_is_retried(self):
+        server, client = self.serve(throttle_rate=0.5, retry_after=0, seed=3)
+        self.assertEqual(client.simple_price('bitcoin'), {'bitcoin': {'usd': 50000}})
+        self.assertEqual(server.counts['requests'], server.counts['throttled'] + 1)
+        self.assertEqual(client.throttle_stats()['throttled'], server.counts['throttled'])
+
+    def test_client_records_fixtures_that_replay(self):
+        server, client = self.serve()
+        with tempfile.TemporaryDirectory() as recorded:
+            client.recorder = FixtureStore(recorded)
+            client.simple_price(['bitcoin'])
+            self.assertEqual(os.listdir(recorded), [fixture_name('simple/price',
+                                                                 {'ids': 'bitcoin', 'vs_currencies': 'usd'})])
+            self.assertEqual(FixtureStore(recorded).load('simple/price', {'vs_currencies': 'usd', 'ids': 'bitcoin'}),
+                             self.fixtures.load('simple/price', {'ids': 'bitcoin', 'vs_currencies': 'usd'}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from cryptocurrency.startup import StartupTimer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 10.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestStartupTimer(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.timer = StartupTimer(started_at=10.0, stages=('global', 'chart'), clock=self.clock, log_path='')
+
+    def test_marks_are_relative_to_start_and_first_wins(self):
+        self.clock.now = 10.25
+        self.assertEqual(self.timer.mark('first_paint'), 0.25)
+        self.clock.now = 11.0
+        self.assertEqual(self.timer.mark('first_paint'), 0.25)
+
+    def test_interactive_after_all_stages(self):
+        self.clock.now = 10.5
+        self.timer.done('global')
+        self.assertNotIn('interactive', self.timer.marks)
+        self.assertFalse(self.timer.complete)
+        self.clock.now = 11.5
+        self.timer.done('chart')
+        self.timer.done('chart')
+        self.assertTrue(self.timer.complete)
+        self.assertEqual(self.timer.marks['interactive'], 1.5)
+        self.assertEqual(self.timer.marks['global'], 0.5)
+
+    def test_timings_are_appended_to_log(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'startup.jsonl')
+            timer = StartupTimer(started_at=10.0, stages=('chart',), clock=self.clock, log_path=path)
+            timer.mark('first_paint')
+            timer.done('chart')
+            with open(path, encoding='utf-8') as log_file:
+                record = json.loads(log_file.readline())
+        self.assertEqual(record['timings_ms'], {'first_paint': 0.0, 'chart': 0.0, 'interactive': 0.0})
+
+
+# Parses `python -X importtime` output into {module: cumulative microseconds}
+def import_times(stderr):
+    times = {}
+    for line in stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_main_defers_heavy_imports(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main'], cwd=root,
+                                capture_output=True, text=True, check=True)
+        times = import_times(result.stderr)
+        self.assertIn('main', times)
+        # matplotlib and the chart-only modules are loaded on the first chart draw, aiohttp on the client loop thread.
+        # numpy is not on the list: customtkinter loads it through PIL.
+        for module in ('matplotlib', 'matplotlib.figure', 'aiohttp', 'cryptocurrency.chart',
+                       'cryptocurrency.candles', 'cryptocurrency.compare', 'cryptocurrency.downsample',
+                       'cryptocurrency.indicators'):
+            self.assertNotIn(module, times, f'{module} imported by main ({times["main"] / 1000:.0f} ms total)')
+
+    def test_indicator_names_match_indicators(self):
+        from cryptocurrency.indicators import INDICATORS
+        from main import INDICATOR_NAMES
+        self.assertEqual(INDICATOR_NAMES, tuple(INDICATORS))
+
+
+if __name__ == '__main__':
+    unittest.main()
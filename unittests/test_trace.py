@@ -0,0 +1,135 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from cryptocurrency.trace import NO_SPAN, TRACE_ENV, Tracer, configure_from_env, percentile, tracer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, ms):
+        self.now += int(ms * 1e6)
+
+
+class TestTracer(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.tracer = Tracer(clock=self.clock)
+
+    def timed(self, name, ms, **args):
+        with self.tracer.span(name, **args):
+            self.clock.advance(ms)
+
+    def test_disabled_span_records_nothing(self):
+        self.assertIs(self.tracer.span('http', path='global'), NO_SPAN)
+        self.timed('http', 5)
+        self.assertEqual(len(self.tracer.events), 0)
+        self.assertEqual(self.tracer.summary(), {})
+
+    def test_span_becomes_complete_event(self):
+        self.tracer.enable()
+        self.clock.advance(2)
+        self.timed('http', 5, path='global')
+
+        event, = self.tracer.events
+        self.assertEqual(event['name'], 'http')
+        self.assertEqual(event['ph'], 'X')
+        self.assertEqual(event['ts'], 2000)
+        self.assertEqual(event['dur'], 5000)
+        self.assertEqual(event['args'], {'path': 'global'})
+
+    def test_span_notes_error_and_reraises(self):
+        self.tracer.enable()
+        with self.assertRaises(ValueError):
+            with self.tracer.span('parse.json'):
+                raise ValueError('bad body')
+        self.assertEqual(self.tracer.events[0]['args'], {'error': 'ValueError'})
+
+    def test_traced_decorator(self):
+        @self.tracer.traced('plot')
+        def plot(points):
+            self.clock.advance(3)
+            return points
+
+        self.assertEqual(plot(10), 10)
+        self.assertEqual(len(self.tracer.events), 0)
+        self.tracer.enable()
+        self.assertEqual(plot(10), 10)
+        self.assertEqual(self.tracer.summary()['plot']['p50_ms'], 3)
+
+    def test_summary_percentiles_over_rolling_window(self):
+        self.tracer = Tracer(window=100, clock=self.clock)
+        self.tracer.enable()
+        for ms in range(1, 201):
+            self.timed('http', ms)
+
+        row = self.tracer.summary()['http']
+        # Only the last 100 runs (101..200 ms) are kept
+        self.assertEqual(row['count'], 100)
+        self.assertEqual(row['p50_ms'], 150)
+        self.assertEqual(row['p95_ms'], 195)
+        self.assertEqual(row['max_ms'], 200)
+        self.assertIn('http', self.tracer.format_summary())
+
+    def test_percentile_nearest_rank(self):
+        self.assertEqual(percentile([], 50), 0.0)
+        self.assertEqual(percentile([7], 95), 7)
+        self.assertEqual(percentile([1, 2, 3, 4], 50), 2)
+
+    def test_tasks_get_own_tracks(self):
+        self.tracer.enable()
+
+        async def request(name):
+            with self.tracer.span('http', path=name):
+                await asyncio.sleep(0)
+
+        async def main():
+            await asyncio.gather(request('a'), request('b'))
+
+        asyncio.run(main())
+        tracks = {event['tid'] for event in self.tracer.events}
+        self.assertEqual(len(tracks), 2)
+        self.assertTrue(all(name.startswith('task ') for name in self.tracer.tracks.values()))
+
+    def test_export_chrome_trace(self):
+        self.tracer.enable()
+        self.timed('http', 1, path='global')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'trace', 'app.json')
+            self.tracer.export_chrome_trace(path)
+            with open(path) as f:
+                trace = json.load(f)
+
+        phases = [event['ph'] for event in trace['traceEvents']]
+        self.assertEqual(phases, ['M', 'X'])
+        self.assertEqual(trace['traceEvents'][1]['args'], {'path': 'global'})
+
+
+class TestConfigureFromEnv(unittest.TestCase):
+    def tearDown(self):
+        tracer.disable()
+        tracer.clear()
+
+    def test_unset_leaves_tracer_off(self):
+        self.assertIsNone(configure_from_env({}))
+        self.assertIsNone(configure_from_env({TRACE_ENV: '0'}))
+        self.assertFalse(tracer.enabled)
+
+    def test_summary_only(self):
+        self.assertIsNone(configure_from_env({TRACE_ENV: '1'}))
+        self.assertTrue(tracer.enabled)
+
+    def test_export_path(self):
+        self.assertEqual(configure_from_env({TRACE_ENV: 'trace.json'}), 'trace.json')
+        self.assertTrue(tracer.enabled)
+
+
+if __name__ == '__main__':
+    unittest.main()